@@ -0,0 +1,84 @@
+"""Бенчмарк ``apply_accessibility`` на 10^3–10^5 патчах.
+
+Сравнивает прежний поштучный цикл (``set_hatch`` + ``np.allclose`` на
+каждый столбец) с пакетной реализацией — для ``BarContainer`` и для
+``PatchCollection``.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_accessibility
+"""
+
+from __future__ import annotations
+
+import time
+
+import matplotlib as mpl
+
+mpl.use("Agg")
+
+import numpy as np
+from matplotlib.collections import PatchCollection
+from matplotlib.patches import Rectangle
+
+from causal_notes.viz import theme
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def _legacy_apply(ax, bars, th: theme.Theme) -> None:
+    # Прежняя реализация
+    hatches = th.hatches()
+    for i, bar in enumerate(bars):
+        bar.set_hatch(hatches[i % len(hatches)])
+        if bar.get_edgecolor() is None or np.allclose(bar.get_edgecolor(), 0):
+            bar.set_edgecolor(th.edgecolor)
+
+
+def _bars(th: theme.Theme, n: int):
+    fig = th.figure()
+    ax = fig.add_subplot()
+    return ax, ax.bar(np.arange(n), np.ones(n), edgecolor="none")
+
+
+def _collections(th: theme.Theme, n: int):
+    fig = th.figure()
+    ax = fig.add_subplot()
+    # По коллекции на серию, как у hist() с несколькими выборками
+    colls = [
+        PatchCollection(
+            [Rectangle((i, s), 0.8, 1) for i in range(n // 5)], edgecolor="none"
+        )
+        for s in range(5)
+    ]
+    for c in colls:
+        ax.add_collection(c)
+    return ax, colls
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    th = theme.Theme("light")
+    print(
+        f"{'n':>8} {'legacy bars':>12} {'bars':>9} {'speedup':>8} {'collections':>12}"
+    )
+    for n in SIZES:
+        ax, bars = _bars(th, n)
+        legacy = _time(lambda: _legacy_apply(ax, bars, th))
+        ax, bars = _bars(th, n)
+        batched = _time(lambda: theme.apply_accessibility(ax, bars, th))
+        ax, colls = _collections(th, n)
+        coll = _time(lambda: theme.apply_accessibility(ax, colls, th))
+        print(
+            f"{n:>8} {legacy * 1e3:>10.1f}ms {batched * 1e3:>7.1f}ms "
+            f"{legacy / batched:>7.1f}x {coll * 1e3:>10.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
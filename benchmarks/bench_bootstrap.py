@@ -0,0 +1,60 @@
+"""Бенчмарк бутстрэпа: цикл с пересэмплированием против матриц весов.
+
+Запуск из корня репозитория (строки и повторы — необязательные аргументы)::
+
+    python -m benchmarks.bench_bootstrap [1000000] [2000]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from causal_notes.estimators.bootstrap import bootstrap
+
+NAIVE_REPS = 20
+
+
+def _naive(y: np.ndarray, t: np.ndarray, reps: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    out = np.empty(reps)
+    for r in range(reps):
+        idx = rng.integers(0, len(y), len(y))
+        yr, tr = y[idx], t[idx]
+        out[r] = yr[tr].mean() - yr[~tr].mean()
+    return out
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    reps = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    rng = np.random.default_rng(0)
+    t = rng.random(n) < 0.5
+    y = rng.exponential(1.0, n) + 0.05 * t
+    print(f"{n:,} rows, {os.cpu_count()} CPU(s)")
+
+    start = time.perf_counter()
+    _naive(y, t, NAIVE_REPS, 0)
+    per_rep = (time.perf_counter() - start) / NAIVE_REPS
+    print(f"naive loop        {per_rep * 1e3:>8.1f} ms / replicate")
+
+    for weights in ("poisson", "multinomial"):
+        for r in (reps // 4, reps):
+            tracemalloc.start()
+            start = time.perf_counter()
+            res = bootstrap(y, t, replicates=r, weights=weights, seed=0, workers=1)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+            print(
+                f"{weights:<12} B={r:<6} {elapsed / r * 1e3:>8.1f} ms / replicate"
+                f"   peak {peak:>6.1f} MB   bca {res.ci('bca')}"
+            )
+
+
+if __name__ == "__main__":
+    main()
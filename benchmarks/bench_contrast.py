@@ -0,0 +1,49 @@
+"""Бенчмарк контраста WCAG: поштучный ``contrast_ratio`` против ``contrast_matrix``.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_contrast
+"""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from causal_notes.viz import theme
+
+BACKGROUNDS = [theme._DARK_BG, theme._LIGHT_BG]
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+
+    # Палитра/колормап из hex-строк
+    for n in (1_000, 100_000):
+        colors = [f"#{c:06x}" for c in rng.integers(0, 2**24, n)]
+        scalar = _time(
+            lambda: [[theme.contrast_ratio(c, b) for b in BACKGROUNDS] for c in colors]
+        )
+        vector = _time(lambda: theme.contrast_matrix(colors, BACKGROUNDS))
+        print(
+            f"{n:>9} hex × 2 bg   scalar {scalar * 1e3:>8.1f} ms   "
+            f"matrix {vector * 1e3:>7.1f} ms   {scalar / vector:>5.0f}x"
+        )
+
+    # Изображение 300 dpi (6×4 дюйма) целиком
+    img = rng.integers(0, 256, (1200, 1800, 4), dtype=np.uint8)
+    vector = _time(lambda: theme.contrast_matrix(img, BACKGROUNDS))
+    print(
+        f"{img.shape[0] * img.shape[1]:>9} px uint8 × 2 bg matrix {vector * 1e3:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
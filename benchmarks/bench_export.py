@@ -0,0 +1,56 @@
+"""Бенчмарк экспорта большой фигуры в несколько форматов.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_export
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+from causal_notes.viz.export import export_figure  # noqa: E402
+from causal_notes.viz.theme import set_theme  # noqa: E402
+
+FORMATS = ("svg", "pdf", "png")
+N_BARS = 5_000
+
+
+def _build() -> "matplotlib.figure.Figure":
+    rng = np.random.default_rng(0)
+    fig, ax = plt.subplots()
+    ax.bar(np.arange(N_BARS), rng.random(N_BARS), width=0.8)
+    return fig
+
+
+def _legacy(fig, outdir: str) -> float:
+    start = time.perf_counter()
+    for fmt in FORMATS:
+        dpi = 300 if fmt == "png" else None
+        fig.savefig(f"{outdir}/legacy.{fmt}", format=fmt, dpi=dpi)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    set_theme("light")
+    fig = _build()
+    with tempfile.TemporaryDirectory() as outdir:
+        print(f"{N_BARS} bars, formats={FORMATS}")
+        print(f"legacy loop          {_legacy(fig, outdir):>7.2f} s")
+        for parallel in (False, True):
+            res = export_figure(fig, "fig", outdir, FORMATS, parallel=parallel)
+            per_fmt = ", ".join(f"{k}={v:.2f}" for k, v in res.timings.items())
+            print(f"export parallel={parallel!s:<5} {res.total:>7.2f} s  ({per_fmt})")
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    main()
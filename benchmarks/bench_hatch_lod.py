@@ -0,0 +1,49 @@
+"""Бенчмарк hatch LOD: гистограммы с тысячами узких hatch-столбцов.
+
+``savefig(hatch_lod=True)`` применяет LOD только к растровому проходу;
+SVG приведён для сравнения — там hatch и так один общий ``<pattern>``.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_hatch_lod
+"""
+
+from __future__ import annotations
+
+import matplotlib as mpl
+
+mpl.use("Agg")
+
+import numpy as np
+
+from causal_notes.viz import theme
+from causal_notes.viz.hatch import hatch_lod_savings
+
+BINS = (100, 1_000, 5_000)
+
+
+def _figure(bins: int):
+    th = theme.Theme("print")
+    fig = th.figure(figsize=(6, 4))
+    ax = fig.add_subplot()
+    rng = np.random.default_rng(0)
+    for k in range(3):
+        _, _, bars = ax.hist(rng.normal(k, 1, 100_000), bins=bins, alpha=0.6)
+        theme.apply_accessibility(ax, bars, th)
+    return fig
+
+
+def main() -> None:
+    print(f"{'bins':>6} {'fmt':>4} {'full':>8} {'lod':>8} {'saved':>8}")
+    for bins in BINS:
+        fig = _figure(bins)
+        for fmt in ("png", "svg"):
+            full, lod = hatch_lod_savings(fig, fmt=fmt)
+            print(
+                f"{bins:>6} {fmt:>4} {full:>7.2f}s {lod:>7.2f}s "
+                f"{(full - lod) / full:>7.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Бенчмарк времени импорта ``causal_notes.viz.theme`` (``-X importtime``).
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_import
+"""
+
+from __future__ import annotations
+
+import re
+import statistics
+import subprocess
+import sys
+
+RUNS = 7
+
+CASES = {
+    "palette only": "from causal_notes.viz.theme import PALETTE, HATCH, contrast_ratio",
+    "set_theme": "from causal_notes.viz.theme import set_theme; set_theme()",
+    "matplotlib.pyplot": "import matplotlib.pyplot",
+}
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+
+def _cumulative_us(code: str) -> tuple[int, bool]:
+    """Суммарное время импорта верхнего уровня (µs) и загружен ли matplotlib."""
+    probe = code + "; import sys; print('matplotlib' in sys.modules)"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        # Верхний уровень дерева — без отступа перед именем модуля
+        if m and not line.split("|")[2].startswith("  "):
+            total += int(m.group(2))
+    return total, proc.stdout.strip().endswith("True")
+
+
+def main() -> None:
+    for label, code in CASES.items():
+        samples = [_cumulative_us(code) for _ in range(RUNS)]
+        median = statistics.median(t for t, _ in samples)
+        loaded = samples[0][1]
+        print(
+            f"{label:<18} {median / 1000:>8.1f} ms  "
+            f"(matplotlib loaded: {'yes' if loaded else 'no'})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Бенчмарк онлайн-накопителя ATE: событий в секунду.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_online
+"""
+
+from __future__ import annotations
+
+import asyncio
+import pickle
+import time
+
+import numpy as np
+
+from causal_notes.estimators import OnlineATE, consume
+
+N = 1_000_000
+BATCH = 1_000
+
+
+def _rate(label: str, n: int, seconds: float) -> None:
+    print(f"{label:<32} {n / seconds / 1e6:>8.2f} M events/s")
+
+
+async def _single(ys: list[float], ts: list[bool]):
+    for y, t in zip(ys, ts):
+        yield y, t
+
+
+async def _batches(y: np.ndarray, t: np.ndarray):
+    for start in range(0, len(y), BATCH):
+        yield y[start : start + BATCH], t[start : start + BATCH]
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    t = rng.random(N) < 0.5
+    y = rng.standard_normal(N) + 0.1 * t
+    ys, ts = y.tolist(), t.tolist()
+
+    acc = OnlineATE()
+    start = time.perf_counter()
+    for yi, ti in zip(ys, ts):
+        acc.add(yi, ti)
+    _rate("add() per event", N, time.perf_counter() - start)
+
+    acc = OnlineATE()
+    start = time.perf_counter()
+    for i in range(0, N, BATCH):
+        acc.update(y[i : i + BATCH], t[i : i + BATCH])
+    _rate(f"update() batches of {BATCH}", N, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    asyncio.run(consume(_single(ys, ts)))
+    _rate("consume() per event", N, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    asyncio.run(consume(_batches(y, t)))
+    _rate(f"consume() batches of {BATCH}", N, time.perf_counter() - start)
+
+    shards = [pickle.dumps(acc) for _ in range(1_000)]
+    start = time.perf_counter()
+    total = OnlineATE()
+    for blob in shards:
+        total.merge(pickle.loads(blob))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'unpickle+merge shard':<32} {elapsed / len(shards) * 1e6:>8.2f} µs "
+        f"({len(shards[0])} B each)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Бенчмарк переключения профилей CausalViz.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_theme
+"""
+
+from __future__ import annotations
+
+import itertools
+import timeit
+
+import matplotlib as mpl
+
+from causal_notes.viz import theme
+
+STYLES = ("dark", "light", "print")
+N = 2_000
+
+
+def _legacy_set_theme(style: str) -> None:
+    # Прежняя реализация: слияние словарей + полная валидация
+    mpl.rcParams.update({**theme._COMMON, **theme._PROFILES[style]})
+
+
+def _bench(label: str, fn) -> None:
+    styles = itertools.cycle(STYLES)
+    total = timeit.timeit(lambda: fn(next(styles)), number=N)
+    print(f"{label:<28} {total / N * 1e6:>9.1f} µs / switch")
+
+
+def _with_context(style: str) -> None:
+    with theme.theme_context(style):
+        pass
+
+
+def main() -> None:
+    for style in STYLES:
+        theme.set_theme(style)  # прогрев кэша
+
+    _bench("rcParams.update (legacy)", _legacy_set_theme)
+    _bench("set_theme (cached)", theme.set_theme)
+    _bench("theme_context enter+exit", _with_context)
+
+    # Повторное применение текущего профиля — частый случай в ноутбуках
+    theme.set_theme("dark")
+    _bench("legacy, same profile", lambda _: _legacy_set_theme("dark"))
+    _bench("set_theme, same profile", lambda _: theme.set_theme("dark"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Оценки причинных эффектов
+=========================
+
+Определения — ``causal_notes/lectures/01_ci_basics.md``.
+
+    from causal_notes.estimators import ate, att
+
+    ate(y, t)       # Estimate(estimand="ATE", estimate=..., se=..., ci=...)
+    chunked_difference_in_means("y.npy", "t.npy")   # файлы больше RAM
+    acc = OnlineATE(); acc.add(y_i, t_i); acc.snapshot()   # поток событий
+    bootstrap(y, t, replicates=10_000).ci("bca")            # бутстрэп
+    permutation_test(y, t, strata=block_id).p_value         # тест Фишера
+"""
+
+from causal_notes.estimators.bootstrap import BootstrapResult, bootstrap
+from causal_notes.estimators.chunked import (
+    chunked_difference_in_means,
+    chunked_moments,
+    iter_chunks,
+)
+from causal_notes.estimators.diff_in_means import (
+    Estimate,
+    arm_moments,
+    ate,
+    att,
+    difference_in_means,
+    from_moments,
+)
+from causal_notes.estimators.moments import Moments
+from causal_notes.estimators.online import ArmAccumulator, OnlineATE, consume
+from causal_notes.estimators.permutation import PermutationResult, permutation_test
+
+__all__ = [
+    "ArmAccumulator",
+    "BootstrapResult",
+    "Estimate",
+    "Moments",
+    "OnlineATE",
+    "PermutationResult",
+    "arm_moments",
+    "ate",
+    "att",
+    "bootstrap",
+    "chunked_difference_in_means",
+    "chunked_moments",
+    "consume",
+    "difference_in_means",
+    "from_moments",
+    "iter_chunks",
+    "permutation_test",
+]
@@ -0,0 +1,190 @@
+"""
+Разность средних вне памяти
+===========================
+
+Логи экспериментов больше RAM: ``T`` и ``Y`` читаются чанками по
+``chunk_size`` строк, по каждому чанку считаются ``Moments`` групп
+и сливаются (Chan) — один проход, память ограничена чанком:
+
+  • ``.npy`` — заголовок разбирается ``np.lib.format``, данные читаются
+    ``np.fromfile`` в новый буфер на чанк (не mmap: RSS не растёт
+    страницами, прочитанными раньше);
+  • ``np.memmap`` / любой 1-D массив — срезы (view);
+  • Parquet — ``pyarrow.parquet.ParquetFile.iter_batches`` по двум
+    колонкам (нужен ``pyarrow``).
+
+Результат совпадает с ``difference_in_means`` на тех же данных с
+точностью до порядка суммирования (~1e-15 относительно).
+
+    from causal_notes.estimators.chunked import chunked_difference_in_means
+
+    chunked_difference_in_means("y.npy", "t.npy")
+    chunked_difference_in_means("events.parquet", columns=("revenue", "treated"))
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Union
+
+from causal_notes.estimators.diff_in_means import (
+    Estimand,
+    Estimate,
+    arm_moments,
+    from_moments,
+)
+from causal_notes.estimators.moments import Moments
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    Source = Union[str, os.PathLike, np.ndarray]
+
+# Строк на чанк: 2**22 × (8 B float64 + 1 B) ≈ 38 MB на чанк и столько же
+# временных массивов в Moments.of
+CHUNK_SIZE = 1 << 22
+
+
+def _is_parquet(path: Path) -> bool:
+    return path.suffix.lower() in (".parquet", ".pq")
+
+
+def _npy_chunks(path: Path, chunk_size: int) -> Iterator["np.ndarray"]:
+    """Чанки 1-D ``.npy`` через ``np.fromfile`` (без отображения в память)."""
+    import numpy as np
+
+    fmt = np.lib.format
+    with open(path, "rb") as f:
+        version = fmt.read_magic(f)
+        if version == (1, 0):
+            shape, _, dtype = fmt.read_array_header_1_0(f)
+        else:
+            shape, _, dtype = fmt.read_array_header_2_0(f)
+        if len(shape) != 1:
+            raise ValueError(f"{path}: expected a 1-D array, got shape {shape}")
+        if dtype.hasobject:
+            raise ValueError(f"{path}: object arrays are not supported")
+        remaining = shape[0]
+        while remaining:
+            count = min(chunk_size, remaining)
+            chunk = np.fromfile(f, dtype=dtype, count=count)
+            if len(chunk) != count:
+                raise ValueError(f"{path}: file is truncated")
+            remaining -= count
+            yield chunk
+
+
+def _array_chunks(a: "np.ndarray", chunk_size: int) -> Iterator["np.ndarray"]:
+    for start in range(0, len(a), chunk_size):
+        yield a[start : start + chunk_size]
+
+
+def _column_chunks(source, chunk_size: int) -> Iterator["np.ndarray"]:
+    import numpy as np
+
+    if isinstance(source, np.ndarray):
+        return _array_chunks(source, chunk_size)
+    path = Path(source)
+    if path.suffix.lower() == ".npy":
+        return _npy_chunks(path, chunk_size)
+    raise ValueError(f"{path}: expected a .npy file, a .parquet file or an array")
+
+
+def _parquet_chunks(
+    path: Path, columns: tuple[str, str], chunk_size: int
+) -> Iterator[tuple["np.ndarray", "np.ndarray"]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError(f"reading {path} requires pyarrow") from exc
+
+    y_col, t_col = columns
+    with pq.ParquetFile(path) as pf:
+        for batch in pf.iter_batches(batch_size=chunk_size, columns=[y_col, t_col]):
+            y, t = batch.column(y_col), batch.column(t_col)
+            if y.null_count or t.null_count:
+                raise ValueError(f"{path}: null values in {y_col!r} or {t_col!r}")
+            yield (
+                y.to_numpy(zero_copy_only=False),
+                t.to_numpy(zero_copy_only=False),
+            )
+
+
+def iter_chunks(
+    y: "Source",
+    t: "Source | None" = None,
+    chunk_size: int = CHUNK_SIZE,
+    columns: tuple[str, str] = ("y", "t"),
+) -> Iterator[tuple["np.ndarray", "np.ndarray"]]:
+    """Пары ``(y, t)`` по ``chunk_size`` строк.
+
+    Parameters
+    ----------
+    y : path | np.ndarray
+        ``.npy``, массив (в т.ч. ``np.memmap``) или Parquet-файл с обеими
+        колонками (тогда ``t`` не задаётся).
+    t : path | np.ndarray | None
+        Назначение лечения — ``.npy`` или массив той же длины.
+    columns : (str, str)
+        Имена колонок исхода и лечения в Parquet.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    if t is None:
+        if isinstance(y, (str, os.PathLike)) and _is_parquet(Path(y)):
+            yield from _parquet_chunks(Path(y), columns, chunk_size)
+            return
+        raise ValueError("t is required unless y is a Parquet file")
+
+    # Пути тоже имеют __len__ (str) — сравнивать сразу можно только массивы
+    paths = (str, bytes, os.PathLike)
+    if not isinstance(y, paths) and not isinstance(t, paths) and len(y) != len(t):
+        raise ValueError(f"y and t differ in length: {len(y)} vs {len(t)}")
+    # zip() молча обрезал бы по короткому потоку — хвост длинного надо увидеть
+    missing = object()
+    pairs = itertools.zip_longest(
+        _column_chunks(y, chunk_size), _column_chunks(t, chunk_size), fillvalue=missing
+    )
+    for yc, tc in pairs:
+        if yc is missing or tc is missing or len(yc) != len(tc):
+            raise ValueError("y and t differ in length")
+        yield yc, tc
+
+
+def chunked_moments(
+    chunks: Iterable[tuple["np.ndarray", "np.ndarray"]],
+) -> tuple[Moments, Moments]:
+    """``(treated, control)`` по потоку чанков ``(y, t)``."""
+    treated = control = Moments()
+    for y, t in chunks:
+        mt, mc = arm_moments(y, t, block_size=max(len(y), 1))
+        treated += mt
+        control += mc
+    return treated, control
+
+
+def chunked_difference_in_means(
+    y: "Source",
+    t: "Source | None" = None,
+    estimand: Estimand = "ATE",
+    level: float = 0.95,
+    chunk_size: int = CHUNK_SIZE,
+    columns: tuple[str, str] = ("y", "t"),
+) -> Estimate:
+    """``difference_in_means`` за один потоковый проход по файлам.
+
+    Источники — как у ``iter_chunks``. Пиковая память — один чанк
+    ``y``/``t`` плюс временные массивы ``Moments.of`` того же размера,
+    независимо от длины файла.
+
+    Examples
+    --------
+    >>> np.save("y.npy", y); np.save("t.npy", t)
+    >>> chunked_difference_in_means("y.npy", "t.npy", chunk_size=10**6)
+    Estimate(estimand='ATE', estimate=0.05..., ...)
+    """
+    treated, control = chunked_moments(iter_chunks(y, t, chunk_size, columns))
+    return from_moments(treated, control, estimand, level)
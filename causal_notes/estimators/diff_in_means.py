@@ -0,0 +1,204 @@
+"""
+Разность средних: ATE и ATT
+===========================
+
+Оценки из ``lectures/01_ci_basics.md`` для рандомизированного
+эксперимента. Наблюдаемый исход ``Y = T·Y₁ + (1 − T)·Y₀``, поэтому
+
+    τ̂ = Ȳ(T=1) − Ȳ(T=0)
+
+несмещённо оценивает и ATE = E[Y₁ − Y₀], и ATT = E[Y₁ − Y₀ | T=1]:
+при рандомизации леченые — случайная выборка из совокупности, поэтому
+совпадают и оценки, и их дисперсии (см. ``from_moments``).
+
+Массивы проходятся блоками по ``block_size`` строк: входные данные не
+копируются (срезы — view), float32 накапливается во float64, временная
+память ограничена блоком — на 10⁸ строк это ~10 MB, а не гигабайты.
+
+    from causal_notes.estimators import ate, att
+
+    est = ate(y, t)               # y: float32/float64, t: bool или 0/1
+    est.estimate, est.se, est.ci
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from statistics import NormalDist
+from typing import TYPE_CHECKING, Literal
+
+from causal_notes.estimators.moments import Moments
+
+if TYPE_CHECKING:
+    import numpy as np
+
+Estimand = Literal["ATE", "ATT"]
+
+# Строк в блоке: 2**20 × (8 B float64 + 1 B маска) ≈ 9 MB временной памяти
+BLOCK_SIZE = 1 << 20
+
+
+@dataclass(frozen=True)
+class Estimate:
+    """Точечная оценка, стандартная ошибка и доверительный интервал.
+
+    Attributes
+    ----------
+    estimand : "ATE" | "ATT"
+    estimate : float
+        Разность средних ``Ȳ₁ − Ȳ₀``.
+    se : float
+        Стандартная ошибка Неймана.
+    ci : tuple[float, float]
+        Нормальный интервал уровня ``level``.
+    treated, control : Moments
+        Достаточные статистики групп — по ним оценку можно пересчитать
+        или объединить с другими данными.
+    """
+
+    estimand: str
+    estimate: float
+    se: float
+    ci: tuple[float, float]
+    level: float
+    treated: Moments
+    control: Moments
+
+    @property
+    def n_treated(self) -> int:
+        return self.treated.n
+
+    @property
+    def n_control(self) -> int:
+        return self.control.n
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def from_moments(
+    treated: Moments,
+    control: Moments,
+    estimand: Estimand = "ATE",
+    level: float = 0.95,
+) -> Estimate:
+    """Оценка по достаточным статистикам групп.
+
+    Parameters
+    ----------
+    treated, control : Moments
+        ``(n, Ȳ, M2)`` групп ``T=1`` и ``T=0``.
+    estimand : "ATE" | "ATT"
+        Метка результата; при рандомизации оценка и дисперсия одни и те же.
+    level : float
+        Уровень доверия интервала.
+
+    Notes
+    -----
+    Консервативная дисперсия Неймана (Imbens & Rubin, 2015, §6.5):
+
+        V̂ = s₁² / n₁ + s₀² / n₀
+
+    Для ATT совокупности E[Y₁ − Y₀ | T=1] она та же: ``Ȳ₁`` — выборочное
+    среднее ``Y₁`` леченых, и при неоднородном эффекте его разброс ``s₁²``
+    входит в дисперсию наравне с ``s₀²``.
+    """
+    if estimand not in ("ATE", "ATT"):
+        raise ValueError(f"unknown estimand {estimand!r}; expected 'ATE' or 'ATT'")
+    if not 0 < level < 1:
+        raise ValueError(f"level must be in (0, 1), got {level}")
+    for name, arm in (("treated", treated), ("control", control)):
+        if arm.n < 2:
+            raise ValueError(f"need at least 2 {name} units, got {arm.n}")
+
+    tau = treated.mean - control.mean
+    se = (treated.variance / treated.n + control.variance / control.n) ** 0.5
+    z = NormalDist().inv_cdf((1 + level) / 2)
+    return Estimate(
+        estimand, tau, se, (tau - z * se, tau + z * se), level, treated, control
+    )
+
+
+def _treated_mask(t: "np.ndarray") -> "np.ndarray":
+    """Маска ``T=1`` для блока: bool — как есть (view), 0/1 — сравнение."""
+    import numpy as np
+
+    if t.dtype == np.bool_:
+        return t
+    mask = t == 1
+    if np.count_nonzero(t) != np.count_nonzero(mask):
+        raise ValueError("treatment must be boolean or contain only 0 and 1")
+    return mask
+
+
+def _check(y: "np.ndarray", t: "np.ndarray") -> None:
+    if y.ndim != 1 or t.ndim != 1:
+        raise ValueError(f"y and t must be 1-D, got shapes {y.shape} and {t.shape}")
+    if y.shape != t.shape:
+        raise ValueError(f"y and t differ in length: {len(y)} vs {len(t)}")
+    if y.dtype.kind != "f":
+        raise TypeError(f"y must be float32 or float64, got {y.dtype}")
+
+
+def arm_moments(
+    y: "np.ndarray",
+    t: "np.ndarray",
+    block_size: int = BLOCK_SIZE,
+) -> tuple[Moments, Moments]:
+    """``(treated, control)`` за один проход по блокам ``block_size``."""
+    _check(y, t)
+    treated = control = Moments()
+    for start in range(0, len(y), block_size):
+        yb = y[start : start + block_size]
+        mask = _treated_mask(t[start : start + block_size])
+        treated += Moments.of(yb[mask])
+        control += Moments.of(yb[~mask])
+    return treated, control
+
+
+def difference_in_means(
+    y: "np.ndarray",
+    t: "np.ndarray",
+    estimand: Estimand = "ATE",
+    level: float = 0.95,
+    block_size: int = BLOCK_SIZE,
+) -> Estimate:
+    """Разность средних с дисперсией Неймана и нормальным интервалом.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        Наблюдаемые исходы, 1-D float32 или float64. Не копируется:
+        C-непрерывный массив, ``np.memmap`` или срез подаются как есть.
+    t : np.ndarray
+        Назначение лечения: bool или целые 0/1 той же длины.
+    estimand : "ATE" | "ATT"
+    level : float
+        Уровень доверия (0.95 — 95%-й интервал).
+    block_size : int
+        Строк на блок; определяет временную память, не результат.
+
+    Returns
+    -------
+    Estimate
+
+    Examples
+    --------
+    >>> rng = np.random.default_rng(0)
+    >>> t = rng.random(10**6) < 0.5
+    >>> y = (rng.normal(size=10**6) + 0.1 * t).astype(np.float32)
+    >>> difference_in_means(y, t).ci
+    (0.096..., 0.104...)
+    """
+    treated, control = arm_moments(y, t, block_size)
+    return from_moments(treated, control, estimand, level)
+
+
+def ate(y: "np.ndarray", t: "np.ndarray", **kwargs) -> Estimate:
+    """ATE = E[Y₁ − Y₀] — см. ``difference_in_means``."""
+    return difference_in_means(y, t, "ATE", **kwargs)
+
+
+def att(y: "np.ndarray", t: "np.ndarray", **kwargs) -> Estimate:
+    """ATT = E[Y₁ − Y₀ | T=1] — см. ``difference_in_means``."""
+    return difference_in_means(y, t, "ATT", **kwargs)
@@ -0,0 +1,72 @@
+"""
+Достаточные статистики одной группы
+===================================
+
+Разность средних и её дисперсия Неймана зависят от данных только через
+``(n, среднее, M2)`` каждой группы, где ``M2 = Σ (y − ȳ)²``. Эти тройки
+складываются по формуле Chan et al. (1979) без потери точности, поэтому
+одна и та же ``Moments`` служит и блоку массива в памяти, и чанку файла,
+и шарду из другого процесса:
+
+    from causal_notes.estimators.moments import Moments
+
+    m = Moments.of(y[:1000]) + Moments.of(y[1000:])
+    m.mean, m.variance          # как у np.mean(y), np.var(y, ddof=1)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass(frozen=True)
+class Moments:
+    """``n``, среднее и ``M2`` выборки; ``Moments()`` — пустая выборка."""
+
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    @classmethod
+    def of(cls, y: "np.ndarray") -> "Moments":
+        """Моменты массива в два прохода, накопление во float64.
+
+        ``y`` не копируется целиком: float32 приводится к float64
+        буферами внутри редукции, отклонения ``y − ȳ`` — временный
+        массив размера ``y`` (вызывающий код подаёт блоки).
+        """
+        import numpy as np
+
+        n = int(y.size)
+        if n == 0:
+            return cls()
+        mean = float(y.sum(dtype=np.float64)) / n
+        d = y - mean if y.dtype == np.float64 else y.astype(np.float64) - mean
+        return cls(n, mean, float(np.dot(d, d)))
+
+    def merge(self, other: "Moments") -> "Moments":
+        """Объединить две выборки (Chan, Golub & LeVeque, 1979)."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.n / n
+        m2 = self.m2 + other.m2 + delta * delta * self.n * other.n / n
+        return Moments(n, mean, m2)
+
+    __add__ = merge
+
+    @property
+    def variance(self) -> float:
+        """Выборочная дисперсия (``ddof=1``); ``nan`` при ``n < 2``."""
+        return self.m2 / (self.n - 1) if self.n > 1 else float("nan")
+
+    @property
+    def total(self) -> float:
+        return self.n * self.mean
@@ -0,0 +1,193 @@
+"""
+Онлайн-оценка эффекта по потоку событий
+=======================================
+
+Дашборду не нужно пересчитывать τ, ATE и ATT по всей истории: каждое
+событие ``(y, t)`` обновляет ``(n, Ȳ, M2)`` своей группы (Welford),
+пачки и шарды сливаются по Chan — результат тот же, что у
+``difference_in_means`` на объединённых данных.
+
+  • ``ArmAccumulator`` — одна группа: ``add`` (событие), ``update``
+    (массив), ``merge``, ``snapshot`` → ``Moments``;
+  • ``OnlineATE`` — пара групп, ``snapshot`` → ``Estimate``;
+  • ``consume`` — asyncio-потребитель async-итератора событий.
+
+Объекты маленькие (три числа на группу) и сериализуются ``pickle`` —
+шарды из процессов пула объединяются ``merge``:
+
+    def shard(path):
+        acc = OnlineATE()
+        for y, t in read_events(path):
+            acc.update(y, t)
+        return acc
+
+    with ProcessPoolExecutor() as pool:
+        total = functools.reduce(OnlineATE.merge, pool.map(shard, paths))
+    total.snapshot("ATT")
+"""
+
+from __future__ import annotations
+
+import inspect
+from collections.abc import AsyncIterable, Callable
+from typing import TYPE_CHECKING, Any
+
+from causal_notes.estimators.diff_in_means import (
+    Estimand,
+    Estimate,
+    arm_moments,
+    from_moments,
+)
+from causal_notes.estimators.moments import Moments
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class ArmAccumulator:
+    """Изменяемые ``(n, Ȳ, M2)`` одной группы."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0) -> None:
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float) -> None:
+        """Одно наблюдение — шаг Welford, без NumPy."""
+        # np.float32 иначе протащил бы float32 в mean/m2 до конца потока
+        value = float(value)
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def update(self, batch: "np.ndarray | Moments") -> None:
+        """Пачка наблюдений (массив) или готовые ``Moments``."""
+        m = batch if isinstance(batch, Moments) else Moments.of(batch)
+        self._absorb(m.n, m.mean, m.m2)
+
+    def merge(self, other: "ArmAccumulator") -> "ArmAccumulator":
+        """Влить ``other`` (например, шард другого процесса); вернуть ``self``."""
+        self._absorb(other.n, other.mean, other.m2)
+        return self
+
+    def _absorb(self, n: int, mean: float, m2: float) -> None:
+        merged = self.snapshot().merge(Moments(n, mean, m2))
+        self.n, self.mean, self.m2 = merged.n, merged.mean, merged.m2
+
+    def snapshot(self) -> Moments:
+        """Неизменяемый снимок текущего состояния."""
+        return Moments(self.n, self.mean, self.m2)
+
+    def __getstate__(self) -> tuple[int, float, float]:
+        return self.n, self.mean, self.m2
+
+    def __setstate__(self, state: tuple[int, float, float]) -> None:
+        self.n, self.mean, self.m2 = state
+
+    def __repr__(self) -> str:
+        return f"ArmAccumulator(n={self.n}, mean={self.mean!r}, m2={self.m2!r})"
+
+
+class OnlineATE:
+    """Накопитель разности средних: группа ``T=1`` и группа ``T=0``.
+
+    Examples
+    --------
+    >>> acc = OnlineATE()
+    >>> for y, t in events:
+    ...     acc.add(y, t)
+    >>> acc.update(y_batch, t_batch)
+    >>> acc.snapshot().ci
+    """
+
+    __slots__ = ("treated", "control")
+
+    def __init__(
+        self,
+        treated: ArmAccumulator | None = None,
+        control: ArmAccumulator | None = None,
+    ) -> None:
+        self.treated = treated or ArmAccumulator()
+        self.control = control or ArmAccumulator()
+
+    def add(self, y: float, t: bool | int) -> None:
+        """Одно событие."""
+        (self.treated if t else self.control).add(y)
+
+    def update(self, y: "np.ndarray", t: "np.ndarray") -> None:
+        """Пачка событий: массивы как у ``difference_in_means``."""
+        treated, control = arm_moments(y, t, block_size=max(len(y), 1))
+        self.treated.update(treated)
+        self.control.update(control)
+
+    def merge(self, other: "OnlineATE") -> "OnlineATE":
+        """Влить шард ``other``; вернуть ``self`` (удобно для ``reduce``)."""
+        self.treated.merge(other.treated)
+        self.control.merge(other.control)
+        return self
+
+    @property
+    def n(self) -> int:
+        return self.treated.n + self.control.n
+
+    @property
+    def ready(self) -> bool:
+        """В каждой группе не меньше двух наблюдений — ``snapshot`` возможен."""
+        return self.treated.n > 1 and self.control.n > 1
+
+    def snapshot(self, estimand: Estimand = "ATE", level: float = 0.95) -> Estimate:
+        """Текущая оценка; ``ValueError``, пока не ``ready``."""
+        return from_moments(
+            self.treated.snapshot(), self.control.snapshot(), estimand, level
+        )
+
+    def __getstate__(self) -> tuple[ArmAccumulator, ArmAccumulator]:
+        return self.treated, self.control
+
+    def __setstate__(self, state: tuple[ArmAccumulator, ArmAccumulator]) -> None:
+        self.treated, self.control = state
+
+    def __repr__(self) -> str:
+        return f"OnlineATE(treated={self.treated!r}, control={self.control!r})"
+
+
+async def consume(
+    events: AsyncIterable[tuple[Any, Any]],
+    accumulator: OnlineATE | None = None,
+    *,
+    every: int = 0,
+    callback: Callable[[Estimate], Any] | None = None,
+    estimand: Estimand = "ATE",
+) -> OnlineATE:
+    """Читать ``(y, t)`` из async-итератора до конца и вернуть накопитель.
+
+    Элемент — одно событие (числа) или пачка (два массива). Каждые
+    ``every`` событий, когда оценка уже определена, вызывается
+    ``callback(snapshot)``; корутина-callback ожидается. Отмена задачи
+    оставляет ``accumulator`` согласованным — его можно досчитать позже.
+
+    Examples
+    --------
+    >>> async def dashboard(queue):
+    ...     acc = OnlineATE()
+    ...     await consume(queue_iter(queue), acc, every=10_000, callback=push)
+    """
+    acc = accumulator if accumulator is not None else OnlineATE()
+    seen = 0
+    next_report = every
+    async for y, t in events:
+        if isinstance(y, (int, float)) or getattr(y, "ndim", 1) == 0:
+            acc.add(y, t)
+            seen += 1
+        else:
+            acc.update(y, t)
+            seen += len(y)
+        if callback is not None and every and seen >= next_report and acc.ready:
+            result = callback(acc.snapshot(estimand))
+            if inspect.isawaitable(result):
+                await result
+            next_report = seen + every
+    return acc
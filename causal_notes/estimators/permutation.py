@@ -0,0 +1,322 @@
+"""
+Рандомизационный тест Фишера
+============================
+
+Острая нулевая гипотеза ``Y₁ = Y₀`` для каждого объекта делает все
+исходы известными при любом назначении, поэтому распределение τ̂ при
+H₀ получается перерандомизацией ``T`` — так, как назначали в
+эксперименте (полная рандомизация или внутри страт/блоков).
+
+  • перерандомизации генерируются пачкой — тензор индексов
+    ``(batch, strata, m_s)`` леченых (или контрольных, если их меньше);
+    страты одинакового размера и с одинаковым числом леченых
+    обрабатываются вместе (matched pairs — один ``(batch, k, 1)``);
+  • τ* всей пачки — одна выборка ``y[idx]`` и сумма по последней оси;
+  • пачки считаются в пуле процессов с независимыми
+    ``SeedSequence.spawn``; результат при данном ``seed`` не зависит
+    от числа процессов;
+  • остановка — когда ширина доверительного интервала Монте-Карло для p
+    не больше ``precision`` (или интервал не содержит ``alpha``).
+
+    from causal_notes.estimators.permutation import permutation_test
+
+    res = permutation_test(y, t, strata=block_id, precision=0.002, seed=0)
+    res.p_value, res.permutations
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import TYPE_CHECKING, Literal
+
+from causal_notes.estimators.diff_in_means import _check, _treated_mask
+
+if TYPE_CHECKING:
+    import numpy as np
+
+Alternative = Literal["two-sided", "greater", "less"]
+
+# Элементов в одной пачке: 2**24 ключей float64 ≈ 128 MB
+BATCH_ELEMENTS = 1 << 24
+# Страты до этого размера перемешиваются целиком, крупнее — argpartition ключей
+SMALL_STRATUM = 64
+
+
+@dataclass(frozen=True)
+class PermutationResult:
+    """Итог теста.
+
+    Attributes
+    ----------
+    statistic : float
+        Наблюдаемая разность средних (при стратах — взвешенная
+        ``Σ n_s/n · τ̂_s``).
+    p_value : float
+        ``(hits + 1) / (permutations + 1)`` — корректный p-value
+        Монте-Карло.
+    p_interval : tuple[float, float]
+        Интервал ошибки Монте-Карло для p уровня ``level``.
+    stopped_early : bool
+        Остановлено по точности до исчерпания ``max_permutations``.
+    """
+
+    statistic: float
+    p_value: float
+    p_interval: tuple[float, float]
+    permutations: int
+    hits: int
+    alternative: str
+    strata: int
+    stopped_early: bool
+
+
+@dataclass(frozen=True)
+class _Group:
+    """Страты одного размера ``size`` с одинаковым числом леченых ``treated``."""
+
+    offsets: "np.ndarray"  # начало каждой страты в упорядоченном y
+    totals: "np.ndarray"  # Σ y каждой страты
+    size: int
+    treated: int
+    weight: float  # size / n
+
+
+def _design(
+    y: "np.ndarray", mask: "np.ndarray", strata: "np.ndarray | None"
+) -> tuple["np.ndarray", list[_Group], float]:
+    """Упорядочить строки по стратам, сгруппировать страты, посчитать τ̂."""
+    import numpy as np
+
+    n = len(y)
+    if strata is None:
+        labels = np.zeros(n, dtype=np.intp)
+    else:
+        strata = np.asarray(strata)
+        if strata.shape != y.shape:
+            raise ValueError(f"strata must have shape {y.shape}, got {strata.shape}")
+        _, labels = np.unique(strata, return_inverse=True)
+    order = np.argsort(labels, kind="stable")
+    ordered = y[order].astype(np.float64)
+    sizes = np.bincount(labels)
+    treated = np.bincount(labels, weights=mask).astype(np.intp)
+    if ((treated == 0) | (treated == sizes)).any():
+        raise ValueError(
+            "every stratum needs at least one treated and one control unit"
+        )
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    totals = np.add.reduceat(ordered, offsets)
+    t1 = np.bincount(labels, weights=np.where(mask, y, 0.0))
+
+    groups = []
+    observed = 0.0
+    for size, m in sorted(set(zip(sizes.tolist(), treated.tolist()))):
+        sel = (sizes == size) & (treated == m)
+        groups.append(_Group(offsets[sel], totals[sel], size, m, size / n))
+        diff = t1[sel] / m - (totals[sel] - t1[sel]) / (size - m)
+        observed += size / n * float(diff.sum())
+    return ordered, groups, observed
+
+
+def _subsets(
+    rng: "np.random.Generator", size: int, side: int, shape: tuple[int, int]
+) -> "np.ndarray":
+    """Равновероятные подмножества ``side`` из ``range(size)``: ``(*shape, side)``."""
+    import numpy as np
+
+    if side == 1:
+        # Пары и «один из k»: перестановка не нужна — один равномерный индекс
+        return rng.integers(0, size, (*shape, 1), dtype=np.int32)
+    if size <= SMALL_STRATUM:
+        idx = np.tile(np.arange(size, dtype=np.int32), (*shape, 1))
+        rng.permuted(idx, axis=-1, out=idx)
+        return idx[..., :side]
+    # Большие страты: side наименьших случайных ключей — O(size), а не shuffle
+    keys = rng.random((*shape, size))
+    return np.argpartition(keys, side - 1, axis=-1)[..., :side]
+
+
+def _batch(
+    y: "np.ndarray",
+    groups: list[_Group],
+    seed: "np.random.SeedSequence",
+    size: int,
+) -> "np.ndarray":
+    """τ* для ``size`` перерандомизаций — по одной выборке на группу страт."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    out = np.zeros(size)
+    for g in groups:
+        # Суммируем меньшую из групп: её индексы — случайное подмножество страты
+        side = min(g.treated, g.size - g.treated)
+        idx = _subsets(rng, g.size, side, (size, len(g.offsets)))
+        picked = y[idx + g.offsets[None, :, None]].sum(axis=-1)
+        s1 = picked if side == g.treated else g.totals - picked
+        diff = s1 / g.treated - (g.totals - s1) / (g.size - g.treated)
+        out += g.weight * diff.sum(axis=-1)
+    return out
+
+
+_WORKER_DATA: tuple["np.ndarray", list[_Group]] | None = None
+
+
+def _init_worker(y: "np.ndarray", groups: list[_Group]) -> None:
+    global _WORKER_DATA
+    _WORKER_DATA = (y, groups)
+
+
+def _pool_batch(seed: "np.random.SeedSequence", size: int) -> "np.ndarray":
+    y, groups = _WORKER_DATA
+    return _batch(y, groups, seed, size)
+
+
+def _extreme(taus: "np.ndarray", observed: float, alternative: str) -> int:
+    import numpy as np
+
+    # Допуск на округление: перестановка, совпадающая с наблюдаемой, — «не реже»
+    tol = 1e-12 * max(1.0, abs(observed))
+    if alternative == "greater":
+        hits = taus >= observed - tol
+    elif alternative == "less":
+        hits = taus <= observed + tol
+    else:
+        hits = np.abs(taus) >= abs(observed) - tol
+    return int(np.count_nonzero(hits))
+
+
+def permutation_test(
+    y: "np.ndarray",
+    t: "np.ndarray",
+    strata: "np.ndarray | None" = None,
+    *,
+    alternative: Alternative = "two-sided",
+    precision: float = 0.005,
+    alpha: float | None = None,
+    level: float = 0.99,
+    max_permutations: int = 100_000,
+    batch_size: int | None = None,
+    seed: "int | np.random.SeedSequence | None" = None,
+    workers: int | None = None,
+) -> PermutationResult:
+    """p-value Фишера для разности средних при острой нулевой гипотезе.
+
+    Parameters
+    ----------
+    y, t : np.ndarray
+        Как у ``difference_in_means``.
+    strata : np.ndarray | None
+        Метки страт/блоков (любой тип); ``T`` перемешивается внутри каждой,
+        число леченых в страте сохраняется. Статистика — ``Σ n_s/n · τ̂_s``.
+        None — полная рандомизация.
+    alternative : "two-sided" | "greater" | "less"
+    precision : float
+        Остановиться, когда полуширина интервала Монте-Карло для p
+        уровня ``level`` не больше ``precision``.
+    alpha : float | None
+        Дополнительно остановиться, как только интервал для p не содержит
+        ``alpha`` — решение на этом уровне уже не изменится.
+    max_permutations : int
+        Верхняя граница числа перерандомизаций.
+    batch_size : int | None
+        Перерандомизаций в пачке; по умолчанию — чтобы пачка занимала
+        ~``BATCH_ELEMENTS`` элементов.
+    seed : int | SeedSequence | None
+        Корень потоков пачек.
+    workers : int | None
+        Процессов пула; ``1`` — в текущем процессе.
+
+    Returns
+    -------
+    PermutationResult
+
+    Examples
+    --------
+    >>> res = permutation_test(y, t, strata=pair_id, alpha=0.05, seed=0)
+    >>> res.p_value, res.stopped_early
+    (0.0121..., True)
+    """
+    import numpy as np
+
+    if alternative not in ("two-sided", "greater", "less"):
+        raise ValueError(
+            f"unknown alternative {alternative!r}; "
+            "expected 'two-sided', 'greater' or 'less'"
+        )
+    if not 0 < precision < 1:
+        raise ValueError(f"precision must be in (0, 1), got {precision}")
+    _check(y, t)
+    ordered, groups, observed = _design(y, _treated_mask(t), strata)
+
+    n = len(y)
+    if batch_size is None:
+        batch_size = max(1, min(4096, BATCH_ELEMENTS // n))
+    sizes = [
+        min(batch_size, max_permutations - s)
+        for s in range(0, max_permutations, batch_size)
+    ]
+    root = (
+        seed
+        if isinstance(seed, np.random.SeedSequence)
+        else np.random.SeedSequence(seed)
+    )
+    seeds = root.spawn(len(sizes))
+    z = NormalDist().inv_cdf((1 + level) / 2)
+
+    hits = done = 0
+    stopped = False
+
+    def consume(taus: "np.ndarray") -> bool:
+        """Учесть пачку; True — p определён с нужной точностью."""
+        nonlocal hits, done
+        hits += _extreme(taus, observed, alternative)
+        done += len(taus)
+        p = (hits + 1) / (done + 1)
+        half = z * math.sqrt(p * (1 - p) / done)
+        resolved = alpha is not None and (p + half < alpha or p - half > alpha)
+        return half <= precision or resolved
+
+    workers = min(workers or os.cpu_count() or 1, len(sizes))
+    if workers == 1:
+        for s, size in zip(seeds, sizes):
+            if consume(_batch(ordered, groups, s, size)):
+                stopped = done < max_permutations
+                break
+    else:
+        # Окно из 2 × workers пачек; результаты — строго по порядку пачек
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(ordered, groups),
+        ) as pool:
+            jobs = iter(zip(seeds, sizes))
+            pending = [
+                pool.submit(_pool_batch, *job)
+                for job in itertools.islice(jobs, 2 * workers)
+            ]
+            while pending:
+                if consume(pending.pop(0).result()):
+                    stopped = done < max_permutations
+                    for f in pending:
+                        f.cancel()
+                    break
+                job = next(jobs, None)
+                if job is not None:
+                    pending.append(pool.submit(_pool_batch, *job))
+
+    p = (hits + 1) / (done + 1)
+    half = z * math.sqrt(p * (1 - p) / done)
+    return PermutationResult(
+        observed,
+        p,
+        (max(0.0, p - half), min(1.0, p + half)),
+        done,
+        hits,
+        alternative,
+        sum(len(g.offsets) for g in groups),
+        stopped,
+    )
@@ -0,0 +1,248 @@
+"""
+Пакетный рендер фигур
+=====================
+
+``render_many`` раздаёт функции-построители фигур по пулу процессов:
+pyplot фактически однопоточен, поэтому пропускная способность растёт
+только с числом процессов.
+
+Каждый воркер один раз при старте переключается на Agg и вызывает
+``set_theme``, затем для каждой фигуры: build → ``savefig`` → ``plt.close``.
+Ошибка одной фигуры не роняет пакет — она возвращается в ``RenderResult``;
+после падения воркера фигуры сломанных чанков перезапускаются по одной,
+и ошибкой помечается только фигура, уронившая процесс.
+
+    from causal_notes.viz.batch import render_many
+
+    results = render_many([plot_ate, plot_att], ["ate", "att"],
+                          outdir="assets/figures", style="light")
+    failed = [r for r in results if not r.ok]
+
+Построители должны быть picklable: функции уровня модуля или
+``functools.partial`` от них.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import pickle
+import time
+import traceback
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    import matplotlib as mpl
+
+# Соль для id элементов SVG: одинаковые фигуры → побайтно одинаковые файлы
+_SVG_HASHSALT = "causalviz"
+
+
+@dataclass
+class RenderResult:
+    """Результат рендера одной фигуры.
+
+    Attributes
+    ----------
+    name : str
+    paths : list[Path]
+        Сохранённые файлы (пусто при ошибке).
+    build_time, save_time : float
+        Время построения фигуры и её экспорта (с).
+    error : str | None
+        Traceback, если построение или сохранение упало.
+    """
+
+    name: str
+    paths: list[Path] = field(default_factory=list)
+    build_time: float = 0.0
+    save_time: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _init_worker(style: str, usetex: bool, fontsize: int | None) -> None:
+    """Инициализация процесса: Agg + тема + детерминированные метаданные."""
+    # Дата в SVG/PDF берётся из SOURCE_DATE_EPOCH
+    os.environ.setdefault("SOURCE_DATE_EPOCH", "0")
+
+    import matplotlib as mpl
+
+    mpl.use("Agg")
+    from causal_notes.viz.theme import set_theme
+
+    set_theme(style, usetex=usetex, fontsize=fontsize)  # type: ignore[arg-type]
+    mpl.rcParams["svg.hashsalt"] = _SVG_HASHSALT
+
+
+def _render_one(
+    task: tuple[Callable[[], "mpl.figure.Figure"], str],
+    outdir: str,
+    formats: tuple[str, ...],
+    kwargs: dict,
+) -> RenderResult:
+    import matplotlib.pyplot as plt
+
+    from causal_notes.viz.theme import savefig
+
+    build, name = task
+    result = RenderResult(name=name)
+    fig = None
+    try:
+        start = time.perf_counter()
+        fig = build()
+        result.build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result.paths = savefig(fig, name, outdir, formats, **kwargs)
+        result.save_time = time.perf_counter() - start
+    except Exception:
+        result.error = traceback.format_exc()
+    finally:
+        if fig is not None:
+            plt.close(fig)
+    return result
+
+
+def _render_chunk(
+    chunk: list[tuple[Callable[[], "mpl.figure.Figure"], str]],
+    outdir: str,
+    formats: tuple[str, ...],
+    kwargs: dict,
+) -> list[RenderResult]:
+    return [_render_one(task, outdir, formats, kwargs) for task in chunk]
+
+
+def _run_chunks(
+    chunks: list[list[tuple[Callable[[], "mpl.figure.Figure"], str]]],
+    workers: int,
+    initargs: tuple,
+    args: tuple,
+) -> list[list[RenderResult] | BrokenProcessPool]:
+    """Чанки в пуле процессов; исключение чанка — записи об ошибке его фигур.
+
+    ``BrokenProcessPool`` возвращается как есть, чтобы вызывающий мог
+    перезапустить фигуры чанка; ошибкой он становится, только если в пуле
+    была одна фигура — тогда виновник известен.
+    """
+    if not chunks:
+        return []
+    out: list[list[RenderResult] | BrokenProcessPool] = []
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        initializer=_init_worker,
+        initargs=initargs,
+    ) as pool:
+        futures = [pool.submit(_render_chunk, chunk, *args) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                out.append(future.result())
+            except BrokenProcessPool as exc:
+                if len(chunks) == 1 and len(chunk) == 1:
+                    error = traceback.format_exc()
+                    out.append([RenderResult(name=n, error=error) for _, n in chunk])
+                else:
+                    out.append(exc)
+            except Exception:
+                error = traceback.format_exc()
+                out.append([RenderResult(name=n, error=error) for _, n in chunk])
+    return out
+
+
+def render_many(
+    builders: Sequence[Callable[[], "mpl.figure.Figure"]],
+    names: Sequence[str],
+    outdir: str | Path = ".",
+    style: Literal["dark", "light", "print"] = "dark",
+    usetex: bool = False,
+    fontsize: int | None = None,
+    formats: tuple[str, ...] = ("svg", "png"),
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+    **kwargs,
+) -> list[RenderResult]:
+    """Построить и сохранить фигуры в пуле процессов.
+
+    Parameters
+    ----------
+    builders : sequence of callables
+        Функции без аргументов, возвращающие ``Figure``.
+    names : sequence of str
+        Имена файлов (без расширения), по одному на построитель.
+    outdir : str | Path
+        Директория для всех фигур.
+    style, usetex, fontsize
+        Тема — ``set_theme`` вызывается один раз в каждом воркере.
+    formats : tuple
+        Форматы для ``savefig``.
+    max_workers : int | None
+        Число процессов. По умолчанию ``os.cpu_count()``.
+    chunksize : int | None
+        Фигур в одной задаче воркера. По умолчанию — ~4 задачи на процесс,
+        чтобы амортизировать pickle и не терять балансировку.
+    **kwargs
+        Дополнительные аргументы для ``savefig`` (например, ``cache``).
+
+    Returns
+    -------
+    list[RenderResult]
+        В том же порядке, что и ``builders``, независимо от порядка
+        завершения в воркерах.
+    """
+    if len(builders) != len(names):
+        raise ValueError(f"got {len(builders)} builders but {len(names)} names")
+    if len(set(names)) != len(names):
+        raise ValueError("figure names must be unique")
+    if not builders:
+        return []
+
+    Path(outdir).mkdir(parents=True, exist_ok=True)
+    results: dict[str, RenderResult] = {}
+    tasks = []
+    for build, name in zip(builders, names):
+        # Непиклуемый построитель иначе уронил бы весь чанк при submit
+        try:
+            pickle.dumps(build)
+        except Exception:
+            results[name] = RenderResult(name=name, error=traceback.format_exc())
+        else:
+            tasks.append((build, name))
+
+    workers = max_workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(tasks) / (workers * 4)))
+    chunks = [tasks[i : i + chunksize] for i in range(0, len(tasks), chunksize)]
+
+    initargs = (style, usetex, fontsize)
+    args = (str(outdir), formats, kwargs)
+    retry = []
+    for chunk, done in zip(chunks, _run_chunks(chunks, workers, initargs, args)):
+        if isinstance(done, BrokenProcessPool):
+            retry.extend(chunk)
+        else:
+            results.update((r.name, r) for r in done)
+    # Упавший воркер (OOM, segfault) ломает весь пул — невыполненные чанки
+    # получают BrokenProcessPool. Их фигуры перезапускаются по одной в
+    # общем пуле, пока каждый раунд что-то завершает; остаток раунда без
+    # прогресса — каждая фигура в своём процессе. Ошибкой помечается
+    # только фигура, которая падает сама
+    while retry:
+        singles = [[task] for task in retry]
+        runs = _run_chunks(singles, workers, initargs, args)
+        if len(singles) > 1 and all(isinstance(d, BrokenProcessPool) for d in runs):
+            runs = [_run_chunks([task], 1, initargs, args)[0] for task in singles]
+        retry = []
+        for single, done in zip(singles, runs):
+            if isinstance(done, BrokenProcessPool):
+                retry.extend(single)
+            else:
+                results.update((r.name, r) for r in done)
+    return [results[name] for name in names]
@@ -0,0 +1,381 @@
+"""
+Кэш экспорта фигур
+==================
+
+Контент-адресуемый кэш для ``savefig``: если ни данные фигуры, ни тема,
+ни параметры экспорта не изменились, повторный рендер не нужен.
+
+Ключ — ``figure_fingerprint``: хэш данных всех артистов (координаты,
+цвета, hatch, тексты), rcParams, форматов и dpi. Готовые файлы хранятся
+в ``root/<key>/``; ``manifest.json`` помнит размеры, время последнего
+использования и какой ключ лежит по каждому выходному пути.
+
+Кэш можно делить между процессами (воркеры ``render_many``, параллельные
+сборки): каждое изменение идёт под блокировкой ``root/.lock`` и
+применяется к только что перечитанному манифесту.
+
+    from causal_notes.viz.cache import FigureCache
+
+    cache = FigureCache("_freeze/figures", max_bytes=256 * 2**20)
+    savefig(fig, "ate_forest", "assets/figures", cache=cache)
+    cache.hits, cache.misses
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import matplotlib as mpl
+
+# Версия схемы ключа: поменять, если меняется набор хэшируемых полей
+_FINGERPRINT_VERSION = "3"
+
+# rc-ключи, не влияющие на результат экспорта
+_RC_SKIP = ("backend", "backend_fallback", "interactive", "savefig.directory")
+
+# Геттеры, общие для артистов разных типов (если метод есть у артиста)
+_GETTERS = (
+    "get_visible",
+    "get_zorder",
+    "get_alpha",
+    "get_clip_on",
+    "get_rasterized",
+    # данные
+    "get_xydata",
+    "get_offsets",
+    "get_array",
+    "get_sizes",
+    "get_text",
+    "get_position",
+    "get_extent",
+    "get_xlim",
+    "get_ylim",
+    "get_xscale",
+    "get_yscale",
+    "get_size_inches",
+    # стиль
+    "get_color",
+    "get_facecolor",
+    "get_edgecolor",
+    "get_linewidth",
+    "get_linestyle",
+    "get_marker",
+    "get_markersize",
+    "get_hatch",
+    "get_fontsize",
+    "get_fontweight",
+    "get_rotation",
+)
+
+
+def _feed(h: "hashlib._Hash", value: object) -> None:
+    import numpy as np
+
+    if isinstance(value, np.ndarray) or (
+        isinstance(value, (list, tuple)) and value and hasattr(value[0], "shape")
+    ):
+        arr = np.ma.getdata(np.asarray(value))
+        if arr.dtype != object:
+            h.update(f"{arr.dtype.str}{arr.shape}".encode())
+            h.update(np.ascontiguousarray(arr).tobytes())
+            return
+    h.update(repr(value).encode())
+    h.update(b"\0")
+
+
+def _feed_artist(
+    h: "hashlib._Hash", artist: "mpl.artist.Artist", layout: bool = False
+) -> None:
+    """Рекурсивно добавить артиста и его детей в хэш.
+
+    Результат не должен зависеть от того, рисовалась ли фигура: тики и
+    их подписи заполняются при отрисовке, а constrained layout двигает
+    оси. Поэтому оси координат (``Axis``) хэшируются по локаторам и
+    форматтерам, а ``Axes`` — по входам раскладки, которые отрисовка не
+    меняет: ячейке gridspec или исходному прямоугольнику ``add_axes``.
+    ``layout=True`` — геометрия вычисляется при отрисовке (spines,
+    легенда, колорбар).
+    """
+    from matplotlib.axes import Axes
+    from matplotlib.axis import Axis
+    from matplotlib.collections import Collection
+    from matplotlib.legend import Legend
+    from matplotlib.patches import Patch
+    from matplotlib.spines import Spine
+
+    h.update(type(artist).__qualname__.encode())
+    if isinstance(artist, Axis):
+        _feed(h, artist.get_scale())
+        _feed(h, artist.get_label().get_text())
+        # Сами тики зависят от размера осей после layout — хэшируем
+        # локаторы и форматтеры (с явными позициями/подписями, если заданы)
+        for ticker, attrs in (
+            (artist.get_major_locator(), ("locs",)),
+            (artist.get_minor_locator(), ("locs",)),
+            (artist.get_major_formatter(), ("seq", "fmt")),
+            (artist.get_minor_formatter(), ("seq", "fmt")),
+        ):
+            _feed(h, type(ticker).__qualname__)
+            for attr in attrs:
+                _feed(h, getattr(ticker, attr, None))
+        return
+
+    # Колорбар перестраивает свою сетку при отрисовке; его содержимое
+    # и так определяется mappable в основных осях
+    layout = (
+        layout
+        or isinstance(artist, (Legend, Spine))
+        or getattr(artist, "_colorbar", None) is not None
+    )
+    if isinstance(artist, Axes) and not layout:
+        spec = artist.get_subplotspec()
+        if spec is not None:
+            gs = spec.get_gridspec()
+            _feed(h, spec.get_geometry())
+            _feed(h, (gs.get_width_ratios(), gs.get_height_ratios()))
+        else:
+            _feed(h, artist.get_position(original=True).bounds)
+    if isinstance(artist, Collection):
+        # цвета из array/cmap вычисляются при отрисовке — сделать это сейчас
+        artist.update_scalarmappable()
+
+    for getter in _GETTERS:
+        if getter == "get_position" and (layout or isinstance(artist, Axes)):
+            continue
+        method = getattr(artist, getter, None)
+        if method is None:
+            continue
+        try:
+            value = method()
+        except (TypeError, ValueError, AttributeError, RuntimeError):
+            continue
+        _feed(h, value)
+    if layout:
+        pass
+    elif isinstance(artist, Patch):
+        _feed(h, artist.get_path().vertices)
+        _feed(h, artist.get_patch_transform().get_matrix())
+    elif hasattr(artist, "get_paths"):
+        _feed(h, [p.vertices for p in artist.get_paths()])
+
+    for child in artist.get_children():
+        _feed_artist(h, child, layout)
+
+
+def figure_fingerprint(
+    fig: "mpl.figure.Figure",
+    formats: tuple[str, ...] = ("svg", "png"),
+    **kwargs,
+) -> str:
+    """Стабильный хэш фигуры и параметров её экспорта.
+
+    Учитывает данные и стиль каждого артиста (в порядке обхода дерева),
+    текущие rcParams (в т.ч. активный профиль из ``_PROFILES``), форматы
+    и аргументы ``savefig`` (dpi и т.д.). Не зависит от ``id`` объектов,
+    поэтому совпадает между запусками процесса.
+    """
+    import matplotlib as mpl
+
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, (_FINGERPRINT_VERSION, mpl.__version__, tuple(formats)))
+    _feed(h, sorted((k, repr(v)) for k, v in kwargs.items()))
+    _feed(h, [(k, v) for k, v in mpl.rcParams.items() if k not in _RC_SKIP])
+
+    # Входы раскладки фигуры; сами позиции осей движутся при отрисовке
+    pars = fig.subplotpars
+    _feed(h, [getattr(pars, k) for k in ("left", "right", "bottom", "top")])
+    _feed(h, [getattr(pars, k) for k in ("wspace", "hspace")])
+    engine = fig.get_layout_engine()
+    if engine is not None:
+        _feed(h, (type(engine).__qualname__, sorted(engine.get().items())))
+
+    _feed_artist(h, fig)
+    return h.hexdigest()
+
+
+def _lock_file(f) -> None:
+    if os.name == "nt":
+        import msvcrt
+
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(f) -> None:
+    if os.name == "nt":
+        import msvcrt
+
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class FigureCache:
+    """Контент-адресуемое хранилище экспортированных фигур.
+
+    Parameters
+    ----------
+    root : str | Path
+        Каталог кэша (``manifest.json`` + ``<key>/`` с файлами).
+    max_bytes : int
+        Предел размера хранилища; при превышении удаляются записи,
+        которые дольше всего не использовались (LRU).
+
+    Attributes
+    ----------
+    hits, misses : int
+        Счётчики попаданий/промахов за время жизни объекта.
+    """
+
+    MANIFEST = "manifest.json"
+    LOCK = ".lock"
+
+    def __init__(self, root: str | Path, max_bytes: int = 512 * 2**20) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._manifest = self._load()
+
+    def __getstate__(self) -> dict:
+        # Для передачи в воркеры render_many: lock не сериализуется,
+        # манифест перечитывается с диска на стороне воркера
+        return {"root": self.root, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["root"], state["max_bytes"])
+
+    # ── manifest ────────────────────────────────────────────────────────────
+
+    def _load(self) -> dict:
+        try:
+            with open(self.root / self.MANIFEST, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+        manifest.setdefault("entries", {})
+        manifest.setdefault("outputs", {})
+        return manifest
+
+    def _save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f"{self.MANIFEST}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.root / self.MANIFEST)
+
+    @contextmanager
+    def _locked(self) -> Iterator[dict]:
+        """Межпроцессная блокировка с перечитанным манифестом внутри.
+
+        Другой процесс мог записать манифест после нашего ``_load`` —
+        изменения применяются к свежей копии, иначе ``_save`` затёр бы
+        чужие записи (и ``max_bytes`` не соблюдался бы для всех писателей).
+        """
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / self.LOCK, "a+b") as f:
+                _lock_file(f)
+                try:
+                    self._manifest = self._load()
+                    yield self._manifest
+                finally:
+                    _unlock_file(f)
+
+    # ── API ─────────────────────────────────────────────────────────────────
+
+    def fetch(self, key: str, paths: list[Path]) -> bool:
+        """Обеспечить наличие ``paths`` для ``key``; True — если из кэша.
+
+        Если файлы по ``paths`` уже записаны с этим ключом — ничего не
+        делает; если есть только копия в хранилище — копирует её.
+        """
+        with self._locked() as manifest:
+            entry = manifest["entries"].get(key)
+            outputs = manifest["outputs"]
+            if entry is None or not self._complete(key, entry, paths):
+                self.misses += 1
+                return False
+
+            for path in paths:
+                if outputs.get(str(path)) == key and path.exists():
+                    continue
+                path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(self._blob(key, path), path)
+                outputs[str(path)] = key
+
+            entry["last_used"] = time.time()
+            self.hits += 1
+            self._save()
+            return True
+
+    def store(self, key: str, paths: list[Path]) -> None:
+        """Положить свежеэкспортированные ``paths`` в хранилище."""
+        with self._locked() as manifest:
+            blob_dir = self.root / key
+            blob_dir.mkdir(parents=True, exist_ok=True)
+            files = {}
+            for path in paths:
+                shutil.copyfile(path, blob_dir / path.name)
+                files[path.name] = path.stat().st_size
+                manifest["outputs"][str(path)] = key
+
+            entry = manifest["entries"].setdefault(key, {"files": {}})
+            entry["files"].update(files)
+            entry["last_used"] = time.time()
+            self._evict()
+            self._save()
+
+    def size(self) -> int:
+        """Текущий размер хранилища (байт) по манифесту."""
+        return sum(sum(e["files"].values()) for e in self._manifest["entries"].values())
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._manifest["entries"]),
+            "bytes": self.size(),
+        }
+
+    # ── внутреннее ──────────────────────────────────────────────────────────
+
+    def _blob(self, key: str, path: Path) -> Path:
+        return self.root / key / path.name
+
+    def _complete(self, key: str, entry: dict, paths: list[Path]) -> bool:
+        return all(
+            p.name in entry["files"] and self._blob(key, p).exists() for p in paths
+        )
+
+    def _evict(self) -> None:
+        """LRU до ``max_bytes``; вызывается под ``_locked``."""
+        entries = self._manifest["entries"]
+        total = self.size()
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= sum(entries[key]["files"].values())
+            del entries[key]
+            shutil.rmtree(self.root / key, ignore_errors=True)
+            self._manifest["outputs"] = {
+                p: k for p, k in self._manifest["outputs"].items() if k != key
+            }
@@ -0,0 +1,306 @@
+"""
+Непрерывные колормапы профилей
+==============================
+
+Тепловые карты и плотности без явного ``cmap`` рисуются ``viridis``,
+который не знает о фонах темы: тёмный конец сливается с ``_DARK_BG``,
+светлый — с белой страницей. Здесь колормапы строятся из якорей
+``PALETTE`` с двумя ограничениями:
+
+  • светлота L* (CIELAB) меняется линейно — шаг данных даёт одинаковый
+    шаг воспринимаемой яркости; оттенок берётся от роли, насыщенность
+    уменьшается только там, где цвет выходит из гаммы sRGB;
+  • каждый цвет даёт контраст WCAG ≥ ``MIN_CONTRAST`` (3:1 для графики,
+    §1.4.11) против всех фонов профиля — диапазон L* выбирается по ним.
+
+Для каждого профиля: ``seq`` (treatment), по карте на роль и
+расходящаяся ``div`` (control ↔ treatment, центр — ближе всего к фону);
+у ``print`` — только серая ``seq``. ``set_theme`` при первом
+переключении на профиль строит его карты на ``LUT_SIZES[0]`` точек в
+памяти (без записи на диск), регистрирует их в matplotlib и ставит
+``image.cmap``; ``colormap`` и ``luts`` кэшируют таблицы всех
+``LUT_SIZES`` на диске как ``.npz``:
+
+    set_theme("dark")
+    ax.imshow(z)                               # causal_dark_seq
+    ax.pcolormesh(x, y, ate, cmap="causal_dark_div", norm=CenteredNorm())
+    colormap("outcome", n=1024)                # 1024 точки, профиль текущий
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from causal_notes.viz import color
+from causal_notes.viz.palette import BACKGROUNDS, default_cache_dir
+from causal_notes.viz.theme import (
+    _STYLES,
+    SERIES_ORDER,
+    Theme,
+    contrast_matrix,
+    current_theme,
+    relative_luminance,
+)
+
+if TYPE_CHECKING:
+    import matplotlib as mpl
+    import numpy as np
+
+# Поменять при изменении построения — старые таблицы в кэше не подойдут
+_CMAP_VERSION = "1"
+
+LUT_SIZES = (256, 1024)
+
+# WCAG 2.1 §1.4.11: графические объекты — 3:1 к соседнему цвету (фону)
+MIN_CONTRAST = 3.0
+
+# Запас по L* от границы контраста и дальний конец шкалы
+_L_MARGIN = 1.0
+_L_FAR = {"dark": 95.0, "light": 20.0}
+
+
+def cmap_names(style: str) -> list[str]:
+    """Короткие имена карт профиля (``"seq"``, ``"div"``, роли)."""
+    if style == "print":
+        return ["seq"]
+    return ["seq", "div", *SERIES_ORDER]
+
+
+def registered_name(name: str, style: str) -> str:
+    """Имя в реестре matplotlib: ``causal_<style>_<name>``."""
+    return f"causal_{style}_{name}"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Построение
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def _lightness(y: float) -> float:
+    """Относительная яркость Y → CIE L*."""
+    return 116 * y ** (1 / 3) - 16 if y > (6 / 29) ** 3 else y * (29 / 3) ** 3
+
+
+def lightness_range(style: str) -> tuple[float, float]:
+    """``(L* у фона, L* дальнего конца)`` — ближний конец ровно проходит 3:1."""
+    yb = relative_luminance(list(BACKGROUNDS[style]))
+    if yb.max() < 0.18:
+        # тёмный фон: светлее, чем (Y + 0.05) / (Yb + 0.05) = 3
+        near = _lightness(MIN_CONTRAST * (float(yb.max()) + 0.05) - 0.05)
+        return near + _L_MARGIN, _L_FAR["dark"]
+    near = _lightness((float(yb.min()) + 0.05) / MIN_CONTRAST - 0.05)
+    return near - _L_MARGIN, _L_FAR["light"]
+
+
+def _lch(hex_color: str) -> tuple[float, float, float]:
+    import numpy as np
+
+    L, a, b = color.rgb_to_lab([hex_color])[0]
+    return float(L), float(np.hypot(a, b)), float(np.arctan2(b, a))
+
+
+def _to_gamut(L: "np.ndarray", C: "np.ndarray", h: "np.ndarray") -> "np.ndarray":
+    """LCh → float sRGB; C уменьшается бисекцией, пока цвет не войдёт в гамму.
+
+    L* и оттенок сохраняются — поэтому сохраняются и линейность светлоты,
+    и контраст с фоном.
+    """
+    import numpy as np
+
+    def lab(scale):
+        return np.stack([L, C * scale * np.cos(h), C * scale * np.sin(h)], axis=-1)
+
+    def fits(scale):
+        linear = color.lab_to_linear(lab(scale))
+        return ((linear >= -1e-9) & (linear <= 1 + 1e-9)).all(axis=-1)
+
+    lo, hi = np.zeros_like(L), np.ones_like(L)
+    lo[fits(hi)] = 1.0
+    for _ in range(24):
+        mid = (lo + hi) / 2
+        ok = fits(mid)
+        lo, hi = np.where(ok, mid, lo), np.where(ok, hi, mid)
+    return color.lab_to_rgb(lab(lo))
+
+
+def sequential(anchor: str | None, style: str, n: int) -> "np.ndarray":
+    """Последовательная карта ``(n, 3)``: от фона к дальнему концу L*.
+
+    Насыщенность максимальна у светлоты якоря и спадает к концам;
+    ``anchor=None`` — серая шкала.
+    """
+    import numpy as np
+
+    near, far = lightness_range(style)
+    L = np.linspace(near, far, n)
+    if anchor is None:
+        return _to_gamut(L, np.zeros(n), np.zeros(n))
+    La, Ca, ha = _lch(anchor)
+    width = max(abs(near - La), abs(far - La)) + 5
+    C = Ca * np.clip(1 - ((L - La) / width) ** 2, 0, 1)
+    return _to_gamut(L, C, np.full(n, ha))
+
+
+def diverging(left: str, right: str, style: str, n: int) -> "np.ndarray":
+    """Расходящаяся карта ``(n, 3)``: серый центр у фона, концы — якоря.
+
+    Светлота и насыщенность симметричны по ``|t|``, поэтому половины
+    уравновешены: одинаковое отклонение — одинаковая заметность.
+    """
+    import numpy as np
+
+    near, _ = lightness_range(style)
+    (Ll, Cl, hl), (Lr, Cr, hr) = _lch(left), _lch(right)
+    t = np.linspace(-1, 1, n)
+    a = np.abs(t)
+    L = near + ((Ll + Lr) / 2 - near) * a
+    C = min(Cl, Cr) * a
+    h = np.where(t < 0, hl, hr)
+    return _to_gamut(L, C, h)
+
+
+def build(style: str, n: int) -> dict[str, "np.ndarray"]:
+    """Все карты профиля на ``n`` точек (без кэша)."""
+    if style == "print":
+        return {"seq": sequential(None, style, n)}
+    anchors = dict(zip(SERIES_ORDER, Theme(style).colors()))  # type: ignore[arg-type]
+    luts = {
+        "seq": sequential(anchors["treatment"], style, n),
+        "div": diverging(anchors["control"], anchors["treatment"], style, n),
+    }
+    luts.update({role: sequential(anchors[role], style, n) for role in SERIES_ORDER})
+    return luts
+
+
+def min_contrast(lut: "np.ndarray", style: str) -> float:
+    """Наименьший контраст WCAG между цветами ``lut`` и фонами профиля."""
+    return float(contrast_matrix(lut, list(BACKGROUNDS[style])).min())
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Таблицы и регистрация
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+@functools.lru_cache(maxsize=None)
+def _checked(style: str, n: int) -> dict[str, "np.ndarray"]:
+    """``build`` + проверка ``MIN_CONTRAST``; float32, только в памяти."""
+    import numpy as np
+
+    result = {}
+    for name, lut in build(style, n).items():
+        worst = min_contrast(lut, style)
+        if worst < MIN_CONTRAST:
+            raise ValueError(
+                f"colormap {registered_name(name, style)!r} reaches only "
+                f"{worst:.2f}:1 against {BACKGROUNDS[style]}"
+            )
+        result[name] = lut.astype(np.float32)
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def luts(style: str) -> dict[tuple[str, int], "np.ndarray"]:
+    """``{(name, n): float32 (n, 3)}`` для всех ``LUT_SIZES``.
+
+    Читается из ``.npz`` в кэше рядом с палитрами; при промахе таблицы
+    строятся ``_checked`` и записываются.
+    """
+    import numpy as np
+
+    params = {
+        "version": _CMAP_VERSION,
+        "style": style,
+        "anchors": Theme(style).colors() if style != "print" else [],  # type: ignore[arg-type]
+        "backgrounds": BACKGROUNDS[style],
+        "sizes": LUT_SIZES,
+        "min_contrast": MIN_CONTRAST,
+    }
+    key = hashlib.blake2b(
+        json.dumps(params, sort_keys=True).encode(), digest_size=12
+    ).hexdigest()
+    path = default_cache_dir().with_name("cmaps") / f"{style}-{key}.npz"
+    wanted = [(name, n) for n in LUT_SIZES for name in cmap_names(style)]
+    try:
+        with np.load(path) as cached:
+            return {(name, n): cached[f"{name}_{n}"] for name, n in wanted}
+    except (FileNotFoundError, KeyError, ValueError, OSError):
+        pass
+
+    result = {
+        (name, n): lut for n in LUT_SIZES for name, lut in _checked(style, n).items()
+    }
+    # Кэш — только ускорение: недоступная для записи директория не ошибка
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **{f"{name}_{n}": lut for (name, n), lut in result.items()})
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def register(style: str) -> list[str]:
+    """Зарегистрировать карты профиля ``style`` (и ``_r``) в ``mpl.colormaps``.
+
+    Вызывается из ``set_theme`` при первом переключении на профиль.
+    Таблицы на ``LUT_SIZES[0]`` точек строятся в памяти (~30 мс на
+    профиль) — без чтения и записи дискового кэша, поэтому read-only
+    ``$HOME`` не мешает ``set_theme``. Повторные вызовы бесплатны.
+    """
+    import matplotlib as mpl
+    from matplotlib.colors import ListedColormap
+
+    names = []
+    for name, lut in _checked(style, LUT_SIZES[0]).items():
+        cmap = ListedColormap(lut, name=registered_name(name, style))
+        for c in (cmap, cmap.reversed()):
+            if c.name not in mpl.colormaps:
+                mpl.colormaps.register(c)
+            names.append(c.name)
+    return names
+
+
+def colormap(
+    name: str = "seq", style: str | None = None, n: int = LUT_SIZES[0]
+) -> "mpl.colors.Colormap":
+    """Карта профиля ``style`` (по умолчанию — текущего) на ``n`` точек.
+
+    ``n`` из ``LUT_SIZES`` берётся из готовой таблицы, иначе —
+    пересэмплирование ближайшей большей.
+    """
+    from matplotlib.colors import ListedColormap
+
+    style = style or current_theme().style
+    if name not in cmap_names(style):
+        raise ValueError(
+            f"unknown colormap {name!r} for {style!r}; "
+            f"expected one of {cmap_names(style)}"
+        )
+    size = next((s for s in LUT_SIZES if s >= n), LUT_SIZES[-1])
+    cmap = ListedColormap(luts(style)[name, size], name=registered_name(name, style))
+    return cmap if size == n else cmap.resampled(n)
+
+
+def main() -> None:
+    """Отчёт: диапазон L* и минимальный контраст каждой карты."""
+    for style in _STYLES:
+        near, far = lightness_range(style)
+        print(f"{style:<6} L* {near:5.1f} → {far:5.1f}")
+        for (name, n), lut in luts(style).items():
+            if n == LUT_SIZES[0]:
+                print(
+                    f"  {registered_name(name, style):<28} {min_contrast(lut, style):5.2f}:1"
+                )
+
+
+if __name__ == "__main__":
+    main()
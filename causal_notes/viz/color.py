@@ -0,0 +1,200 @@
+"""
+Цветовая наука для проверок доступности
+=======================================
+
+Векторные преобразования, на которых строятся генератор палитр,
+аудит различимости и CVD-проверка готовых PNG:
+
+  • sRGB ↔ линейный RGB ↔ CIELAB (D65);
+  • ΔE CIEDE2000 — поэлементно и матрицей N×M;
+  • симуляция дальтонизма по Machado, Oliveira & Fernandes (2009),
+    матрицы полной тяжести, применяются в линейном RGB.
+
+Все функции принимают массивы ``(..., 3)`` (float в [0, 1] или uint8)
+и hex-строки — как ``theme.relative_luminance``.
+
+    from causal_notes.viz.color import delta_e_matrix, simulate_cvd
+
+    d = delta_e_matrix(get_colors())                # 5×5 ΔE2000
+    d_deutan = delta_e_matrix(simulate_cvd(get_colors(), "deuteranopia"))
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal
+
+from causal_notes.viz.theme import _rgb_array
+
+if TYPE_CHECKING:
+    import numpy as np
+
+CVD = Literal["protanopia", "deuteranopia", "tritanopia"]
+
+# Machado et al. (2009), severity = 1.0; действуют на линейный RGB
+MACHADO: dict[str, tuple[tuple[float, float, float], ...]] = {
+    "protanopia": (
+        (0.152286, 1.052583, -0.204868),
+        (0.114503, 0.786281, 0.099216),
+        (-0.003882, -0.048116, 1.051998),
+    ),
+    "deuteranopia": (
+        (0.367322, 0.860646, -0.227968),
+        (0.280085, 0.672501, 0.047413),
+        (-0.011820, 0.042940, 0.968881),
+    ),
+    "tritanopia": (
+        (1.255528, -0.076749, -0.178779),
+        (-0.078411, 0.930809, 0.147602),
+        (0.004733, 0.691367, 0.303900),
+    ),
+}
+
+# sRGB (D65) → XYZ и опорный белый D65
+_RGB_TO_XYZ = (
+    (0.4124564, 0.3575761, 0.1804375),
+    (0.2126729, 0.7151522, 0.0721750),
+    (0.0193339, 0.1191920, 0.9503041),
+)
+_WHITE_D65 = (0.95047, 1.0, 1.08883)
+
+
+def to_rgb(colors) -> "np.ndarray":
+    """Цвета → float ``(..., 3)`` в [0, 1]."""
+    rgb = _rgb_array(colors)
+    return rgb / 255.0 if rgb.dtype.kind in "ui" else rgb
+
+
+def srgb_to_linear(rgb: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    return np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(linear: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    linear = np.clip(linear, 0.0, 1.0)
+    return np.where(
+        linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055
+    )
+
+
+def rgb_to_lab(colors) -> "np.ndarray":
+    """sRGB → CIELAB (D65), форма ``(..., 3)``."""
+    import numpy as np
+
+    xyz = srgb_to_linear(to_rgb(colors)) @ np.asarray(_RGB_TO_XYZ).T
+    t = xyz / np.asarray(_WHITE_D65)
+    f = np.where(t > (6 / 29) ** 3, np.cbrt(t), t / (3 * (6 / 29) ** 2) + 4 / 29)
+    L = 116 * f[..., 1] - 16
+    a = 500 * (f[..., 0] - f[..., 1])
+    b = 200 * (f[..., 1] - f[..., 2])
+    return np.stack([L, a, b], axis=-1)
+
+
+def lab_to_linear(lab: "np.ndarray") -> "np.ndarray":
+    """CIELAB (D65) → линейный RGB без обрезки (вне [0, 1] — вне гаммы sRGB)."""
+    import numpy as np
+
+    lab = np.asarray(lab, dtype=float)
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack([fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200], axis=-1)
+    t = np.where(f > 6 / 29, f**3, 3 * (6 / 29) ** 2 * (f - 4 / 29))
+    xyz = t * np.asarray(_WHITE_D65)
+    return xyz @ np.linalg.inv(np.asarray(_RGB_TO_XYZ)).T
+
+
+def lab_to_rgb(lab: "np.ndarray") -> "np.ndarray":
+    """CIELAB (D65) → float sRGB ``(..., 3)``, обрезанный в [0, 1]."""
+    return linear_to_srgb(lab_to_linear(lab))
+
+
+def simulate_cvd(colors, kind: CVD, severity: float = 1.0) -> "np.ndarray":
+    """Как цвета видит человек с дихроматией ``kind`` (float sRGB ``(..., 3)``).
+
+    ``severity`` < 1 — линейная интерполяция с исходным цветом в линейном
+    RGB (приближение к промежуточным матрицам Machado).
+    """
+    import numpy as np
+
+    if kind not in MACHADO:
+        raise ValueError(f"unknown CVD type {kind!r}; expected one of {list(MACHADO)}")
+    m = np.asarray(MACHADO[kind])
+    if severity != 1.0:
+        m = severity * m + (1 - severity) * np.eye(3)
+    return linear_to_srgb(srgb_to_linear(to_rgb(colors)) @ m.T)
+
+
+def delta_e2000(lab1: "np.ndarray", lab2: "np.ndarray") -> "np.ndarray":
+    """ΔE CIEDE2000 между Lab-массивами (с broadcasting по ``...``).
+
+    Sharma, Wu & Dalal (2005); kL = kC = kH = 1.
+    """
+    import numpy as np
+
+    L1, a1, b1 = np.moveaxis(np.asarray(lab1, dtype=float), -1, 0)
+    L2, a2, b2 = np.moveaxis(np.asarray(lab2, dtype=float), -1, 0)
+
+    c_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    c_bar7 = c_bar**7
+    g = 0.5 * (1 - np.sqrt(c_bar7 / (c_bar7 + 25.0**7)))
+    a1p, a2p = a1 * (1 + g), a2 * (1 + g)
+    c1p, c2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    dLp = L2 - L1
+    dCp = c2p - c1p
+    dh = h2p - h1p
+    dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+    dh = np.where(c1p * c2p == 0, 0.0, dh)
+    dHp = 2 * np.sqrt(c1p * c2p) * np.sin(np.radians(dh) / 2)
+
+    Lp_bar = (L1 + L2) / 2
+    Cp_bar = (c1p + c2p) / 2
+    h_sum = h1p + h2p
+    hp_bar = np.where(
+        c1p * c2p == 0,
+        h_sum,
+        np.where(
+            np.abs(h1p - h2p) <= 180,
+            h_sum / 2,
+            np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2),
+        ),
+    )
+    t = (
+        1
+        - 0.17 * np.cos(np.radians(hp_bar - 30))
+        + 0.24 * np.cos(np.radians(2 * hp_bar))
+        + 0.32 * np.cos(np.radians(3 * hp_bar + 6))
+        - 0.20 * np.cos(np.radians(4 * hp_bar - 63))
+    )
+    d_theta = 30 * np.exp(-(((hp_bar - 275) / 25) ** 2))
+    Cp_bar7 = Cp_bar**7
+    r_c = 2 * np.sqrt(Cp_bar7 / (Cp_bar7 + 25.0**7))
+    s_l = 1 + 0.015 * (Lp_bar - 50) ** 2 / np.sqrt(20 + (Lp_bar - 50) ** 2)
+    s_c = 1 + 0.045 * Cp_bar
+    s_h = 1 + 0.015 * Cp_bar * t
+    r_t = -np.sin(np.radians(2 * d_theta)) * r_c
+
+    return np.sqrt(
+        (dLp / s_l) ** 2
+        + (dCp / s_c) ** 2
+        + (dHp / s_h) ** 2
+        + r_t * (dCp / s_c) * (dHp / s_h)
+    )
+
+
+def delta_e_matrix(colors1, colors2=None) -> "np.ndarray":
+    """Матрица ΔE2000 ``N×M`` (``colors2=None`` — попарно внутри ``colors1``)."""
+    lab1 = rgb_to_lab(colors1).reshape(-1, 3)
+    lab2 = lab1 if colors2 is None else rgb_to_lab(colors2).reshape(-1, 3)
+    return delta_e2000(lab1[:, None, :], lab2[None, :, :])
+
+
+def to_hex(rgb: "np.ndarray") -> list[str]:
+    """float sRGB ``(N, 3)`` → ``["#rrggbb", ...]``."""
+    import numpy as np
+
+    ints = np.rint(np.clip(rgb, 0, 1) * 255).astype(int).reshape(-1, 3)
+    return [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in ints]
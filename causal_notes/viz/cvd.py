@@ -0,0 +1,377 @@
+"""
+Проверка готовых PNG на дальтонизм
+==================================
+
+Модуль ``theme`` обещает, что графики различимы при дейтеранопии и
+протанопии. Здесь это проверяется на том, что ``savefig`` реально
+записал:
+
+  • ``simulate_png`` — симуляция Machado (``causal_notes.viz.color``)
+    в линейном RGB, полосами по ``tile_rows`` строк: изображение остаётся
+    uint8, во float переводится только текущая полоса;
+  • ``check_png`` — какие цвета серий (``series_colors``) есть на
+    картинке и каков минимальный ΔE2000 между ними после симуляции;
+  • ``check_paths`` / ``python -m causal_notes.viz.cvd DIR`` — то же для
+    каталогов в пуле процессов, отчёт в JSON Lines.
+
+    from causal_notes.viz.cvd import check_png
+
+    report = check_png("assets/figures/ate_forest.png")
+    report.min_delta_e     # {"deuteranopia": 14.2, "protanopia": 12.9}
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import math
+import os
+import sys
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from causal_notes.viz import color
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Строк изображения в одной полосе: 256 × 3600 px × 3 × float32 ≈ 11 MB
+TILE_ROWS = 256
+
+# Ниже этого ΔE2000 цвета серий считаются неразличимыми
+MIN_DELTA_E = 10.0
+
+DEFAULT_CVD = ("deuteranopia", "protanopia")
+
+# Шаг обратной таблицы: у нуля наклон sRGB ≈ 3300 уровней на единицу,
+# 2**14 шагов дают ошибку меньше половины уровня uint8
+_LINEAR_STEPS = 2**14 - 1
+
+
+def default_series_colors() -> list[str]:
+    """Цвета серий всех профилей (``axes.prop_cycle`` из ``_PROFILES``)."""
+    from causal_notes.viz import theme
+
+    colors = []
+    for rc in theme._PROFILES.values():
+        cycle = rc.get("axes.prop_cycle")
+        if cycle is not None:
+            colors.extend(cycle.by_key().get("color", []))
+    return list(dict.fromkeys(c.lower() for c in colors))
+
+
+@dataclass
+class CVDReport:
+    """Итог проверки одного PNG.
+
+    Attributes
+    ----------
+    source : str
+    series : list[str]
+        Цвета серий, найденные на изображении (не меньше ``min_pixels``).
+    min_delta_e : dict[str, float]
+        Минимальный ΔE2000 между найденными сериями — для обычного зрения
+        (``"normal"``) и каждой симуляции.
+    closest : dict[str, list[str]]
+        Пара серий, на которой достигается минимум.
+    inconclusive : bool
+        Найдено меньше двух серий (сглаженные или полупрозрачные заливки
+        не совпадают с цветами серий) — сравнивать нечего. Такой отчёт не
+        ``ok``: задайте ``series_colors`` явно.
+    """
+
+    source: str
+    series: list[str] = field(default_factory=list)
+    min_delta_e: dict[str, float] = field(default_factory=dict)
+    closest: dict[str, list[str]] = field(default_factory=dict)
+    threshold: float = MIN_DELTA_E
+    error: str | None = None
+
+    @property
+    def inconclusive(self) -> bool:
+        return self.error is None and len(self.series) < 2
+
+    @property
+    def ok(self) -> bool:
+        return (
+            self.error is None
+            and not self.inconclusive
+            and all(d >= self.threshold for d in self.min_delta_e.values())
+        )
+
+    def to_dict(self) -> dict:
+        return {"ok": self.ok, "inconclusive": self.inconclusive, **asdict(self)}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Симуляция
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+@functools.lru_cache(maxsize=None)
+def _to_linear_lut() -> "np.ndarray":
+    import numpy as np
+
+    return color.srgb_to_linear(np.arange(256) / 255).astype(np.float32)
+
+
+@functools.lru_cache(maxsize=None)
+def _matrix(kind: str, severity: float) -> "np.ndarray":
+    import numpy as np
+
+    if kind not in color.MACHADO:
+        raise ValueError(
+            f"unknown CVD type {kind!r}; expected one of {list(color.MACHADO)}"
+        )
+    m = np.asarray(color.MACHADO[kind])
+    if severity != 1.0:
+        m = severity * m + (1 - severity) * np.eye(3)
+    return m.T.astype(np.float32)
+
+
+@functools.lru_cache(maxsize=None)
+def _to_srgb_lut() -> "np.ndarray":
+    """Линейный RGB, квантованный на ``_LINEAR_STEPS`` уровней → uint8 sRGB."""
+    import numpy as np
+
+    linear = np.arange(_LINEAR_STEPS + 1) / _LINEAR_STEPS
+    return np.rint(color.linear_to_srgb(linear) * 255).astype(np.uint8)
+
+
+def _simulate_tile(rgb: "np.ndarray", m: "np.ndarray") -> "np.ndarray":
+    """uint8 ``(h, w, 3)`` → uint8 после матрицы ``m`` в линейном RGB."""
+    import numpy as np
+
+    linear = _to_linear_lut()[rgb] @ m
+    np.clip(linear, 0.0, 1.0, out=linear)
+    linear *= _LINEAR_STEPS
+    return _to_srgb_lut()[(linear + 0.5).astype(np.uint16)]
+
+
+def _load(path: str | os.PathLike) -> "np.ndarray":
+    """PNG → uint8 ``(H, W, 3|4)`` без перевода во float."""
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(path) as img:
+        mode = "RGBA" if "A" in img.getbands() else "RGB"
+        return np.asarray(img.convert(mode))
+
+
+def simulate_png(
+    src: str | os.PathLike,
+    dst: str | os.PathLike,
+    kind: str = "deuteranopia",
+    severity: float = 1.0,
+    tile_rows: int = TILE_ROWS,
+) -> None:
+    """Записать в ``dst`` изображение ``src`` глазами человека с ``kind``.
+
+    Альфа-канал сохраняется; во float переводится одна полоса за раз.
+    """
+    import numpy as np
+    from PIL import Image
+
+    img = _load(src)
+    out = np.empty_like(img)
+    m = _matrix(kind, severity)
+    for top in range(0, img.shape[0], tile_rows):
+        rows = slice(top, top + tile_rows)
+        out[rows, :, :3] = _simulate_tile(img[rows, :, :3], m)
+    if img.shape[2] == 4:
+        out[..., 3] = img[..., 3]
+    Image.fromarray(out).save(dst)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Различимость серий
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def _packed(rgb: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    rgb = rgb.astype(np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def series_present(
+    img: "np.ndarray",
+    series_colors: Sequence[str],
+    min_pixels: int = 50,
+    tile_rows: int = TILE_ROWS,
+) -> list[str]:
+    """Цвета серий, которыми закрашено не меньше ``min_pixels`` пикселей.
+
+    Сглаженные края дают промежуточные цвета, поэтому ищутся точные
+    совпадения — заливки столбцов, маркеров, линий толще пикселя.
+    """
+    import numpy as np
+
+    unique = list(dict.fromkeys(c.lower() for c in series_colors))
+    targets = _packed(color._rgb_array(unique))
+    order = np.argsort(targets)
+    sorted_targets = targets[order]
+    counts = np.zeros(len(unique), dtype=np.int64)
+    for top in range(0, img.shape[0], tile_rows):
+        tile = img[top : top + tile_rows]
+        packed = _packed(tile[..., :3])
+        if tile.shape[2] == 4:
+            packed = packed[tile[..., 3] > 0]
+        packed = packed.ravel()
+        pos = np.searchsorted(sorted_targets, packed).clip(0, len(unique) - 1)
+        hit = sorted_targets[pos] == packed
+        counts += np.bincount(order[pos[hit]], minlength=len(unique))
+    return [c for c, n in zip(unique, counts) if n >= min_pixels]
+
+
+def _closest(colors: list[str], kind: str | None) -> tuple[float, list[str]]:
+    import numpy as np
+
+    rgb = color.to_rgb(colors)
+    if kind is not None:
+        rgb = color.simulate_cvd(rgb, kind)
+    d = color.delta_e_matrix(rgb)
+    np.fill_diagonal(d, np.inf)
+    i, j = np.unravel_index(np.argmin(d), d.shape)
+    return round(float(d[i, j]), 2), [colors[i], colors[j]]
+
+
+def check_png(
+    path: str | os.PathLike,
+    series_colors: Sequence[str] | None = None,
+    kinds: Sequence[str] = DEFAULT_CVD,
+    threshold: float = MIN_DELTA_E,
+    min_pixels: int = 50,
+) -> CVDReport:
+    """Минимальный ΔE2000 между сериями PNG при каждой симуляции ``kinds``.
+
+    Симуляция — поточечное преобразование, поэтому различимость серий
+    определяется их цветами: картинка целиком проходится один раз (поиск
+    серий), симулируются только найденные цвета.
+    """
+    report = CVDReport(str(path), threshold=threshold)
+    try:
+        img = _load(path)
+    except OSError as exc:
+        report.error = f"{type(exc).__name__}: {exc}"
+        return report
+    report.series = series_present(
+        img, series_colors or default_series_colors(), min_pixels
+    )
+    if len(report.series) < 2:
+        return report
+    for kind in (None, *kinds):
+        d, pair = _closest(report.series, kind)
+        report.min_delta_e[kind or "normal"] = d
+        report.closest[kind or "normal"] = pair
+    return report
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Пакетная проверка
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def _expand(paths: Iterable[str | os.PathLike]) -> list[Path]:
+    files = []
+    for p in map(Path, paths):
+        files.extend(sorted(p.rglob("*.png")) if p.is_dir() else [p])
+    return files
+
+
+def _check_chunk(
+    chunk: list[Path],
+    kinds: tuple[str, ...],
+    threshold: float,
+    outdir: str | None,
+    series_colors: tuple[str, ...] | None,
+) -> list[CVDReport]:
+    reports = []
+    for path in chunk:
+        reports.append(check_png(path, series_colors, kinds, threshold))
+        if outdir is not None and reports[-1].error is None:
+            for kind in kinds:
+                simulate_png(path, Path(outdir) / f"{path.stem}.{kind}.png", kind)
+    return reports
+
+
+def check_paths(
+    paths: Iterable[str | os.PathLike],
+    kinds: Sequence[str] = DEFAULT_CVD,
+    threshold: float = MIN_DELTA_E,
+    simulate_to: str | os.PathLike | None = None,
+    max_workers: int | None = None,
+    series_colors: Sequence[str] | None = None,
+) -> list[CVDReport]:
+    """Проверить PNG (каталоги — рекурсивно) в пуле процессов.
+
+    ``simulate_to`` — дополнительно записать ``<name>.<kind>.png`` для
+    просмотра глазами. ``series_colors`` — цвета серий вместо цветов
+    профилей (``default_series_colors``), если фигуры рисуются своими.
+    Отчёты — в порядке файлов.
+    """
+    files = _expand(paths)
+    if not files:
+        return []
+    if simulate_to is not None:
+        Path(simulate_to).mkdir(parents=True, exist_ok=True)
+        simulate_to = os.fspath(simulate_to)
+    workers = max_workers or os.cpu_count() or 1
+    colors = tuple(series_colors) if series_colors else None
+    args = (tuple(kinds), threshold, simulate_to, colors)
+    if workers == 1 or len(files) == 1:
+        return _check_chunk(files, *args)
+    chunksize = max(1, math.ceil(len(files) / (workers * 4)))
+    chunks = [files[i : i + chunksize] for i in range(0, len(files), chunksize)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        futures = [pool.submit(_check_chunk, chunk, *args) for chunk in chunks]
+        return [report for future in futures for report in future.result()]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m causal_notes.viz.cvd",
+        description="Color-vision-deficiency check for PNG figures.",
+    )
+    parser.add_argument("paths", nargs="+", help="PNG files or directories")
+    parser.add_argument(
+        "--kind", action="append", choices=tuple(color.MACHADO), dest="kinds"
+    )
+    parser.add_argument("--min-delta-e", type=float, default=MIN_DELTA_E)
+    parser.add_argument("--simulate-to", default=None, help="write simulated PNGs")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--series-color",
+        action="append",
+        dest="series_colors",
+        metavar="HEX",
+        help="series color to look for (repeat); default: profile colors",
+    )
+    args = parser.parse_args(argv)
+
+    reports = check_paths(
+        args.paths,
+        args.kinds or DEFAULT_CVD,
+        args.min_delta_e,
+        args.simulate_to,
+        args.workers,
+        args.series_colors,
+    )
+    for report in reports:
+        print(json.dumps(report.to_dict(), ensure_ascii=False))
+    inconclusive = sum(r.inconclusive for r in reports)
+    failed = sum(not r.ok for r in reports) - inconclusive
+    print(
+        f"{len(reports)} image(s), {failed} failing, {inconclusive} inconclusive",
+        file=sys.stderr,
+    )
+    return 1 if failed or inconclusive else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Инструментация экспорта
+=======================
+
+``savefig`` и ``set_theme`` публикуют структурированные события —
+словари вида::
+
+    {"event": "savefig", "name": "ate_forest", "format": "png",
+     "seconds": 0.41, "bytes": 93265, "artists": 1812, "dpi": 300,
+     "profile": "dark", "cached": False, "ts": 1760000000.0}
+
+    {"event": "set_theme", "profile": "light", "seconds": 3.1e-05,
+     "changed": 14, "ts": ...}
+
+Получатели (recorders) подключаются глобально; пока их нет, события
+не формируются вовсе, и экспорт не платит даже за подсчёт артистов.
+
+    from causal_notes.viz import events
+
+    ring = events.RingBufferRecorder(10_000)
+    with events.recording(ring, events.JsonlRecorder("build/figures.jsonl")):
+        build_all_figures()
+    print(events.summarize(ring.events))
+"""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from typing import Protocol
+
+Event = dict
+
+
+class Recorder(Protocol):
+    """Получатель событий."""
+
+    def record(self, event: Event) -> None: ...
+
+
+class RingBufferRecorder:
+    """Последние ``maxlen`` событий в памяти (``.events``)."""
+
+    def __init__(self, maxlen: int = 10_000) -> None:
+        self.events: collections.deque[Event] = collections.deque(maxlen=maxlen)
+
+    def record(self, event: Event) -> None:
+        self.events.append(event)  # deque.append атомарен
+
+
+class JsonlRecorder:
+    """Дописывает события в JSONL-файл — по строке на событие."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+
+    def record(self, event: Event) -> None:
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class LoggingRecorder:
+    """Передаёт события в ``logging`` (сообщение — JSON события)."""
+
+    def __init__(
+        self,
+        logger: logging.Logger | str = "causal_notes.viz.events",
+        level: int = logging.INFO,
+    ) -> None:
+        self.logger = logging.getLogger(logger) if isinstance(logger, str) else logger
+        self.level = level
+
+    def record(self, event: Event) -> None:
+        self.logger.log(self.level, "%s", json.dumps(event, default=str))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Регистрация и публикация
+# ──────────────────────────────────────────────────────────────────────────────
+
+# Кортеж заменяется целиком — emit читает его без блокировки
+_recorders: tuple[Recorder, ...] = ()
+_lock = threading.Lock()
+
+
+def add_recorder(recorder: Recorder) -> Recorder:
+    global _recorders
+    with _lock:
+        _recorders = (*_recorders, recorder)
+    return recorder
+
+
+def remove_recorder(recorder: Recorder) -> None:
+    global _recorders
+    with _lock:
+        _recorders = tuple(r for r in _recorders if r is not recorder)
+
+
+@contextlib.contextmanager
+def recording(*recorders: Recorder) -> Iterator[tuple[Recorder, ...]]:
+    """Подключить получателей на время блока."""
+    for r in recorders:
+        add_recorder(r)
+    try:
+        yield recorders
+    finally:
+        for r in recorders:
+            remove_recorder(r)
+
+
+def enabled() -> bool:
+    """Есть ли получатели (чтобы не собирать дорогие поля зря)."""
+    return bool(_recorders)
+
+
+def emit(event: str, **fields) -> None:
+    """Опубликовать событие всем получателям."""
+    recorders = _recorders
+    if not recorders:
+        return
+    payload = {"event": event, **fields, "ts": time.time()}
+    for r in recorders:
+        r.record(payload)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Отчёт
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def load_jsonl(path: str | os.PathLike) -> list[Event]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def slowest(events: Iterable[Event], top: int = 10) -> list[dict]:
+    """Фигуры, отсортированные по суммарному времени экспорта."""
+    figures: dict[str, dict] = {}
+    for e in events:
+        if e.get("event") != "savefig":
+            continue
+        fig = figures.setdefault(
+            e["name"],
+            {"name": e["name"], "seconds": 0.0, "bytes": 0, "exports": 0},
+        )
+        fig["seconds"] += e["seconds"]
+        fig["bytes"] += e.get("bytes") or 0
+        fig["artists"] = e.get("artists")
+        # Сумма по всем экспортам — как и fig["seconds"]
+        formats = fig.setdefault("formats", {})
+        formats[e["format"]] = formats.get(e["format"], 0.0) + e["seconds"]
+        fig["exports"] += 1
+    ranked = sorted(figures.values(), key=lambda f: f["seconds"], reverse=True)
+    return ranked[:top]
+
+
+def summarize(events: Iterable[Event], top: int = 10) -> str:
+    """Текстовый отчёт: самые медленные фигуры и время по форматам."""
+    events = list(events)
+    rows = slowest(events, top)
+    total = sum(e["seconds"] for e in events if e.get("event") == "savefig")
+    lines = [
+        f"{'figure':<32} {'seconds':>8} {'share':>6} {'MB':>7} "
+        f"{'artists':>8}  formats"
+    ]
+    for f in rows:
+        share = f["seconds"] / total if total else 0.0
+        formats = " ".join(f"{k}={v:.2f}" for k, v in f["formats"].items())
+        lines.append(
+            f"{f['name'][:32]:<32} {f['seconds']:>8.2f} {share:>6.1%} "
+            f"{f['bytes'] / 2**20:>7.2f} {f['artists'] or '-':>8}  {formats}"
+        )
+    themes = [e for e in events if e.get("event") == "set_theme"]
+    lines.append(
+        f"total export: {total:.2f} s; set_theme: {len(themes)} calls, "
+        f"{sum(e['seconds'] for e in themes) * 1e3:.2f} ms"
+    )
+    return "\n".join(lines)
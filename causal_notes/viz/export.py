@@ -0,0 +1,801 @@
+"""
+Экспорт фигур CausalViz
+=======================
+
+Движок, на который опирается ``theme.savefig``. Цель — не рисовать дерево
+артистов заново для каждого формата:
+
+  • растровые форматы (png/jpg/webp/tiff) — один проход Agg, остальные
+    кодируются из готового буфера через Pillow;
+  • векторные форматы (svg/pdf/eps) — при ``parallel=True`` рисуются
+    одновременно в отдельных процессах из pickle-копии фигуры.
+
+``FigureWriter`` переносит экспорт в фоновые потоки, чтобы генерация
+следующей фигуры шла параллельно с записью предыдущей.
+
+    from causal_notes.viz.export import export_figure
+
+    result = export_figure(fig, "ate_forest", "assets/figures",
+                           formats=("svg", "pdf", "png"), parallel=True)
+    result.timings   # {"svg": 0.41, "pdf": 0.38, "png": 0.52}
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import io
+import json
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from causal_notes.viz import events, hatch, svg
+from causal_notes.viz.cache import FigureCache, figure_fingerprint
+from causal_notes.viz.sinks import Sink
+from causal_notes.viz.theme import (
+    _RC_LOCK,
+    _pin_rc,
+    _rc_matches,
+    _rc_pinned,
+    _unpin_rc,
+    current_theme,
+    theme_of,
+)
+
+if TYPE_CHECKING:
+    import matplotlib as mpl
+    import numpy as np
+
+    from causal_notes.viz.theme import Theme
+
+# Форматы, которые Pillow кодирует из одного RGBA-буфера
+RASTER_FORMATS: dict[str, str] = {
+    "png": "PNG",
+    "jpg": "JPEG",
+    "jpeg": "JPEG",
+    "webp": "WEBP",
+    "tif": "TIFF",
+    "tiff": "TIFF",
+}
+
+# Разрешение растровых форматов (как в исходном savefig)
+RASTER_DPI = 300
+
+# dpi варианта 1x для ``png_scales`` (3x = RASTER_DPI)
+SCALE_BASE_DPI = 100
+
+# Порог плотности по умолчанию для ``rasterize_threshold=True``
+DENSE_THRESHOLD = 50_000
+
+logger = logging.getLogger(__name__)
+
+# rc-ключи, которые нельзя переносить в дочерний процесс
+_RC_SKIP = ("backend", "backend_fallback", "interactive")
+
+
+@dataclass
+class ExportResult:
+    """Итог экспорта одной фигуры.
+
+    Attributes
+    ----------
+    paths : list[Path]
+        Сохранённые файлы — в порядке ``formats``.
+    timings : dict[str, float]
+        Время (с) на каждый формат. Для растровых форматов, кроме первого,
+        это только перекодирование готового буфера.
+    total : float
+        Wall-clock всего экспорта (с).
+    cached : bool
+        Файлы взяты из ``FigureCache`` без рендера.
+    optimized : dict[str, tuple[int, int]]
+        Размер (байт) до и после ``optimize_svg`` для каждого SVG.
+    rasterized : dict[str, int]
+        Артисты, растеризованные в векторных форматах → число элементов.
+    variants : list[Path]
+        PNG ``name@Nx.png`` и манифест ``name.srcset.json`` (``png_scales``).
+    sizes : dict[str, int]
+        Размер каждого файла (байт).
+    outputs : list
+        Что вернул ``sink.write`` для каждого формата (при ``sink``);
+        ``paths`` в этом случае пуст.
+    hatch_lod : dict[str, int]
+        Сколько hatch снято (``dropped``) и прорежено (``coarsened``)
+        при ``hatch_lod=True``.
+    """
+
+    paths: list[Path] = field(default_factory=list)
+    timings: dict[str, float] = field(default_factory=dict)
+    total: float = 0.0
+    cached: bool = False
+    optimized: dict[str, tuple[int, int]] = field(default_factory=dict)
+    rasterized: dict[str, int] = field(default_factory=dict)
+    variants: list[Path] = field(default_factory=list)
+    sizes: dict[str, int] = field(default_factory=dict)
+    outputs: list = field(default_factory=list)
+    hatch_lod: dict[str, int] = field(default_factory=dict)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Пул процессов для векторных форматов
+# ──────────────────────────────────────────────────────────────────────────────
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+        atexit.register(_executor.shutdown)
+    return _executor
+
+
+def _render_pickled(
+    payload: bytes, path: str, fmt: str, rc: dict, kwargs: dict
+) -> float:
+    """Отрисовать фигуру из pickle в дочернем процессе; вернуть время (с)."""
+    import matplotlib as mpl
+
+    mpl.use("Agg")
+    start = time.perf_counter()
+    with mpl.rc_context(rc):
+        fig = pickle.loads(payload)
+        fig.savefig(path, format=fmt, **kwargs)
+    return time.perf_counter() - start
+
+
+def _rc_snapshot() -> dict:
+    import matplotlib as mpl
+
+    return {k: v for k, v in mpl.rcParams.items() if k not in _RC_SKIP}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Экспорт
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def _write_raster(
+    fig: "mpl.figure.Figure",
+    paths: dict[str, Path | io.BytesIO],
+    timings: dict[str, float],
+    kwargs: dict,
+    dpi: float = RASTER_DPI,
+) -> bytes:
+    """Один проход Agg → PNG в памяти → все запрошенные растровые форматы.
+
+    ``paths`` — файлы или буферы (экспорт в ``sink``). Возвращает PNG-байты
+    (для ``png_scales``).
+    """
+    start = time.perf_counter()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, **kwargs)
+    png = buf.getvalue()
+
+    for fmt, path in paths.items():
+        if fmt == "png":
+            if isinstance(path, io.BytesIO):
+                path.write(png)
+            else:
+                path.write_bytes(png)
+        else:
+            from PIL import Image
+
+            with Image.open(io.BytesIO(png)) as img:
+                if RASTER_FORMATS[fmt] == "JPEG":
+                    img = img.convert("RGB")  # JPEG без альфа-канала
+                img.save(path, format=RASTER_FORMATS[fmt], dpi=(dpi,) * 2)
+        now = time.perf_counter()
+        timings[fmt] = now - start
+        start = now
+    return png
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Мульти-разрешение (1x/2x/3x) из одного рендера
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def downsample(rgba: "np.ndarray", factor: float) -> "np.ndarray":
+    """Уменьшить RGBA-изображение (H, W, 4) uint8 в ``factor`` раз.
+
+    Целый ``factor`` — ``Image.reduce``: точное усреднение по блоку
+    ``factor×factor`` (край — по неполному блоку). Дробный — BOX-фильтр
+    ``Image.resize``. Оба работают в премультиплицированной альфе — без
+    тёмной каймы по краям прозрачных областей.
+    """
+    import numpy as np
+    from PIL import Image
+
+    if factor <= 1:
+        return rgba
+    img = Image.fromarray(rgba, "RGBA").convert("RGBa")
+    if float(factor).is_integer():
+        img = img.reduce(int(factor))
+    else:
+        h, w = rgba.shape[:2]
+        size = (max(1, round(w / factor)), max(1, round(h / factor)))
+        img = img.resize(size, Image.Resampling.BOX)
+    return np.asarray(img.convert("RGBA"))
+
+
+def _scale_paths(outdir: Path, name: str, scales: tuple[int, ...]) -> list[Path]:
+    """``name@1x.png``, ``name@2x.png``, … и ``name.srcset.json``."""
+    pngs = [outdir / f"{name}@{scale}x.png" for scale in sorted(set(scales))]
+    return pngs + [outdir / f"{name}.srcset.json"]
+
+
+def _write_scales(
+    png: bytes,
+    src_dpi: float,
+    paths: list[Path],
+    scales: tuple[int, ...],
+    base_dpi: float,
+) -> None:
+    """Записать варианты ``_scale_paths`` из одного PNG-рендера."""
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(io.BytesIO(png)) as img:
+        rgba = np.asarray(img.convert("RGBA"))
+
+    *pngs, manifest = paths
+    images = []
+    for scale, path in zip(sorted(set(scales)), pngs):
+        dpi = base_dpi * scale
+        if dpi == src_dpi:
+            # Совпадает с источником побайтно — без повторного кодирования
+            path.write_bytes(png)
+            height, width = rgba.shape[:2]
+        else:
+            variant = downsample(rgba, src_dpi / dpi)
+            Image.fromarray(variant, "RGBA").save(path, dpi=(dpi, dpi))
+            height, width = variant.shape[:2]
+        images.append(
+            {
+                "file": path.name,
+                "scale": scale,
+                "dpi": dpi,
+                "width": width,
+                "height": height,
+            }
+        )
+
+    manifest.write_text(
+        json.dumps(
+            {
+                "src": images[0]["file"],
+                "srcset": ", ".join(f"{i['file']} {i['scale']}x" for i in images),
+                "images": images,
+            },
+            indent=1,
+        ),
+        encoding="utf-8",
+    )
+
+
+def _element_count(artist: "mpl.artist.Artist", threshold: int) -> int:
+    """Сколько примитивов рисует артист (точек, путей, вершин)."""
+    from matplotlib.collections import Collection
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+
+    if isinstance(artist, Collection):
+        paths = artist.get_paths()
+        n = max(len(artist.get_offsets()), len(paths))
+        if n <= threshold:  # мало путей, но они могут быть длинными
+            n = max(n, sum(len(p.vertices) for p in paths))
+        return n
+    if isinstance(artist, Line2D):
+        return len(artist.get_xydata())
+    if isinstance(artist, Patch):
+        return len(artist.get_path().vertices)
+    return 0
+
+
+def _describe(artist: "mpl.artist.Artist") -> str:
+    label = artist.get_label()
+    name = type(artist).__name__
+    return f"{name} {label!r}" if label and not label.startswith("_") else name
+
+
+def dense_artists(
+    fig: "mpl.figure.Figure", threshold: int = DENSE_THRESHOLD
+) -> dict["mpl.artist.Artist", int]:
+    """Артисты данных в осях ``fig``, у которых больше ``threshold`` элементов.
+
+    Оси, тексты, тики и легенда не рассматриваются — они остаются векторными.
+    """
+    from matplotlib.axis import Axis
+    from matplotlib.legend import Legend
+    from matplotlib.spines import Spine
+    from matplotlib.text import Text
+
+    skip = (Axis, Legend, Spine, Text)
+    found = {}
+    for ax in fig.get_axes():
+        for artist in ax.get_children():
+            if artist is ax.patch or isinstance(artist, skip):
+                continue
+            if artist.get_rasterized():
+                continue
+            n = _element_count(artist, threshold)
+            if n > threshold:
+                found[artist] = n
+    return found
+
+
+def rasterization_savings(
+    fig: "mpl.figure.Figure",
+    threshold: int = DENSE_THRESHOLD,
+    fmt: str = "svg",
+    **kwargs,
+) -> tuple[int, int]:
+    """Размер ``fmt`` (байт) без растеризации и с ней — для подбора порога.
+
+    Рисует фигуру дважды в память, поэтому предназначена для диагностики,
+    а не для каждого экспорта.
+    """
+    sizes = []
+    for limit in (None, threshold):
+        buf = io.BytesIO()
+        with _rasterized(fig, limit, {}):
+            fig.savefig(buf, format=fmt, **kwargs)
+        sizes.append(buf.tell())
+    return sizes[0], sizes[1]
+
+
+@contextlib.contextmanager
+def _rasterized(
+    fig: "mpl.figure.Figure", threshold: int | None, report: dict[str, int]
+):
+    """Временно растеризовать плотные артисты (для векторных форматов)."""
+    dense = dense_artists(fig, threshold) if threshold else {}
+    for artist, n in dense.items():
+        artist.set_rasterized(True)
+        report[_describe(artist)] = n
+        logger.info("rasterizing %s: %d elements", _describe(artist), n)
+    try:
+        yield
+    finally:
+        for artist in dense:
+            artist.set_rasterized(False)
+
+
+def export_figure(
+    fig: "mpl.figure.Figure",
+    name: str,
+    outdir: str | Path = ".",
+    formats: tuple[str, ...] = ("svg", "png"),
+    parallel: bool = False,
+    cache: FigureCache | None = None,
+    optimize_svg: bool = False,
+    rasterize_threshold: int | bool | None = None,
+    png_scales: tuple[int, ...] | None = None,
+    sink: Sink | None = None,
+    hatch_lod: bool = False,
+    **kwargs,
+) -> ExportResult:
+    """Сохранить фигуру во все ``formats``, минимизируя число отрисовок.
+
+    Parameters
+    ----------
+    fig : Figure
+    name : str
+        Имя файла без расширения.
+    outdir : str | Path
+        Директория. По умолчанию текущая.
+    formats : tuple
+        Форматы для сохранения. По умолчанию ("svg", "png").
+    parallel : bool
+        Рисовать векторные форматы в пуле процессов, пока основной процесс
+        занят растровыми. Имеет смысл для больших фигур (10^4+ артистов):
+        pickle фигуры и запуск воркера стоят десятки миллисекунд.
+    cache : FigureCache | None
+        Если задан — сначала считается ``figure_fingerprint``; при
+        попадании файлы берутся из кэша без рендера.
+    optimize_svg : bool
+        Прогнать SVG через ``causal_notes.viz.svg.optimize_svg``:
+        без метаданных, с общими hatch/clip-определениями и округлёнными
+        координатами. Размеры до/после — в ``ExportResult.optimized``.
+    rasterize_threshold : int | bool | None
+        Растеризовать (с dpi экспорта) артисты данных, в которых больше
+        стольких элементов — например, scatter на 10^6 точек. Оси, текст и
+        легенда остаются векторными. True — порог ``DENSE_THRESHOLD``;
+        None или False — не растеризовать.
+    png_scales : tuple[int, ...] | None
+        Например ``(1, 2, 3)``: дополнительно записать ``name@1x.png`` …
+        (1x = ``SCALE_BASE_DPI``) и ``name.srcset.json`` для адаптивных
+        картинок. Варианты получаются уменьшением (``downsample``) одного
+        рендера: основного PNG в ``RASTER_DPI`` или, если наибольший
+        вариант крупнее, отдельного рендера в его dpi — основные файлы
+        всё равно пишутся в ``RASTER_DPI``.
+    sink : Sink | None
+        Отдать файлы приёмнику (``causal_notes.viz.sinks``: память, zip,
+        tar, file-like) вместо записи в ``outdir``; рендер идёт в память,
+        без временных файлов. Несовместимо с ``parallel``, ``cache``
+        и ``png_scales``, которые работают с файлами.
+    hatch_lod : bool
+        В растровых форматах упростить hatch под dpi рендера
+        (``causal_notes.viz.hatch.hatch_lod``): снять паттерн с патчей
+        уже одного его периода, заменив стилем контура, и проредить
+        сливающиеся паттерны. Векторные форматы не меняются. Выигрыш по времени для конкретной фигуры —
+        ``causal_notes.viz.hatch.hatch_lod_savings``.
+    **kwargs
+        Дополнительные аргументы для ``Figure.savefig()``.
+
+    Returns
+    -------
+    ExportResult
+        Пути и время по форматам.
+    """
+    started = time.perf_counter()
+    # bool — подкласс int: True иначе стал бы порогом в 1 элемент
+    if isinstance(rasterize_threshold, bool):
+        rasterize_threshold = DENSE_THRESHOLD if rasterize_threshold else None
+    outdir = Path(outdir)
+    if sink is None:
+        outdir.mkdir(parents=True, exist_ok=True)
+        paths = {fmt: outdir / f"{name}.{fmt}" for fmt in formats}
+    else:
+        if parallel or cache is not None or png_scales:
+            raise ValueError(
+                "parallel, cache and png_scales need an outdir, not a sink"
+            )
+        paths = {fmt: io.BytesIO() for fmt in formats}
+    raster = {f: p for f, p in paths.items() if f in RASTER_FORMATS}
+    vector = {f: p for f, p in paths.items() if f not in raster}
+    variants = _scale_paths(outdir, name, png_scales) if png_scales else []
+    timings: dict[str, float] = {}
+
+    theme = theme_of(fig)
+    # В фоновой записи rcParams уже закреплены в теме фигуры (FigureWriter)
+    if theme is None or _rc_pinned.get():
+        ctx = contextlib.nullcontext()
+    else:
+        ctx = theme.activate()
+
+    with ctx:
+        if cache is not None:
+            key = figure_fingerprint(
+                fig,
+                formats,
+                raster_dpi=RASTER_DPI,
+                optimize_svg=optimize_svg,
+                rasterize_threshold=rasterize_threshold,
+                png_scales=png_scales,
+                hatch_lod=hatch_lod,
+                **kwargs,
+            )
+            if cache.fetch(key, list(paths.values()) + variants):
+                result = ExportResult(
+                    paths=list(paths.values()),
+                    timings=dict.fromkeys(formats, 0.0),
+                    total=time.perf_counter() - started,
+                    cached=True,
+                    variants=variants,
+                    sizes={f: p.stat().st_size for f, p in paths.items()},
+                )
+                _emit_events(fig, name, result, theme, kwargs)
+                return result
+
+        rasterized: dict[str, int] = {}
+        lod: dict[str, int] = {}
+        with _rasterized(fig, rasterize_threshold if vector else None, rasterized):
+            futures: dict[str, Future] = {}
+            if parallel and vector:
+                payload = pickle.dumps(fig)
+                rc = _rc_snapshot()
+                pool = _get_executor()
+                futures = {
+                    fmt: pool.submit(
+                        _render_pickled, payload, str(path), fmt, rc, kwargs
+                    )
+                    for fmt, path in vector.items()
+                }
+            else:
+                for fmt, path in vector.items():
+                    start = time.perf_counter()
+                    fig.savefig(path, format=fmt, **kwargs)
+                    timings[fmt] = time.perf_counter() - start
+
+            # В векторе hatch — один общий <pattern>, снимать его там
+            # незачем: LOD только для растровых проходов
+            def render(targets: dict, dpi: float) -> bytes:
+                lod_ctx = (
+                    hatch.hatch_lod(fig, dpi, lod)
+                    if hatch_lod
+                    else contextlib.nullcontext()
+                )
+                with lod_ctx:
+                    return _write_raster(fig, targets, timings, kwargs, dpi=dpi)
+
+            png = render(raster, RASTER_DPI) if raster else None
+            if png_scales:
+                # Основные файлы — всегда RASTER_DPI; вариант крупнее него
+                # рендерится отдельно, только как источник для уменьшения
+                src_dpi = SCALE_BASE_DPI * max(png_scales)
+                if png is not None and src_dpi <= RASTER_DPI:
+                    src_dpi = RASTER_DPI
+                else:
+                    png = render({}, src_dpi)
+                start = time.perf_counter()
+                _write_scales(png, src_dpi, variants, png_scales, SCALE_BASE_DPI)
+                timings["png_scales"] = time.perf_counter() - start
+
+            for fmt, future in futures.items():
+                timings[fmt] = future.result()
+
+    optimized = {}
+    if optimize_svg:
+        for fmt, path in vector.items():
+            if fmt == "svg":
+                start = time.perf_counter()
+                optimized[fmt] = svg.optimize_svg(path)
+                timings[fmt] += time.perf_counter() - start
+
+    if cache is not None:
+        cache.store(key, list(paths.values()) + variants)
+
+    outputs = []
+    if sink is not None:
+        sizes = {fmt: buf.getbuffer().nbytes for fmt, buf in paths.items()}
+        outputs = [
+            sink.write(f"{name}.{fmt}", paths[fmt].getbuffer()) for fmt in formats
+        ]
+    else:
+        sizes = {fmt: path.stat().st_size for fmt, path in paths.items()}
+    if rasterized:
+        logger.info(
+            "%s: rasterized %d artist(s); vector sizes %s",
+            name,
+            len(rasterized),
+            {fmt: sizes[fmt] for fmt in vector},
+        )
+    if lod:
+        logger.info(
+            "%s: hatch LOD dropped %d, coarsened %d pattern(s)",
+            name,
+            lod.get("dropped", 0),
+            lod.get("coarsened", 0),
+        )
+
+    result = ExportResult(
+        paths=list(paths.values()) if sink is None else [],
+        timings={
+            fmt: timings[fmt] for fmt in (*formats, "png_scales") if fmt in timings
+        },
+        total=time.perf_counter() - started,
+        optimized=optimized,
+        rasterized=rasterized,
+        variants=variants,
+        sizes=sizes,
+        outputs=outputs,
+        hatch_lod=lod,
+    )
+    _emit_events(fig, name, result, theme, kwargs)
+    return result
+
+
+def _emit_events(
+    fig: "mpl.figure.Figure",
+    name: str,
+    result: ExportResult,
+    theme: "Theme | None",
+    kwargs: dict,
+) -> None:
+    """Событие ``savefig`` на каждый формат (см. ``causal_notes.viz.events``)."""
+    if not events.enabled():
+        return
+    import matplotlib as mpl
+
+    artists = len(fig.findobj())
+    profile = (theme or current_theme()).style
+    vector_dpi = kwargs.get("dpi", mpl.rcParams["savefig.dpi"])
+    if vector_dpi == "figure":
+        vector_dpi = fig.dpi
+    dpis = {"png_scales": SCALE_BASE_DPI, **dict.fromkeys(RASTER_FORMATS, RASTER_DPI)}
+    for fmt, seconds in result.timings.items():
+        events.emit(
+            "savefig",
+            name=name,
+            format=fmt,
+            seconds=seconds,
+            bytes=result.sizes.get(fmt),
+            artists=artists,
+            dpi=dpis.get(fmt, vector_dpi),
+            profile=profile,
+            cached=result.cached,
+            rasterized=len(result.rasterized),
+        )
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Фоновая запись
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+class FigureWriter:
+    """Ограниченный пул фоновых потоков для ``export_figure``.
+
+    ``submit`` сразу возвращает ``Future[list[Path]]``; если в работе уже
+    ``max_pending`` фигур, вызов блокируется до освобождения места
+    (backpressure), чтобы несохранённые фигуры не копились в памяти.
+
+    Потоки записи не меняют глобальные rcParams — основной поток тем
+    временем строит следующие фигуры. Фигура рисуется с rcParams на
+    момент ``submit``: ``set_theme``, ``theme_context`` и
+    ``Theme.activate`` ждут окончания уже поставленных записей. Фигура
+    с привязанной ``Theme``, отличной от текущих rcParams, сохраняется
+    сразу в вызывающем потоке (Future уже завершён). Менять rcParams
+    напрямую, пока записи в очереди, нельзя.
+
+    Parameters
+    ----------
+    max_workers : int
+        Число потоков записи.
+    max_pending : int
+        Максимум фигур в очереди и в работе одновременно.
+    close : bool
+        Закрывать фигуры: ``plt.close`` при постановке в очередь (фигура
+        уходит из менеджера pyplot, но остаётся отрисовываемой), ссылка
+        на неё освобождается после записи.
+
+    Examples
+    --------
+    >>> with FigureWriter(max_pending=4) as writer:
+    ...     for name, build in figures.items():
+    ...         writer.submit(build(), name, outdir="assets/figures")
+    """
+
+    def __init__(
+        self, max_workers: int = 2, max_pending: int = 8, close: bool = True
+    ) -> None:
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="causalviz-writer"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending: set[Future] = set()
+        self._lock = threading.Lock()
+        self._close = close
+
+    def submit(
+        self,
+        fig: "mpl.figure.Figure",
+        name: str,
+        outdir: str | Path = ".",
+        formats: tuple[str, ...] = ("svg", "png"),
+        **kwargs,
+    ) -> Future:
+        """Поставить фигуру в очередь на запись; вернуть ``Future[list[Path]]``."""
+        self._slots.acquire()
+        pinned = False
+        try:
+            theme = theme_of(fig)
+            with _RC_LOCK:
+                inline = theme is not None and not _rc_matches(theme.rc)
+                if not inline:
+                    _pin_rc()
+                    pinned = True
+            if self._close:
+                _detach_from_pyplot(fig)
+            if inline:
+                future = Future()
+                try:
+                    future.set_result(_export_job(fig, name, outdir, formats, kwargs))
+                except Exception as exc:
+                    future.set_exception(exc)
+            else:
+                future = self._pool.submit(
+                    _export_pinned, fig, name, outdir, formats, kwargs
+                )
+                pinned = False  # снимет задача
+        except BaseException:
+            if pinned:
+                _unpin_rc()
+            self._slots.release()
+            raise
+        del fig  # единственная ссылка остаётся у задачи
+
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    def flush(self, timeout: float | None = None) -> list[Path]:
+        """Дождаться всех поставленных записей; вернуть их пути.
+
+        Ошибка любой записи пробрасывается отсюда.
+        """
+        with self._lock:
+            pending = list(self._pending)
+        saved: list[Path] = []
+        for future in pending:
+            saved.extend(future.result(timeout=timeout))
+        return saved
+
+    def close(self) -> None:
+        """Дождаться записи и остановить потоки."""
+        global _default_writer
+        self._pool.shutdown(wait=True)
+        if self is _default_writer:
+            # следующий savefig(background=True) создаст новый
+            _default_writer = None
+
+    def __enter__(self) -> "FigureWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            if exc_info[0] is None:
+                self.flush()
+        finally:
+            self.close()
+
+
+def _detach_from_pyplot(fig: "mpl.figure.Figure") -> None:
+    plt = sys.modules.get("matplotlib.pyplot")
+    if plt is not None:
+        plt.close(fig)
+
+
+def _export_job(
+    fig: "mpl.figure.Figure",
+    name: str,
+    outdir: str | Path,
+    formats: tuple[str, ...],
+    kwargs: dict,
+) -> list[Path]:
+    result = export_figure(fig, name, outdir, formats, **kwargs)
+    if kwargs.get("sink") is not None:
+        return result.outputs
+    return result.paths + result.variants
+
+
+def _export_pinned(
+    fig: "mpl.figure.Figure",
+    name: str,
+    outdir: str | Path,
+    formats: tuple[str, ...],
+    kwargs: dict,
+) -> list[Path]:
+    """Экспорт в потоке записи с rcParams, закреплёнными при ``submit``."""
+    token = _rc_pinned.set(True)
+    try:
+        return _export_job(fig, name, outdir, formats, kwargs)
+    finally:
+        _rc_pinned.reset(token)
+        _unpin_rc()
+
+
+_default_writer: FigureWriter | None = None
+
+
+def default_writer() -> FigureWriter:
+    """Общий ``FigureWriter`` для ``savefig(..., background=True)``."""
+    global _default_writer
+    if _default_writer is None:
+        _default_writer = FigureWriter()
+        atexit.register(_default_writer.close)
+    return _default_writer
+
+
+def flush(timeout: float | None = None) -> list[Path]:
+    """Дождаться фоновых записей ``savefig(..., background=True)``."""
+    if _default_writer is None:
+        return []
+    return _default_writer.flush(timeout)
@@ -0,0 +1,227 @@
+"""
+Уровень детализации hatch-паттернов
+===================================
+
+Hatch рисуется плиткой размером в дюйм: каждый символ паттерна даёт
+``HATCH_DENSITY`` линий на дюйм, т.е. период ``dpi / (k · 6)`` пикселей
+для ``k`` повторов символа. Отсюда два случая, когда паттерн не виден,
+но время рендера и размер SVG всё равно растут с числом патчей:
+
+  • патч уже одного периода — внутри него не помещается ни одной линии
+    (гистограмма на тысячи бинов, узкие столбцы). Hatch снимается, а серия
+    сохраняет отличительный признак через стиль контура (``CUE_LINESTYLE``);
+  • период меньше двух толщин линии (``hatch.linewidth``) — линии
+    сливаются в серую заливку. Число повторов символа уменьшается
+    (``"xxx"`` → ``"xx"``), пока период не станет различимым.
+
+    from causal_notes.viz.hatch import hatch_lod_savings
+
+    savefig(fig, "hist", hatch_lod=True)         # LOD только для PNG при экспорте
+    apply_accessibility(ax, bars, lod_dpi=300)   # или сразу и насовсем
+    hatch_lod_savings(fig)                        # (с, с) без LOD и с ним
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import time
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import matplotlib as mpl
+
+# Линий на дюйм на один символ (matplotlib.hatch.get_path, density=6)
+HATCH_DENSITY = 6
+
+# Символы паттерна, которые matplotlib рисует одним семейством линий
+_FAMILIES = ("-+", "|+", "/xX", "\\xX", "o", "O", ".", "*")
+
+# Замена снятого hatch на стиль контура — по «главному» символу паттерна.
+# Все стили разные и ни один не "solid" (стиль по умолчанию): иначе серия
+# без hatch неотличима от артистов без подсказки
+CUE_LINESTYLE: dict[str, object] = {
+    "/": (0, (6, 2)),
+    "\\": (0, (6, 2, 1, 2)),
+    ".": "dotted",
+    "o": (0, (1, 3)),
+    "O": (0, (1, 5)),
+    "*": (0, (1, 1, 3, 1)),
+    "x": "dashdot",
+    "X": (0, (5, 1, 1, 1, 1, 1)),
+    "+": (0, (5, 1, 1, 1)),
+    "-": "dashed",
+    "|": (0, (3, 1, 1, 1, 1, 1)),
+}
+# Для символа вне таблицы (новые паттерны matplotlib)
+_CUE_FALLBACK = (0, (4, 2, 1, 2, 1, 2))
+
+
+def hatch_period(hatch: str | None, dpi: float) -> float:
+    """Расстояние между соседними линиями паттерна в пикселях (``inf`` — нет)."""
+    if not hatch:
+        return float("inf")
+    k = max(sum(hatch.count(c) for c in family) for family in _FAMILIES)
+    return dpi / (k * HATCH_DENSITY) if k else float("inf")
+
+
+def coarsen_hatch(hatch: str, dpi: float, min_period: float) -> str:
+    """Уменьшить число повторов символов, чтобы период был ≥ ``min_period``."""
+    if hatch_period(hatch, dpi) >= min_period:
+        return hatch
+    repeats = max(1, int(dpi / (HATCH_DENSITY * min_period)))
+    return "".join(c * min(hatch.count(c), repeats) for c in dict.fromkeys(hatch))
+
+
+def _min_period(dpi: float) -> float:
+    import matplotlib as mpl
+
+    # две толщины линии: штрих + такой же зазор
+    return 2 * mpl.rcParams["hatch.linewidth"] * dpi / 72
+
+
+def _patch_sizes(patches: list, dpi: float):
+    """Меньшая сторона каждого патча в пикселях экспорта (массив)."""
+    import numpy as np
+    from matplotlib.patches import Rectangle
+
+    sizes = np.empty(len(patches))
+    # Прямоугольники (bar/hist) — одним transform на группу с общими осями
+    groups: dict[int, tuple[object, list[int]]] = {}
+    for i, p in enumerate(patches):
+        if type(p) is Rectangle:
+            t = p.get_data_transform()
+            groups.setdefault(id(t), (t, []))[1].append(i)
+        else:
+            ext = p.get_window_extent()
+            sizes[i] = min(ext.width, ext.height) * dpi / p.figure.dpi
+    for t, idx in groups.values():
+        corners = np.array([patches[i].get_bbox().extents for i in idx])
+        lo = t.transform(corners[:, :2])
+        hi = t.transform(corners[:, 2:])
+        wh = np.abs(hi - lo).min(axis=1)
+        sizes[idx] = wh * dpi / patches[idx[0]].figure.dpi
+    return sizes
+
+
+def _collection_size(coll: "mpl.collections.Collection", dpi: float) -> float:
+    """Медианная меньшая сторона элементов коллекции (px экспорта)."""
+    import numpy as np
+
+    paths = coll.get_paths()
+    if not paths:
+        return float("inf")
+    t = coll.get_transform()
+    sizes = []
+    for path in paths:
+        v = t.transform(path.vertices)
+        sizes.append((v.max(axis=0) - v.min(axis=0)).min())
+    return float(np.median(sizes)) * dpi / coll.figure.dpi
+
+
+def plan_hatch_lod(
+    artists: Iterable["mpl.artist.Artist"],
+    dpi: float,
+    min_period: float | None = None,
+) -> list[tuple["mpl.artist.Artist", str | None, object]]:
+    """Что поменять: ``(artist, новый hatch | None, linestyle-подсказка | None)``.
+
+    Учитываются только артисты с hatch. ``min_period`` — минимальный
+    различимый период (px); по умолчанию две толщины ``hatch.linewidth``.
+    Отложенный автомасштаб осей разрешается перед измерением.
+    """
+    from matplotlib.collections import Collection
+
+    min_period = _min_period(dpi) if min_period is None else min_period
+    hatched = [a for a in artists if getattr(a, "get_hatch", lambda: None)()]
+    # Сразу после bar() автомасштаб ещё отложен и viewLim — (0, 1):
+    # get_xlim/get_ylim пересчитывают пределы до измерения патчей
+    for ax in {id(a.axes): a.axes for a in hatched if a.axes is not None}.values():
+        ax.get_xlim()
+        ax.get_ylim()
+    patches = [a for a in hatched if not isinstance(a, Collection)]
+    sizes = dict(zip(map(id, patches), _patch_sizes(patches, dpi)))
+
+    plan = []
+    for artist in hatched:
+        hatch = coarsen_hatch(artist.get_hatch(), dpi, min_period)
+        if isinstance(artist, Collection):
+            size = _collection_size(artist, dpi)
+        else:
+            size = sizes[id(artist)]
+        if size < hatch_period(hatch, dpi):
+            plan.append((artist, None, CUE_LINESTYLE.get(hatch[0], _CUE_FALLBACK)))
+        elif hatch != artist.get_hatch():
+            plan.append((artist, hatch, None))
+    return plan
+
+
+def _axes_artists(fig: "mpl.figure.Figure") -> list["mpl.artist.Artist"]:
+    return [a for ax in fig.get_axes() for a in ax.get_children()]
+
+
+def _apply(plan, report: dict[str, int]) -> list[tuple]:
+    undo = []
+    for artist, hatch, cue in plan:
+        undo.append((artist, artist.get_hatch(), artist.get_linestyle()))
+        artist.set_hatch(hatch)
+        if cue is not None:
+            artist.set_linestyle(cue)
+            report["dropped"] = report.get("dropped", 0) + 1
+        else:
+            report["coarsened"] = report.get("coarsened", 0) + 1
+    return undo
+
+
+def simplify_hatches(
+    artists: Iterable["mpl.artist.Artist"],
+    dpi: float,
+    min_period: float | None = None,
+) -> dict[str, int]:
+    """Применить LOD насовсем; вернуть ``{"dropped": n, "coarsened": m}``."""
+    report: dict[str, int] = {}
+    _apply(plan_hatch_lod(artists, dpi, min_period), report)
+    return report
+
+
+@contextlib.contextmanager
+def hatch_lod(
+    fig: "mpl.figure.Figure",
+    dpi: float,
+    report: dict[str, int],
+    min_period: float | None = None,
+) -> Iterator[dict[str, int]]:
+    """Временно применить LOD ко всем осям ``fig`` (для экспорта).
+
+    Размеры патчей берутся по текущей раскладке осей — constrained layout
+    при отрисовке может немного сжать оси.
+    """
+    undo = _apply(plan_hatch_lod(_axes_artists(fig), dpi, min_period), report)
+    try:
+        yield report
+    finally:
+        for artist, hatch, linestyle in undo:
+            artist.set_hatch(hatch)
+            artist.set_linestyle(linestyle)
+
+
+def hatch_lod_savings(
+    fig: "mpl.figure.Figure",
+    dpi: float = 300,
+    fmt: str = "png",
+    **kwargs,
+) -> tuple[float, float]:
+    """Время рендера ``fmt`` (с) без LOD и с ним.
+
+    Рисует фигуру дважды в память — для диагностики и подбора порогов,
+    а не для каждого экспорта.
+    """
+    timings = []
+    for enabled in (False, True):
+        ctx = hatch_lod(fig, dpi, {}) if enabled else contextlib.nullcontext()
+        with ctx:
+            start = time.perf_counter()
+            fig.savefig(io.BytesIO(), format=fmt, dpi=dpi, **kwargs)
+            timings.append(time.perf_counter() - start)
+    return timings[0], timings[1]
@@ -0,0 +1,517 @@
+"""
+Линтер доступности готовых фигур
+================================
+
+``audit_palette`` проверяет только статическую палитру. Линтер смотрит
+на то, что реально нарисовано: цвет каждого текста, линии, патча и
+коллекции сравнивается с фоном, на котором он лежит (легенда → оси →
+фигура, с учётом прозрачности), по ``contrast_ratio``:
+
+  • текст — 4.5:1 (AA) / 7:1 (AAA), крупный (≥18pt или ≥14pt bold) —
+    3:1 / 4.5:1 (WCAG 2.1 §1.4.3, §1.4.6);
+  • графика — 3:1 (§1.4.11). Патчу достаточно контрастной заливки
+    *или* контрастного контура.
+
+Тики, сетка и рамка осей считаются оформлением и не проверяются,
+подписи тиков — проверяются.
+
+    from causal_notes.viz.lint import lint_figure, lint_paths
+
+    report = lint_figure(fig, "ate_forest")
+    report.ok, report.findings
+
+    # CI: все SVG отчёта, в пуле процессов, JSON Lines на выходе
+    python -m causal_notes.viz.lint assets/figures --level AA > lint.jsonl
+
+Готовые файлы проверяются по SVG (у PNG нет структуры артистов).
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import math
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+from causal_notes.viz.svg import SVG_NS
+from causal_notes.viz.theme import contrast_ratio
+
+if TYPE_CHECKING:
+    import matplotlib as mpl
+
+Level = Literal["AA", "AAA"]
+
+# Минимальный контраст: (обычный текст, крупный текст, графика)
+REQUIRED: dict[str, tuple[float, float, float]] = {
+    "AA": (4.5, 3.0, 3.0),
+    "AAA": (7.0, 4.5, 3.0),
+}
+
+# Крупный текст по WCAG: 18pt, либо 14pt полужирный
+_LARGE_PT = 18.0
+_LARGE_BOLD_PT = 14.0
+
+
+@dataclass
+class Finding:
+    """Элемент фигуры с недостаточным контрастом."""
+
+    artist: str
+    kind: Literal["text", "graphic"]
+    color: str
+    background: str
+    ratio: float
+    required: float
+
+
+@dataclass
+class LintReport:
+    """Итог проверки одной фигуры (или одного SVG-файла).
+
+    ``to_dict`` — для JSON: CI читает ``ok`` и ``findings``.
+    """
+
+    source: str
+    checked: int = 0
+    findings: list[Finding] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.findings
+
+    def to_dict(self) -> dict:
+        return {"ok": self.ok, **asdict(self)}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Цвета
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def _hex(rgb: Sequence[float]) -> str:
+    return "#" + "".join(f"{round(min(max(c, 0.0), 1.0) * 255):02x}" for c in rgb[:3])
+
+
+def _rgb(hex_color: str) -> tuple[float, float, float]:
+    h = hex_color.lstrip("#")
+    return tuple(int(h[i : i + 2], 16) / 255 for i in (0, 2, 4))  # type: ignore[return-value]
+
+
+def _rgba(color, alpha: float | None = None) -> tuple[float, ...]:
+    import matplotlib.colors as mcolors
+
+    return mcolors.to_rgba(color, alpha)
+
+
+def _over(rgba: Sequence[float], background: str) -> str:
+    """Цвет ``rgba`` поверх непрозрачного ``background`` (hex)."""
+    a = rgba[3] if len(rgba) > 3 else 1.0
+    bg = _rgb(background)
+    return _hex([c * a + b * (1 - a) for c, b in zip(rgba[:3], bg)])
+
+
+@functools.lru_cache(maxsize=65_536)
+def _ratio(color: str, background: str) -> float:
+    return contrast_ratio(color, background)
+
+
+class _Checker:
+    """Накопитель проверок для одного источника."""
+
+    def __init__(self, source: str, level: Level) -> None:
+        self.report = LintReport(source)
+        self.text, self.large, self.graphic = REQUIRED[level]
+
+    def check(
+        self,
+        artist: str,
+        kind: Literal["text", "graphic"],
+        colors: Iterable[str],
+        background: str,
+        required: float,
+    ) -> None:
+        """Пройти должен хотя бы один из ``colors`` (заливка или контур)."""
+        colors = list(colors)
+        if not colors:
+            return
+        self.report.checked += 1
+        best = max(colors, key=lambda c: _ratio(c, background))
+        ratio = _ratio(best, background)
+        if ratio < required:
+            self.report.findings.append(
+                Finding(artist, kind, best, background, round(ratio, 2), required)
+            )
+
+    def check_text(
+        self, artist: str, color: str, background: str, size: float, bold: bool
+    ) -> None:
+        large = size >= _LARGE_PT or (bold and size >= _LARGE_BOLD_PT)
+        required = self.large if large else self.text
+        self.check(artist, "text", [color], background, required)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Figure
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def _describe(artist: "mpl.artist.Artist") -> str:
+    from matplotlib.text import Text
+
+    name = type(artist).__name__
+    label = artist.get_text() if isinstance(artist, Text) else artist.get_label()
+    return f"{name} {label!r}" if label and not label.startswith("_") else name
+
+
+def _edge(artist, background: str) -> list[str]:
+    lw = artist.get_linewidth()
+    if not (lw if isinstance(lw, (int, float)) else max(lw, default=0)):
+        return []
+    import numpy as np
+
+    ec = np.atleast_2d(artist.get_edgecolor())
+    return [_over(c, background) for c in np.unique(ec, axis=0) if c[3] > 0]
+
+
+def _walk(
+    artist: "mpl.artist.Artist", background: str, checker: _Checker, skip: set
+) -> None:
+    from matplotlib.axis import Axis
+    from matplotlib.collections import Collection
+    from matplotlib.image import AxesImage
+    from matplotlib.legend import Legend
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+    from matplotlib.spines import Spine
+    from matplotlib.text import Text
+
+    if not artist.get_visible() or id(artist) in skip:
+        return
+    if isinstance(artist, Axis):
+        # оформление (тики, сетка) не проверяем — только подписи
+        texts = [artist.label, *artist.get_ticklabels()]
+        for text in texts:
+            _walk(text, background, checker, skip)
+        return
+    if isinstance(artist, (Spine, AxesImage)):
+        return
+
+    if isinstance(artist, Legend):
+        frame = artist.get_frame()
+        if artist.get_frame_on() and frame.get_fill():
+            background = _over(frame.get_facecolor(), background)
+        skip = skip | {id(frame)}
+    elif isinstance(artist, Text):
+        if artist.get_text().strip():
+            weight = artist.get_fontweight()
+            bold = weight in ("bold", "heavy", "black", "extra bold", "semibold") or (
+                isinstance(weight, (int, float)) and weight >= 600
+            )
+            checker.check_text(
+                _describe(artist),
+                _over(_rgba(artist.get_color(), artist.get_alpha()), background),
+                background,
+                artist.get_fontsize(),
+                bold,
+            )
+    elif isinstance(artist, Line2D):
+        colors = []
+        if artist.get_linestyle() not in ("None", "none", " ", ""):
+            colors.append(
+                _over(_rgba(artist.get_color(), artist.get_alpha()), background)
+            )
+        if artist.get_marker() not in ("None", "none", " ", "", None):
+            for c in (artist.get_markerfacecolor(), artist.get_markeredgecolor()):
+                rgba = _rgba(c, artist.get_alpha())
+                if rgba[3] > 0:
+                    colors.append(_over(rgba, background))
+        checker.check(_describe(artist), "graphic", colors, background, checker.graphic)
+    elif isinstance(artist, Patch):
+        colors = _edge(artist, background)
+        face = artist.get_facecolor()
+        if artist.get_fill() and face[3] > 0:
+            colors.append(_over(face, background))
+        checker.check(_describe(artist), "graphic", colors, background, checker.graphic)
+    elif isinstance(artist, Collection):
+        import numpy as np
+
+        artist.update_scalarmappable()
+        faces = np.asarray(artist.get_facecolor(), dtype=float).reshape(-1, 4)
+        edges = np.asarray(artist.get_edgecolor(), dtype=float).reshape(-1, 4)
+        if not np.any(artist.get_linewidth()):
+            edges = edges[:0]
+        # Элемент i рисуется заливкой faces[i % n] и контуром edges[i % m]
+        # (scatter с cmap, edgecolor="face") — проверяем уникальные пары
+        n = max(len(faces), len(edges))
+        pairs = np.hstack(
+            [
+                np.resize(faces, (n, 4)) if len(faces) else np.zeros((n, 4)),
+                np.resize(edges, (n, 4)) if len(edges) else np.zeros((n, 4)),
+            ]
+        )
+        for pair in np.unique(pairs, axis=0):
+            colors = [_over(c, background) for c in (pair[:4], pair[4:]) if c[3] > 0]
+            checker.check(
+                _describe(artist), "graphic", colors, background, checker.graphic
+            )
+
+    for child in artist.get_children():
+        _walk(child, background, checker, skip)
+
+
+def lint_figure(
+    fig: "mpl.figure.Figure", source: str = "", level: Level = "AA"
+) -> LintReport:
+    """Проверить контраст всех видимых элементов фигуры.
+
+    Фигура один раз отрисовывается без вывода (``draw_without_rendering``),
+    чтобы подписи тиков и раскладка были такими же, как при экспорте.
+    """
+    fig.draw_without_rendering()
+    checker = _Checker(source or fig.get_label() or "figure", level)
+    fig_bg = _over(fig.get_facecolor(), "#ffffff")
+
+    axes = fig.get_axes()
+    for ax in axes:
+        bg = fig_bg
+        if ax.axison and ax.get_frame_on():
+            bg = _over(ax.get_facecolor(), fig_bg)
+        _walk(ax, bg, checker, {id(ax.patch)})
+    # suptitle, fig.text, легенда фигуры и т.д.
+    skip = {id(fig.patch), *map(id, axes)}
+    for artist in fig.get_children():
+        _walk(artist, fig_bg, checker, skip)
+    return checker.report
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# SVG
+# ──────────────────────────────────────────────────────────────────────────────
+
+_G = f"{{{SVG_NS}}}g"
+_SCALE = re.compile(r"scale\(([\d.]+)")
+_FONT_PX = re.compile(r"([\d.]+)px")
+_COLOR = re.compile(r"#[0-9a-fA-F]{6}\b")
+_URL = re.compile(r"url\(#([^)]+)\)")
+
+
+def _style(el: ET.Element) -> dict[str, str]:
+    style = {}
+    for item in el.get("style", "").split(";"):
+        if ":" in item:
+            k, v = item.split(":", 1)
+            style[k.strip()] = v.strip()
+    for attr in ("fill", "stroke", "opacity", "fill-opacity", "stroke-opacity"):
+        if attr in el.attrib:
+            style.setdefault(attr, el.get(attr))
+    return style
+
+
+def _paint(
+    style: dict[str, str],
+    key: str,
+    background: str,
+    patterns: dict[str, str] | None = None,
+) -> str | None:
+    value = style.get(key)
+    if value and (m := _URL.fullmatch(value)) and patterns:
+        value = patterns.get(m.group(1))  # hatch: цвет заливки под штриховкой
+    if not value or not _COLOR.fullmatch(value):
+        return None
+    alpha = float(style.get("opacity", 1)) * float(style.get(f"{key}-opacity", 1))
+    if alpha <= 0:
+        return None
+    return _over((*_rgb(value), alpha), background)
+
+
+def _shapes(el: ET.Element) -> Iterator[dict[str, str]]:
+    """Стили рисуемых элементов (path/use/rect/...) внутри группы."""
+    for child in el.iter():
+        if child.tag.endswith(("path", "use", "rect", "circle", "polygon", "ellipse")):
+            if child.tag == f"{{{SVG_NS}}}path" and child.get("id"):
+                continue  # определение маркера/глифа в <defs>
+            yield _style(child)
+
+
+def _text_params(el: ET.Element) -> tuple[str, float, bool]:
+    """Цвет, размер (pt) и жирность текста matplotlib в SVG."""
+    color, size, bold = "#000000", None, False
+    for child in el.iter():
+        if child.tag == f"{{{SVG_NS}}}path" and child.get("id"):
+            continue  # определение глифа: свой transform="scale(...)"
+        style = _style(child)
+        if "fill" in style and _COLOR.fullmatch(style["fill"]):
+            color = style["fill"]
+        if size is not None:
+            continue
+        font = style.get("font", "") + " " + style.get("font-size", "")
+        if m := _FONT_PX.search(font):  # svg.fonttype = "none"
+            size = float(m.group(1))
+            bold = "bold" in font
+        elif m := _SCALE.search(child.get("transform", "")):
+            size = float(m.group(1)) * 100  # глифы: scale(fontsize / 100)
+    return color, size or 10.0, bold
+
+
+def lint_svg(path: str | os.PathLike, level: Level = "AA") -> LintReport:
+    """Проверить SVG, сохранённый matplotlib.
+
+    Структура файла повторяет дерево артистов: ``figure_1`` → ``axes_N``
+    → ``text_N``/``line2d_N``/``patch_N``/``*Collection_N``. Фон —
+    первый ``patch`` фигуры, осей или легенды (у осей без рамки,
+    ``ax.axis("off")``, его нет, и первым окажется патч данных).
+    """
+    checker = _Checker(str(path), level)
+    try:
+        root = ET.parse(path).getroot()
+    except (ET.ParseError, OSError) as exc:
+        checker.report.error = f"{type(exc).__name__}: {exc}"
+        return checker.report
+
+    # hatch-заливка: <pattern><rect fill="#..."/><path .../></pattern>
+    patterns = {}
+    for pattern in root.iter(f"{{{SVG_NS}}}pattern"):
+        fills = (_style(el).get("fill", "") for el in pattern.iter())
+        color = next((f for f in fills if _COLOR.fullmatch(f)), None)
+        if color is not None:
+            patterns[pattern.get("id")] = color
+
+    def _params(text: ET.Element, bg: str) -> tuple[str, str, float, bool]:
+        color, size, bold = _text_params(text)
+        return _over(_rgb(color), bg), bg, size, bold
+
+    def background_of(group: ET.Element, parent_bg: str) -> str:
+        first = next((c for c in group if c.get("id", "").startswith("patch")), None)
+        if first is None:
+            return parent_bg
+        return next(
+            (
+                c
+                for c in (_paint(s, "fill", parent_bg) for s in _shapes(first))
+                if c is not None
+            ),
+            parent_bg,
+        )
+
+    def visit(group: ET.Element, bg: str, background_patch: ET.Element | None):
+        in_axes = group.get("id", "").startswith("axes_")
+        for child in group:
+            if child.tag != _G:
+                continue
+            gid = child.get("id", "")
+            if child is background_patch:
+                continue
+            if in_axes and gid.startswith("patch_"):
+                # рамка осей (spines) пишется как patch_N без clip-path
+                if not any(el.get("clip-path") for el in child.iter()):
+                    continue
+            if gid.startswith(("axes_", "legend_", "figure_")):
+                inner = background_of(child, bg)
+                first = next(
+                    (c for c in child if c.get("id", "").startswith("patch")), None
+                )
+                visit(child, inner, first)
+            elif gid.startswith(("xtick_", "ytick_", "matplotlib.axis_")):
+                # оформление — только подписи
+                for text in child.iter(_G):
+                    if text.get("id", "").startswith("text_"):
+                        checker.check_text(text.get("id"), *_params(text, bg))
+            elif gid.startswith("text_"):
+                checker.check_text(gid, *_params(child, bg))
+            elif gid.startswith(("line2d_", "patch_")) or "Collection_" in gid:
+                seen: set[tuple] = set()
+                for style in _shapes(child):
+                    colors = [
+                        c
+                        for c in (
+                            _paint(style, k, bg, patterns) for k in ("fill", "stroke")
+                        )
+                        if c is not None
+                    ]
+                    if colors and tuple(colors) not in seen:
+                        seen.add(tuple(colors))
+                        checker.check(gid, "graphic", colors, bg, checker.graphic)
+            elif gid.startswith(("spine", "image")):
+                continue
+            else:
+                visit(child, bg, None)
+
+    visit(root, "#ffffff", None)
+    return checker.report
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Пакетная проверка
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def _expand(paths: Iterable[str | os.PathLike]) -> list[Path]:
+    files = []
+    for p in map(Path, paths):
+        files.extend(sorted(p.rglob("*.svg")) if p.is_dir() else [p])
+    return files
+
+
+def _lint_chunk(chunk: list[Path], level: Level) -> list[LintReport]:
+    return [lint_svg(p, level) for p in chunk]
+
+
+def lint_paths(
+    paths: Iterable[str | os.PathLike],
+    level: Level = "AA",
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+) -> list[LintReport]:
+    """Проверить SVG-файлы (каталоги — рекурсивно) в пуле процессов.
+
+    Отчёты — в порядке файлов. Разбор SVG — чистый Python, поэтому
+    пропускная способность растёт с числом процессов.
+    """
+    files = _expand(paths)
+    if not files:
+        return []
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(files) == 1:
+        return _lint_chunk(files, level)
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(files) / (workers * 4)))
+    chunks = [files[i : i + chunksize] for i in range(0, len(files), chunksize)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        futures = [pool.submit(_lint_chunk, chunk, level) for chunk in chunks]
+        return [report for future in futures for report in future.result()]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m causal_notes.viz.lint",
+        description="WCAG contrast lint for SVG figures saved by matplotlib.",
+    )
+    parser.add_argument("paths", nargs="+", help="SVG files or directories")
+    parser.add_argument("--level", choices=tuple(REQUIRED), default="AA")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--all", action="store_true", help="also print reports without findings"
+    )
+    args = parser.parse_args(argv)
+
+    reports = lint_paths(args.paths, args.level, args.workers)
+    for report in reports:
+        if args.all or not report.ok:
+            print(json.dumps(report.to_dict(), ensure_ascii=False))
+    failed = sum(not r.ok for r in reports)
+    print(f"{len(reports)} figure(s), {failed} failing", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,489 @@
+"""
+Генератор категориальных палитр
+===============================
+
+``PALETTE`` задаёт пять ролей; дашбордам нужно 12–20 различимых серий.
+``generate_palette(n, style)`` дополняет цвета профиля до ``n`` так,
+чтобы:
+
+  • каждый новый цвет проходил WCAG AA (``min_contrast``) против всех
+    фонов профиля (фигура и оси);
+  • минимальное попарное ΔE CIEDE2000 было максимальным — причём
+    расстояние берётся как минимум по обычному зрению и симуляциям
+    дейтеранопии/протанопии (``causal_notes.viz.color``).
+
+Поиск — жадный maximin по кандидатам из sRGB с последующими заменами
+(swap), пока минимум растёт. Решения кэшируются на диске по ключу из
+всех ограничений, поэтому поиск выполняется один раз на машину:
+
+    from causal_notes.viz.palette import generate_palette
+
+    colors = generate_palette(16, "dark")      # первые 5 — из prop_cycle
+    get_colors(16, generate=True)               # то же через тему
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from causal_notes.viz import color
+from causal_notes.viz.cvd import MIN_DELTA_E
+from causal_notes.viz.theme import (
+    _DARK_BG,
+    _DARK_BG2,
+    _LIGHT_BG,
+    _LIGHT_BG2,
+    _PRINT_BG,
+    _profiles,
+    contrast_matrix,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Поменять при изменении алгоритма — старые решения в кэше не подойдут
+_SOLVER_VERSION = "1"
+
+# Фоны, на которых рисуются серии: фигура и оси
+BACKGROUNDS: dict[str, tuple[str, ...]] = {
+    "dark": (_DARK_BG, _DARK_BG2),
+    "light": (_LIGHT_BG, _LIGHT_BG2),
+    "print": (_PRINT_BG,),
+}
+
+
+logger = logging.getLogger(__name__)
+
+# Переопределяет корень дискового кэша (палитры, аудит, колормапы)
+CACHE_ENV = "CAUSAL_NOTES_CACHE_DIR"
+
+
+def default_cache_dir() -> Path:
+    """``$CAUSAL_NOTES_CACHE_DIR/palettes``, иначе
+    ``$XDG_CACHE_HOME/causal_notes/palettes`` (по умолчанию ``~/.cache``)."""
+    if os.environ.get(CACHE_ENV):
+        return Path(os.environ[CACHE_ENV]) / "palettes"
+    root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(root) / "causal_notes" / "palettes"
+
+
+def _write_cache(path: Path, write, mode: str = "w") -> None:
+    """Атомарно записать файл кэша; недоступный на запись каталог — пропустить.
+
+    Кэш — только ускорение: read-only ``HOME`` или переполненный диск не
+    должны ломать построение палитры.
+    """
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+            write(f)
+        os.replace(tmp, path)
+    except OSError as exc:
+        logger.debug("not caching %s: %s", path, exc)
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+
+
+def profile_colors(style: str) -> list[str]:
+    """Цвета ``axes.prop_cycle`` профиля — то, чем серии реально рисуются."""
+    return list(_profiles()[style]["axes.prop_cycle"].by_key()["color"])
+
+
+def _vision_labs(rgb: "np.ndarray", cvd: Sequence[str]) -> "np.ndarray":
+    """Lab кандидатов для обычного зрения и каждой симуляции: ``(V, N, 3)``."""
+    import numpy as np
+
+    views = [rgb] + [color.simulate_cvd(rgb, kind) for kind in cvd]
+    return np.stack([color.rgb_to_lab(v) for v in views])
+
+
+def _distance(labs: "np.ndarray", i, j) -> "np.ndarray":
+    """min по видам зрения ΔE2000 между кандидатами ``i`` и ``j``."""
+    import numpy as np
+
+    i, j = np.atleast_1d(i), np.atleast_1d(j)
+    return color.delta_e2000(labs[:, i], labs[:, j]).min(axis=0)
+
+
+def _solve(
+    anchors: "np.ndarray",
+    candidates: "np.ndarray",
+    n: int,
+    cvd: Sequence[str],
+    sweeps: int,
+) -> tuple[list[int], float]:
+    """Maximin-выбор ``n - len(anchors)`` кандидатов; индексы и min ΔE."""
+    import numpy as np
+
+    pool = np.concatenate([anchors, candidates])
+    labs = _vision_labs(pool, cvd)
+    k = len(anchors)
+    all_idx = np.arange(len(pool))
+
+    # Расстояние каждого кандидата до ближайшего выбранного
+    chosen = list(range(k))
+    nearest = np.full(len(pool), np.inf)
+    for i in chosen:
+        nearest = np.minimum(nearest, _distance(labs, i, all_idx))
+    nearest[chosen] = -np.inf
+    while len(chosen) < n:
+        best = int(np.argmax(nearest))
+        chosen.append(best)
+        nearest = np.minimum(nearest, _distance(labs, best, all_idx))
+        nearest[best] = -np.inf
+
+    # Замены: каждый свободный цвет — на кандидата, дальше всех от остальных
+    for _ in range(sweeps):
+        improved = False
+        for pos in range(k, n):
+            others = chosen[:pos] + chosen[pos + 1 :]
+            d = _distance(labs, all_idx[:, None], np.asarray(others)[None, :])
+            reach = d.min(axis=1)
+            reach[others] = -np.inf
+            current = reach[chosen[pos]]
+            best = int(np.argmax(reach))
+            if reach[best] > current + 1e-9:
+                chosen[pos] = best
+                improved = True
+        if not improved:
+            break
+
+    sel = np.asarray(chosen)
+    d = _distance(labs, sel[:, None], sel[None, :])
+    np.fill_diagonal(d, np.inf)
+    return [i - k for i in chosen[k:]], float(d.min())
+
+
+@functools.lru_cache(maxsize=64)
+def _generate(
+    n: int,
+    anchors: tuple[str, ...],
+    backgrounds: tuple[str, ...],
+    min_contrast: float,
+    cvd: tuple[str, ...],
+    candidates: int,
+    seed: int,
+    cache_dir: str | None,
+) -> tuple[tuple[str, ...], float]:
+    import numpy as np
+
+    params = {
+        "version": _SOLVER_VERSION,
+        "n": n,
+        "anchors": anchors,
+        "backgrounds": backgrounds,
+        "min_contrast": min_contrast,
+        "cvd": cvd,
+        "candidates": candidates,
+        "seed": seed,
+    }
+    key = hashlib.blake2b(
+        json.dumps(params, sort_keys=True).encode(), digest_size=12
+    ).hexdigest()
+    path = Path(cache_dir) / f"{key}.json" if cache_dir else None
+    if path is not None:
+        try:
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+            return tuple(cached["colors"]), cached["min_delta_e"]
+        except (OSError, json.JSONDecodeError, KeyError):
+            pass
+
+    rng = np.random.default_rng(seed)
+    pool = rng.random((candidates, 3))
+    ok = (contrast_matrix(pool, list(backgrounds)) >= min_contrast).all(axis=1)
+    pool = pool[ok]
+    if len(pool) < n - len(anchors):
+        raise ValueError(
+            f"only {len(pool)} of {candidates} candidates reach {min_contrast}:1 "
+            f"against {backgrounds}; lower min_contrast or raise candidates"
+        )
+
+    anchor_rgb = color.to_rgb(list(anchors)) if anchors else np.empty((0, 3))
+    picked, min_de = _solve(anchor_rgb, pool, n, cvd, sweeps=4)
+    colors = (*anchors, *color.to_hex(pool[picked]))
+
+    if path is not None:
+        record = {**params, "colors": colors, "min_delta_e": min_de}
+        _write_cache(path, lambda f: json.dump(record, f, indent=1))
+    return colors, min_de
+
+
+def generate_palette(
+    n: int,
+    style: str = "dark",
+    *,
+    anchors: Sequence[str] | None = None,
+    min_contrast: float = 4.5,
+    cvd: Sequence[str] = ("deuteranopia", "protanopia"),
+    candidates: int = 4096,
+    seed: int = 0,
+    cache_dir: str | os.PathLike | None = "default",
+) -> list[str]:
+    """Палитра из ``n`` различимых цветов для профиля ``style``.
+
+    Parameters
+    ----------
+    n : int
+        Число цветов.
+    style : "dark" | "light" | "print"
+        Профиль — определяет фоны (``BACKGROUNDS``) и цвета по умолчанию.
+    anchors : sequence of str | None
+        Цвета, которые войдут в палитру первыми и не меняются. По умолчанию
+        — цвета ``axes.prop_cycle`` профиля (``profile_colors``; для
+        ``print`` — серые). ``[]`` — всё с нуля.
+    min_contrast : float
+        Минимальный контраст WCAG новых цветов против каждого фона
+        (4.5 — AA для текста; для графики достаточно 3).
+    cvd : sequence of str
+        Симуляции дальтонизма, под которыми цвета тоже должны различаться.
+    candidates : int
+        Сколько случайных sRGB-кандидатов рассматривать.
+    seed : int
+        Сид генератора кандидатов — решение детерминировано.
+    cache_dir : path | None
+        Каталог кэша решений; ``"default"`` — ``default_cache_dir()``,
+        None — не кэшировать на диске (в процессе — всё равно кэшируется).
+        Если каталог недоступен на запись, решение просто не сохраняется.
+
+    Returns
+    -------
+    list[str]
+        Hex-цвета; первые — ``anchors`` (если ``n`` меньше — обрезаются).
+    """
+    if style not in BACKGROUNDS:
+        raise ValueError(
+            f"unknown style {style!r}; expected one of {list(BACKGROUNDS)}"
+        )
+    anchors = profile_colors(style) if anchors is None else list(anchors)
+    if n <= len(anchors):
+        return list(anchors[:n])
+    if cache_dir == "default":
+        cache_dir = default_cache_dir()
+    colors, _ = _generate(
+        n,
+        tuple(anchors),
+        BACKGROUNDS[style],
+        float(min_contrast),
+        tuple(cvd),
+        candidates,
+        seed,
+        os.fspath(cache_dir) if cache_dir is not None else None,
+    )
+    return list(colors)
+
+
+def min_distance(colors: Sequence[str], cvd: Sequence[str] = ()) -> float:
+    """Минимальное попарное ΔE2000 (и по симуляциям ``cvd``, если заданы)."""
+    import numpy as np
+
+    labs = _vision_labs(color.to_rgb(list(colors)), cvd)
+    idx = np.arange(len(colors))
+    d = _distance(labs, idx[:, None], idx[None, :])
+    np.fill_diagonal(d, np.inf)
+    return float(d.min())
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Аудит различимости серий
+# ──────────────────────────────────────────────────────────────────────────────
+
+# Поменять при изменении формулы/формата — старые аудиты в кэше не подойдут
+_AUDIT_VERSION = "1"
+
+
+@dataclass
+class DistanceAudit:
+    """ΔE2000 между всеми парами серий профиля.
+
+    Attributes
+    ----------
+    colors, hatches : list
+        Серии в порядке ``prop_cycle`` (hatch повторяется по циклу).
+    delta_e : dict[str, np.ndarray]
+        ``{"normal" | cvd: N×N}`` — матрицы с ``inf`` на диагонали.
+    threshold : float
+        Пара с меньшим ΔE различима только по hatch.
+    """
+
+    profile: str
+    colors: list[str]
+    hatches: list[str | None]
+    delta_e: dict[str, "np.ndarray"]
+    threshold: float = MIN_DELTA_E
+
+    def min_delta_e(self) -> dict[str, float]:
+        return {v: round(float(d.min()), 2) for v, d in self.delta_e.items()}
+
+    def closest(self) -> dict[str, list[str]]:
+        import numpy as np
+
+        pairs = {}
+        for vision, d in self.delta_e.items():
+            i, j = np.unravel_index(np.argmin(d), d.shape)
+            pairs[vision] = [self.colors[i], self.colors[j]]
+        return pairs
+
+    def confusable(self) -> list[tuple[int, int, str, float]]:
+        """Пары ``(i, j, vision, ΔE)``: ΔE < ``threshold`` и одинаковый hatch."""
+        import numpy as np
+
+        same_hatch = np.equal.outer(
+            np.asarray(self.hatches, dtype=object),
+            np.asarray(self.hatches, dtype=object),
+        )
+        found = []
+        for vision, d in self.delta_e.items():
+            bad = np.triu((d < self.threshold) & same_hatch, k=1)
+            found.extend(
+                (int(i), int(j), vision, round(float(d[i, j]), 2))
+                for i, j in zip(*np.nonzero(bad))
+            )
+        return found
+
+    @property
+    def ok(self) -> bool:
+        return not self.confusable()
+
+    def to_dict(self) -> dict:
+        return {
+            "profile": self.profile,
+            "n": len(self.colors),
+            "ok": self.ok,
+            "min_delta_e": self.min_delta_e(),
+            "closest": self.closest(),
+            "confusable": self.confusable(),
+        }
+
+
+def _pairwise(colors: list[str], cvd: tuple[str, ...]) -> dict[str, "np.ndarray"]:
+    """ΔE2000 по верхнему треугольнику — вдвое меньше работы, чем N×N."""
+    import numpy as np
+
+    labs = _vision_labs(color.to_rgb(colors), cvd)
+    i, j = np.triu_indices(len(colors), k=1)
+    condensed = color.delta_e2000(labs[:, i], labs[:, j]).astype(np.float32)
+    return dict(zip(("normal", *cvd), condensed))
+
+
+def _square(condensed: "np.ndarray", n: int) -> "np.ndarray":
+    import numpy as np
+
+    d = np.full((n, n), np.inf)
+    i, j = np.triu_indices(n, k=1)
+    d[i, j] = d[j, i] = condensed
+    return d
+
+
+@functools.lru_cache(maxsize=32)
+def _audit(
+    colors: tuple[str, ...], cvd: tuple[str, ...], cache_dir: str | None
+) -> dict[str, "np.ndarray"]:
+    """Condensed-матрицы ΔE по видам зрения; кэш на диске в ``.npz``."""
+    import numpy as np
+
+    params = {"version": _AUDIT_VERSION, "colors": colors, "cvd": cvd}
+    key = hashlib.blake2b(
+        json.dumps(params, sort_keys=True).encode(), digest_size=12
+    ).hexdigest()
+    path = Path(cache_dir) / f"audit-{key}.npz" if cache_dir else None
+    if path is not None:
+        try:
+            with np.load(path) as cached:
+                return {vision: cached[vision] for vision in ("normal", *cvd)}
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            pass
+
+    result = _pairwise(list(colors), cvd)
+    if path is not None:
+        _write_cache(path, lambda f: np.savez(f, **result), "wb")
+    return result
+
+
+def distance_audit(
+    colors: Sequence[str],
+    hatches: Sequence[str | None] | None = None,
+    *,
+    profile: str = "",
+    cvd: Sequence[str] = tuple(color.MACHADO),
+    threshold: float = MIN_DELTA_E,
+    cache_dir: str | os.PathLike | None = "default",
+) -> DistanceAudit:
+    """ΔE2000 всех пар ``colors`` для обычного зрения и каждой симуляции ``cvd``.
+
+    Считается только верхний треугольник, одним векторным вызовом на вид
+    зрения: 500 цветов × 4 вида ≈ 500 тыс. пар. Результат кэшируется
+    в процессе и на диске (``cache_dir``, как у ``generate_palette``) —
+    повторный аудит в CI только читает ``.npz``.
+    """
+    colors = [c.lower() for c in colors]
+    hatches = list(hatches) if hatches is not None else [None] * len(colors)
+    if cache_dir == "default":
+        cache_dir = default_cache_dir()
+    condensed = _audit(
+        tuple(colors),
+        tuple(cvd),
+        os.fspath(cache_dir) if cache_dir is not None else None,
+    )
+    return DistanceAudit(
+        profile,
+        colors,
+        hatches,
+        {v: _square(d, len(colors)) for v, d in condensed.items()},
+        threshold,
+    )
+
+
+def audit_distances(
+    profiles: Sequence[str] | None = None,
+    n: int | None = None,
+    verbose: bool = True,
+    **kwargs,
+) -> dict[str, DistanceAudit]:
+    """Аудит различимости серий всех профилей, включая серый ``print``.
+
+    Цвета и hatch берутся из ``axes.prop_cycle`` профиля; ``n`` больше
+    длины цикла — цвета дополняются ``generate_palette``, hatch повторяется
+    по циклу, как в matplotlib. ``kwargs`` — в ``distance_audit``.
+
+    Examples
+    --------
+    >>> audit_distances()
+    dark   | n=5  | normal 12.38 | protanopia 11.58 | deuteranopia 10.82 | ...
+    print  | n=5  | normal  5.39 | ... | ✓ hatch
+    """
+    from causal_notes.viz import theme
+
+    results = {}
+    for style, rc in theme._PROFILES.items():
+        if profiles is not None and style not in profiles:
+            continue
+        cycle = rc["axes.prop_cycle"].by_key()
+        colors = list(cycle["color"])
+        if n is not None and n > len(colors):
+            colors = generate_palette(n, style, anchors=colors)
+        elif n is not None:
+            colors = colors[:n]
+        base = cycle.get("hatch") or [None]
+        hatches = [base[i % len(base)] for i in range(len(colors))]
+        audit = distance_audit(colors, hatches, profile=style, **kwargs)
+        results[style] = audit
+
+        if verbose:
+            cells = " | ".join(f"{v} {d:>5.2f}" for v, d in audit.min_delta_e().items())
+            if all(d >= audit.threshold for d in audit.min_delta_e().values()):
+                mark = "✓"
+            else:
+                mark = "✓ hatch" if audit.ok else f"✗ {len(audit.confusable())}"
+            print(f"{style:<6} | n={len(colors):<3} | {cells} | {mark}")
+    return results
@@ -0,0 +1,138 @@
+"""
+Приёмники (sinks) для экспорта фигур
+====================================
+
+По умолчанию ``savefig`` пишет файлы в ``outdir``. Приёмник позволяет
+обойтись без диска: фигура рендерится в память и отдаётся ``sink.write``.
+
+  • ``MemorySink``  — байты в памяти (``memoryview`` без копии);
+  • ``ZipSink``     — дописать в открытый ``zipfile.ZipFile`` / файл zip;
+  • ``TarSink``     — дописать в открытый ``tarfile.TarFile`` (в т.ч. поток);
+  • ``FileSink``    — в произвольный file-like объект (или по одному
+    на формат).
+
+    from causal_notes.viz.sinks import ZipSink
+
+    with zipfile.ZipFile(response_stream, "w") as zf:
+        savefig(fig, "ate_forest", sink=ZipSink(zf))
+
+Свой приёмник — любой объект с методом ``write(filename, data)``.
+"""
+
+from __future__ import annotations
+
+import io
+import tarfile
+import threading
+import time
+import zipfile
+from collections.abc import Mapping
+from typing import IO, Protocol
+
+
+class Sink(Protocol):
+    """Приёмник экспортированных файлов."""
+
+    def write(self, filename: str, data: memoryview) -> object:
+        """Принять файл ``filename`` (например ``"ate.svg"``) с содержимым."""
+
+
+class MemorySink:
+    """Хранит результаты в памяти: ``sink.files["ate.svg"] -> memoryview``.
+
+    ``write`` возвращает тот же ``memoryview`` — без копирования буфера.
+    ``bytes(view)`` даёт независимую копию.
+    """
+
+    def __init__(self) -> None:
+        self.files: dict[str, memoryview] = {}
+
+    def write(self, filename: str, data: memoryview) -> memoryview:
+        self.files[filename] = data
+        return data
+
+
+class ZipSink:
+    """Дописывает файлы в zip-архив.
+
+    Parameters
+    ----------
+    target : ZipFile | str | PathLike | file-like
+        Открытый ``ZipFile`` (остаётся открытым) или куда создать архив;
+        во втором случае архив закрывается через ``close()``.
+    prefix : str
+        Каталог внутри архива.
+    compression : int
+        Метод сжатия для новых записей. PNG уже сжат, поэтому для него
+        используется ``ZIP_STORED``.
+    """
+
+    def __init__(
+        self,
+        target: zipfile.ZipFile | str | IO[bytes],
+        prefix: str = "",
+        compression: int = zipfile.ZIP_DEFLATED,
+    ) -> None:
+        self._owned = not isinstance(target, zipfile.ZipFile)
+        self.zip = zipfile.ZipFile(target, "w") if self._owned else target
+        self.prefix = prefix
+        self.compression = compression
+        self._lock = threading.Lock()
+
+    def write(self, filename: str, data: memoryview) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(self.prefix + filename, date_time=time.localtime()[:6])
+        info.compress_type = (
+            zipfile.ZIP_STORED if filename.endswith(".png") else self.compression
+        )
+        with self._lock:  # ZipFile не потокобезопасен (FigureWriter)
+            with self.zip.open(info, "w") as f:
+                f.write(data)
+        return info
+
+    def close(self) -> None:
+        if self._owned:
+            self.zip.close()
+
+
+class TarSink:
+    """Дописывает файлы в открытый ``tarfile.TarFile``.
+
+    Подходит и для потоковых архивов (``tarfile.open(fileobj=..., mode="w|gz")``):
+    размер записи известен заранее, перемотка не нужна.
+    """
+
+    def __init__(self, tar: tarfile.TarFile, prefix: str = "") -> None:
+        self.tar = tar
+        self.prefix = prefix
+        self._lock = threading.Lock()
+
+    def write(self, filename: str, data: memoryview) -> tarfile.TarInfo:
+        info = tarfile.TarInfo(self.prefix + filename)
+        info.size = data.nbytes
+        info.mtime = int(time.time())
+        with self._lock:
+            self.tar.addfile(info, io.BytesIO(data))
+        return info
+
+
+class FileSink:
+    """Пишет в file-like объект(ы).
+
+    Parameters
+    ----------
+    target : file-like | Mapping[str, file-like]
+        Один объект — все форматы пишутся в него подряд (удобно для одного
+        формата, например HTTP-ответа); словарь ``{"svg": f1, "png": f2}``
+        — по объекту на формат.
+    """
+
+    def __init__(self, target: IO[bytes] | Mapping[str, IO[bytes]]) -> None:
+        self.target = target
+
+    def write(self, filename: str, data: memoryview) -> IO[bytes]:
+        if isinstance(self.target, Mapping):
+            f = self.target[filename.rsplit(".", 1)[-1]]
+        else:
+            f = self.target
+        f.write(data)
+        return f
@@ -16,27 +16,66 @@ CausalViz Theme — Accessibility-first visualization kit
     ...
     savefig(fig, "my_plot")    # сохраняет .svg + .png одновременно
 
+    with theme_context("print"):   # временно другой профиль
+        ...
+
+Потоки
+------
+``set_theme`` меняет глобальные rcParams. Для параллельной отрисовки
+разных профилей используйте ``Theme(style).activate()`` / ``Theme.subplots``
+и передавайте тему явно: ``get_colors(theme=...)``.
+
 WCAG AA
 -------
 Все сочетания текст/фон проверены по формуле относительной яркости
 (WCAG 2.1 §1.4.3). Минимальный контраст: 4.5:1 для обычного текста,
-3:1 для крупного (≥18pt) и графических элементов.
+3:1 для крупного (≥18pt) и графических элементов. Проверить массив
+цветов или изображение целиком — ``contrast_matrix``.
 
 Дальтонизм
 ----------
 Каждая категория имеет уникальный hatch-паттерн. Графики различимы
 даже в оттенках серого / при дейтеранопии / при протанопии.
+
+Колормапы
+---------
+``set_theme`` регистрирует ``causal_<profile>_seq|div|<role>`` и делает
+``seq`` картой по умолчанию: светлота равномерна, все цвета дают 3:1
+с фоном профиля (``causal_notes.viz.cmaps``).
 """
 
 from __future__ import annotations
 
+import contextlib
+import functools
+import importlib
 import os
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import Future
+from contextvars import ContextVar
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Literal
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Literal
+
+from causal_notes.viz import events
+
+if TYPE_CHECKING:
+    import matplotlib as mpl
+    import numpy as np
 
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-import numpy as np
+    from causal_notes.viz.cache import FigureCache
+    from causal_notes.viz.sinks import Sink
+
+# matplotlib/numpy импортируются лениво: палитра, hatch-паттерны и
+# проверка контраста доступны без них (быстрый старт CLI/воркеров).
+_LAZY_MODULES = {
+    "mpl": "matplotlib",
+    "plt": "matplotlib.pyplot",
+    "np": "numpy",
+}
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Палитра — все цвета прошли WCAG AA на своих фонах
@@ -93,96 +132,112 @@ _PRINT_GRID = "#9ca3af"
 # Минимальный размер шрифта для экспорта (pt)
 _EXPORT_FONTSIZE = 11
 
-_PROFILES: dict[str, dict] = {
-    "dark": {
-        "figure.facecolor": _DARK_BG,
-        "axes.facecolor": _DARK_BG2,
-        "axes.edgecolor": _DARK_GRID,
-        "axes.labelcolor": _DARK_FG,
-        "axes.titlecolor": _DARK_FG,
-        "text.color": _DARK_FG,
-        "xtick.color": _DARK_FG,
-        "ytick.color": _DARK_FG,
-        "grid.color": _DARK_GRID,
-        "legend.facecolor": _DARK_BG2,
-        "legend.edgecolor": _DARK_GRID,
-        "legend.labelcolor": _DARK_FG,
-        "savefig.facecolor": _DARK_BG,
-        "axes.prop_cycle": mpl.cycler(
-            color=[
-                PALETTE["treatment"],
-                PALETTE["control"],
-                PALETTE["confounder"],
-                PALETTE["outcome"],
-                PALETTE["neutral"],
-            ],
-            hatch=[
-                HATCH["treatment"],
-                HATCH["control"],
-                HATCH["confounder"],
-                HATCH["outcome"],
-                HATCH["neutral"],
-            ],
-        ),
-    },
-    "light": {
-        "figure.facecolor": _LIGHT_BG,
-        "axes.facecolor": _LIGHT_BG2,
-        "axes.edgecolor": _LIGHT_GRID,
-        "axes.labelcolor": _LIGHT_FG,
-        "axes.titlecolor": _LIGHT_FG,
-        "text.color": _LIGHT_FG,
-        "xtick.color": _LIGHT_FG,
-        "ytick.color": _LIGHT_FG,
-        "grid.color": _LIGHT_GRID,
-        "legend.facecolor": _LIGHT_BG2,
-        "legend.edgecolor": _LIGHT_GRID,
-        "legend.labelcolor": _LIGHT_FG,
-        "savefig.facecolor": _LIGHT_BG,
-        "axes.prop_cycle": mpl.cycler(
-            color=[
-                PALETTE["treatment_l"],
-                PALETTE["control_l"],
-                PALETTE["confounder_l"],
-                PALETTE["outcome_l"],
-                PALETTE["neutral_l"],
-            ],
-            hatch=[
-                HATCH["treatment"],
-                HATCH["control"],
-                HATCH["confounder"],
-                HATCH["outcome"],
-                HATCH["neutral"],
-            ],
-        ),
-    },
-    "print": {
-        # Только серые тона + увеличенные паттерны для ч/б печати
-        "figure.facecolor": _PRINT_BG,
-        "axes.facecolor": _PRINT_BG,
-        "axes.edgecolor": _PRINT_FG,
-        "axes.labelcolor": _PRINT_FG,
-        "axes.titlecolor": _PRINT_FG,
-        "text.color": _PRINT_FG,
-        "xtick.color": _PRINT_FG,
-        "ytick.color": _PRINT_FG,
-        "grid.color": _PRINT_GRID,
-        "legend.facecolor": _PRINT_BG,
-        "legend.edgecolor": _PRINT_FG,
-        "legend.labelcolor": _PRINT_FG,
-        "savefig.facecolor": _PRINT_BG,
-        "axes.prop_cycle": mpl.cycler(
-            color=["#555555", "#888888", "#222222", "#aaaaaa", "#333333"],
-            hatch=[
-                HATCH["treatment"],
-                HATCH["control"],
-                HATCH["confounder"],
-                HATCH["outcome"],
-                HATCH["neutral"],
-            ],
-        ),
-    },
-}
+_STYLES = ("dark", "light", "print")
+
+
+@functools.lru_cache(maxsize=None)
+def _profiles() -> dict[str, dict]:
+    """Конфигурации профилей (строятся при первом обращении).
+
+    ``mpl.cycler`` требует matplotlib, поэтому словарь собирается лениво;
+    снаружи он доступен как ``theme._PROFILES``.
+    """
+    import matplotlib as mpl
+
+    return {
+        "dark": {
+            "figure.facecolor": _DARK_BG,
+            "axes.facecolor": _DARK_BG2,
+            "axes.edgecolor": _DARK_GRID,
+            "axes.labelcolor": _DARK_FG,
+            "axes.titlecolor": _DARK_FG,
+            "text.color": _DARK_FG,
+            "xtick.color": _DARK_FG,
+            "ytick.color": _DARK_FG,
+            "grid.color": _DARK_GRID,
+            "legend.facecolor": _DARK_BG2,
+            "legend.edgecolor": _DARK_GRID,
+            "legend.labelcolor": _DARK_FG,
+            "savefig.facecolor": _DARK_BG,
+            "image.cmap": "causal_dark_seq",  # см. causal_notes.viz.cmaps
+            "axes.prop_cycle": mpl.cycler(
+                color=[
+                    PALETTE["treatment"],
+                    PALETTE["control"],
+                    PALETTE["confounder"],
+                    PALETTE["outcome"],
+                    PALETTE["neutral"],
+                ],
+                hatch=[
+                    HATCH["treatment"],
+                    HATCH["control"],
+                    HATCH["confounder"],
+                    HATCH["outcome"],
+                    HATCH["neutral"],
+                ],
+            ),
+        },
+        "light": {
+            "figure.facecolor": _LIGHT_BG,
+            "axes.facecolor": _LIGHT_BG2,
+            "axes.edgecolor": _LIGHT_GRID,
+            "axes.labelcolor": _LIGHT_FG,
+            "axes.titlecolor": _LIGHT_FG,
+            "text.color": _LIGHT_FG,
+            "xtick.color": _LIGHT_FG,
+            "ytick.color": _LIGHT_FG,
+            "grid.color": _LIGHT_GRID,
+            "legend.facecolor": _LIGHT_BG2,
+            "legend.edgecolor": _LIGHT_GRID,
+            "legend.labelcolor": _LIGHT_FG,
+            "savefig.facecolor": _LIGHT_BG,
+            "image.cmap": "causal_light_seq",  # см. causal_notes.viz.cmaps
+            "axes.prop_cycle": mpl.cycler(
+                color=[
+                    PALETTE["treatment_l"],
+                    PALETTE["control_l"],
+                    PALETTE["confounder_l"],
+                    PALETTE["outcome_l"],
+                    PALETTE["neutral_l"],
+                ],
+                hatch=[
+                    HATCH["treatment"],
+                    HATCH["control"],
+                    HATCH["confounder"],
+                    HATCH["outcome"],
+                    HATCH["neutral"],
+                ],
+            ),
+        },
+        "print": {
+            # Только серые тона + увеличенные паттерны для ч/б печати
+            "figure.facecolor": _PRINT_BG,
+            "axes.facecolor": _PRINT_BG,
+            "axes.edgecolor": _PRINT_FG,
+            "axes.labelcolor": _PRINT_FG,
+            "axes.titlecolor": _PRINT_FG,
+            "text.color": _PRINT_FG,
+            "xtick.color": _PRINT_FG,
+            "ytick.color": _PRINT_FG,
+            "grid.color": _PRINT_GRID,
+            "legend.facecolor": _PRINT_BG,
+            "legend.edgecolor": _PRINT_FG,
+            "legend.labelcolor": _PRINT_FG,
+            "savefig.facecolor": _PRINT_BG,
+            "image.cmap": "causal_print_seq",  # см. causal_notes.viz.cmaps
+            "axes.prop_cycle": mpl.cycler(
+                color=["#555555", "#888888", "#222222", "#aaaaaa", "#333333"],
+                hatch=[
+                    HATCH["treatment"],
+                    HATCH["control"],
+                    HATCH["confounder"],
+                    HATCH["outcome"],
+                    HATCH["neutral"],
+                ],
+            ),
+        },
+    }
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Общие параметры для всех профилей
@@ -234,6 +289,85 @@ _COMMON: dict = {
 _current_profile: str = "dark"
 
 
+@functools.lru_cache(maxsize=None)
+def _compiled_rc(
+    style: str, usetex: bool = False, fontsize: int | None = None
+) -> Mapping[str, object]:
+    """Собрать и провалидировать rc-снимок профиля (один раз на комбинацию).
+
+    Результат кэшируется по ``(style, usetex, fontsize)`` и возвращается
+    как read-only mapping, поэтому повторные переключения темы не платят
+    за слияние словарей, а ``rcParams.update`` получает только ключи,
+    отличающиеся от текущих.
+    После правки ``_COMMON``/``_PROFILES`` нужно вызвать
+    ``_compiled_rc.cache_clear()``.
+    """
+    import matplotlib as mpl
+
+    from causal_notes.viz import cmaps
+
+    # image.cmap профиля ссылается на его карты в реестре matplotlib
+    cmaps.register(style)
+
+    rc = {**_COMMON, **_profiles()[style]}
+
+    if usetex:
+        rc["text.usetex"] = True
+        rc["font.family"] = "serif"
+
+    if fontsize is not None:
+        rc["font.size"] = fontsize
+        rc["axes.labelsize"] = fontsize + 1
+        rc["axes.titlesize"] = fontsize + 3
+        rc["xtick.labelsize"] = fontsize
+        rc["ytick.labelsize"] = fontsize
+        rc["legend.fontsize"] = fontsize
+
+    # RcParams валидирует значения при создании — ошибка профиля видна сразу
+    return MappingProxyType(dict(mpl.RcParams(rc)))
+
+
+def _rc_diff(rc: Mapping[str, object]) -> dict[str, object]:
+    """Ключи ``rc``, чьи значения отличаются от текущих rcParams."""
+    import matplotlib as mpl
+
+    params = mpl.rcParams
+    diff = {}
+    for key, value in rc.items():
+        current = params[key]
+        if not (current is value or current == value):
+            diff[key] = value
+    return diff
+
+
+def _apply_rc(rc: Mapping[str, object]) -> dict[str, object]:
+    """Применить уже провалидированный снимок, трогая только изменённые ключи.
+
+    Returns
+    -------
+    dict
+        Предыдущие значения изменённых ключей — для отката.
+    """
+    import matplotlib as mpl
+
+    params = mpl.rcParams
+    new = _rc_diff(rc)
+    if not new:
+        return {}
+    # Фоновые записи рисуют с текущими rcParams — дождаться их
+    with _rc_unpinned:
+        _rc_unpinned.wait_for(lambda: _rc_pins == 0)
+    changed = {key: params[key] for key in new}
+    # Валидируются только изменённые ключи, а не весь профиль
+    params.update(new)
+    return changed
+
+
+def _rc_matches(rc: Mapping[str, object]) -> bool:
+    """Глобальные rcParams уже совпадают со снимком ``rc``."""
+    return not _rc_diff(rc)
+
+
 def set_theme(
     style: Literal["dark", "light", "print"] = "dark",
     usetex: bool = False,
@@ -259,71 +393,341 @@ def set_theme(
     >>> set_theme("print", usetex=True)  # ч/б + системный LaTeX
     """
     global _current_profile
-    _current_profile = style
+    start = time.perf_counter()
+    rc = _compiled_rc(style, usetex, fontsize)
+    with _RC_LOCK:
+        _current_profile = style
+        changed = _apply_rc(rc)
+    events.emit(
+        "set_theme",
+        profile=style,
+        seconds=time.perf_counter() - start,
+        changed=len(changed),
+    )
+
+
+@contextlib.contextmanager
+def theme_context(
+    style: Literal["dark", "light", "print"] = "dark",
+    usetex: bool = False,
+    fontsize: int | None = None,
+) -> Iterator[None]:
+    """Временно переключить тему внутри ``with``-блока.
 
-    rc = {**_COMMON, **_PROFILES[style]}
+    В отличие от ``mpl.rc_context`` не копирует все rcParams: меняются
+    и затем восстанавливаются только ключи, отличающиеся от текущих.
 
-    if usetex:
-        rc["text.usetex"] = True
-        rc["font.family"] = "serif"
+    Examples
+    --------
+    >>> set_theme("dark")
+    >>> with theme_context("print"):
+    ...     savefig(fig, "ate_bw")     # ч/б версия
+    """
+    global _current_profile
+    start = time.perf_counter()
+    rc = _compiled_rc(style, usetex, fontsize)
+    with _RC_LOCK:
+        prev_profile = _current_profile
+        changed = _apply_rc(rc)
+        _current_profile = style
+    events.emit(
+        "set_theme",
+        profile=style,
+        seconds=time.perf_counter() - start,
+        changed=len(changed),
+        context=True,
+    )
+    try:
+        yield
+    finally:
+        with _RC_LOCK:
+            _current_profile = prev_profile
+            _apply_rc(changed)
 
-    if fontsize is not None:
-        rc["font.size"] = fontsize
-        rc["axes.labelsize"] = fontsize + 1
-        rc["axes.titlesize"] = fontsize + 3
-        rc["xtick.labelsize"] = fontsize
-        rc["ytick.labelsize"] = fontsize
-        rc["legend.fontsize"] = fontsize
 
-    mpl.rcParams.update(rc)
+# ──────────────────────────────────────────────────────────────────────────────
+# Theme — профиль как значение (для потоков и отдельных фигур)
+# ──────────────────────────────────────────────────────────────────────────────
+
+# rcParams — глобальный словарь процесса, поэтому участки, где matplotlib
+# его читает (создание артистов, отрисовка), сериализуются этим локом.
+_RC_LOCK = threading.RLock()
+
+# Фоновый экспорт (FigureWriter) рисует с глобальными rcParams как есть и
+# сам их не меняет: основной поток в это время строит следующие фигуры без
+# лока. Запись «закрепляет» rcParams от submit до конца экспорта, а
+# _apply_rc (set_theme, theme_context, Theme.activate) ждёт, пока
+# закреплённых записей не останется.
+_rc_pins = 0
+_rc_unpinned = threading.Condition()
+_rc_pinned: ContextVar[bool] = ContextVar("causalviz_rc_pinned", default=False)
+
 
+def _pin_rc() -> None:
+    """Закрепить текущие rcParams; вызывать под ``_RC_LOCK``."""
+    global _rc_pins
+    with _rc_unpinned:
+        _rc_pins += 1
 
-def get_colors(n: int | None = None) -> list[str]:
+
+def _unpin_rc() -> None:
+    global _rc_pins
+    with _rc_unpinned:
+        _rc_pins -= 1
+        if not _rc_pins:
+            _rc_unpinned.notify_all()
+
+
+_active_theme: ContextVar["Theme | None"] = ContextVar("causalviz_theme", default=None)
+
+_FIGURE_ATTR = "_causalviz_theme"
+
+
+@dataclass(frozen=True)
+class Theme:
+    """Неизменяемый профиль CausalViz.
+
+    В отличие от ``set_theme`` не трогает ``_current_profile``: тема
+    передаётся явно, привязывается к фигуре (``bind``/``subplots``) или
+    действует в пределах ``activate()`` — через contextvar, т.е. отдельно
+    для каждого потока и asyncio-задачи.
+
+    Examples
+    --------
+    >>> def render(style):
+    ...     theme = Theme(style)
+    ...     with theme.activate():
+    ...         fig, ax = theme.subplots()
+    ...         bars = ax.bar(x, heights, color=theme.colors(len(x)))
+    ...         apply_accessibility(ax, bars, theme=theme)
+    ...         return savefig(fig, f"ate_{style}")
+    >>> with ThreadPoolExecutor() as pool:
+    ...     list(pool.map(render, ["dark", "light"]))
+    """
+
+    style: Literal["dark", "light", "print"] = "dark"
+    usetex: bool = False
+    fontsize: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.style not in _STYLES:
+            raise ValueError(f"Unknown style {self.style!r}; expected one of {_STYLES}")
+
+    @property
+    def rc(self) -> Mapping[str, object]:
+        """Провалидированный rc-снимок профиля (из кэша)."""
+        return _compiled_rc(self.style, self.usetex, self.fontsize)
+
+    @property
+    def edgecolor(self) -> str:
+        """Цвет контура, на котором виден hatch."""
+        return _DARK_FG if self.style == "dark" else _PRINT_FG
+
+    def colors(self, n: int | None = None, generate: bool = False) -> list[str]:
+        """Цвета серий этого профиля — см. ``get_colors``."""
+        if generate and n and n > len(SERIES_ORDER):
+            from causal_notes.viz.palette import generate_palette
+
+            return generate_palette(n, self.style)
+        suffix = "_l" if self.style == "light" else ""
+        keys = SERIES_ORDER[:n] if n else SERIES_ORDER
+        return [PALETTE.get(k + suffix, PALETTE.get(k, "#888888")) for k in keys]
+
+    def hatches(self, n: int | None = None) -> list[str]:
+        """Hatch-паттерны серий — см. ``get_hatches``."""
+        keys = SERIES_ORDER[:n] if n else SERIES_ORDER
+        return [HATCH[k] for k in keys]
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["Theme"]:
+        """Применить тему на время блока, не меняя глобальный профиль.
+
+        Держит ``_RC_LOCK``: внутри блока rcParams принадлежат этой теме,
+        другие потоки ждут. После выхода rcParams восстанавливаются.
+        """
+        with _RC_LOCK:
+            token = _active_theme.set(self)
+            changed = _apply_rc(self.rc)
+            try:
+                yield self
+            finally:
+                _apply_rc(changed)
+                _active_theme.reset(token)
+
+    def bind(self, fig: "mpl.figure.Figure") -> "mpl.figure.Figure":
+        """Привязать тему к фигуре: ``savefig`` и ``apply_accessibility``
+        будут использовать её вместо глобального профиля."""
+        setattr(fig, _FIGURE_ATTR, self)
+        return fig
+
+    def figure(self, **kwargs) -> "mpl.figure.Figure":
+        """Создать привязанную к теме ``Figure`` без pyplot."""
+        from matplotlib.figure import Figure
+
+        with self.activate():
+            return self.bind(Figure(**kwargs))
+
+    def subplots(self, nrows: int = 1, ncols: int = 1, **kwargs):
+        """Аналог ``plt.subplots`` — фигура и оси в стиле темы.
+
+        Фигура создаётся без pyplot (не попадает в глобальный менеджер
+        фигур), поэтому её не нужно закрывать через ``plt.close``.
+        """
+        fig_kw = {k: kwargs.pop(k) for k in ("figsize", "dpi") if k in kwargs}
+        fig = self.figure(**fig_kw)
+        with self.activate():
+            axes = fig.subplots(nrows, ncols, **kwargs)
+        return fig, axes
+
+
+def theme_of(fig: "mpl.figure.Figure") -> Theme | None:
+    """Тема, привязанная к фигуре через ``Theme.bind``, или None."""
+    return getattr(fig, _FIGURE_ATTR, None)
+
+
+def current_theme() -> Theme:
+    """Активная тема: из ``Theme.activate()`` или глобальный профиль."""
+    theme = _active_theme.get()
+    return theme if theme is not None else Theme(_current_profile)  # type: ignore[arg-type]
+
+
+def get_colors(
+    n: int | None = None, theme: Theme | None = None, generate: bool = False
+) -> list[str]:
     """Вернуть список цветов текущего профиля.
 
     Parameters
     ----------
     n : int | None
-        Количество цветов. Если None — возвращает все 5.
+        Количество цветов. Если None — возвращает все 5 (больше 5 без
+        ``generate`` тоже не бывает).
+    theme : Theme | None
+        Явная тема. По умолчанию — ``current_theme()``.
+    generate : bool
+        При ``n > 5`` дополнить палитру через
+        ``causal_notes.viz.palette.generate_palette`` (различимые в т.ч.
+        при дейтеранопии/протанопии, AA на фонах профиля). Первое решение
+        ищется ~1–2 с и кэшируется на диске — поэтому только по запросу.
     """
-    suffix = "_l" if _current_profile == "light" else ""
-    keys = SERIES_ORDER[:n] if n else SERIES_ORDER
-    return [
-        PALETTE.get(k + suffix, PALETTE.get(k, "#888888"))  # type: ignore[arg-type]
-        for k in keys
-    ]
+    return (theme or current_theme()).colors(n, generate)
 
 
-def get_hatches(n: int | None = None) -> list[str]:
+def get_hatches(n: int | None = None, theme: Theme | None = None) -> list[str]:
     """Вернуть список hatch-паттернов."""
-    keys = SERIES_ORDER[:n] if n else SERIES_ORDER
-    return [HATCH[k] for k in keys]
+    return (theme or current_theme()).hatches(n)
 
 
-def apply_accessibility(ax: "mpl.axes.Axes", bars: list) -> None:
+def apply_accessibility(
+    ax: "mpl.axes.Axes",
+    bars: "Iterable | mpl.collections.Collection",
+    theme: Theme | None = None,
+    lod_dpi: float | None = None,
+) -> dict[str, int]:
     """Применить hatch-паттерны к набору bars/patches.
 
     Parameters
     ----------
     ax : matplotlib Axes
-    bars : list
-        Список патчей (возвращается bar(), barh(), hist() и т.д.)
+    bars : list | BarContainer | Collection
+        Патчи (возвращаются bar(), barh(), hist() и т.д.), ``PatchCollection``
+        / ``PolyCollection`` или список коллекций. Паттерны идут по кругу:
+        i-й патч (коллекция) получает ``hatches[i % len(hatches)]``.
+        У коллекции hatch один на все элементы — так устроен matplotlib.
+    theme : Theme | None
+        Явная тема. По умолчанию — тема, привязанная к фигуре ``ax``,
+        иначе ``current_theme()``.
+    lod_dpi : float | None
+        Упростить hatch под экспорт с этим dpi (``causal_notes.viz.hatch``):
+        на патчах уже одного периода паттерна hatch снимается и заменяется
+        стилем контура, слишком частые паттерны прореживаются.
+
+    Returns
+    -------
+    dict[str, int]
+        ``{"dropped": n, "coarsened": m}`` при ``lod_dpi``, иначе пустой.
+
+    Notes
+    -----
+    Работает пакетно: hatch-паттерны и цвет контура проверяются один раз
+    на вызов, «пустые» контуры ищутся одной операцией над массивом
+    цветов, а оси помечаются устаревшими один раз, а не на каждый сеттер.
+    На 10^3–10^5 столбцов — в 7–9 раз быстрее поштучных
+    ``set_hatch``/``set_edgecolor`` (см. ``benchmarks/bench_accessibility.py``);
+    коллекции — один вызов на серию.
 
     Examples
     --------
     >>> bars = ax.bar(x, heights)
     >>> apply_accessibility(ax, bars)
     """
-    hatches = get_hatches()
-    for i, bar in enumerate(bars):
-        h = hatches[i % len(hatches)]
-        bar.set_hatch(h)
-        # edgecolor нужен чтобы hatch был виден в любом профиле
-        if bar.get_edgecolor() is None or np.allclose(bar.get_edgecolor(), 0):
-            if _current_profile == "dark":
-                bar.set_edgecolor(_DARK_FG)
-            else:
-                bar.set_edgecolor(_PRINT_FG)
+    from matplotlib.collections import Collection
+
+    theme = theme or theme_of(ax.figure) or current_theme()
+    hatches = theme.hatches()
+    items = [bars] if isinstance(bars, Collection) else list(bars)
+    if not items:
+        return {}
+
+    patches = [b for b in items if not isinstance(b, Collection)]
+    if patches:
+        _hatch_patches(patches, hatches, theme.edgecolor)
+    for i, item in enumerate(items):
+        if isinstance(item, Collection):
+            _hatch_collection(item, hatches[i % len(hatches)], theme.edgecolor)
+    ax.stale = True
+    if lod_dpi is None:
+        return {}
+
+    from causal_notes.viz.hatch import simplify_hatches
+
+    return simplify_hatches(items, lod_dpi)
+
+
+def _hatch_patches(patches: list, hatches: list[str], edgecolor: str) -> None:
+    """Hatch + контур для списка ``Patch`` через публичные сеттеры."""
+    import matplotlib.colors as mcolors
+    import numpy as np
+    from matplotlib.rcsetup import validate_hatch
+
+    # Неверный паттерн — ошибка до того, как часть патчей уже изменена
+    for h in set(hatches):
+        validate_hatch(h)
+
+    # edgecolor нужен чтобы hatch был виден в любом профиле:
+    # (0, 0, 0, 0) — контура нет
+    ec = np.array([p.get_edgecolor() for p in patches], dtype=float)
+    bare = np.isclose(ec, 0).all(axis=1)
+
+    # Каждый сеттер поднимает stale по цепочке патч → оси → фигура —
+    # это половина времени; вызывающий помечает оси один раз
+    rgba = mcolors.to_rgba(edgecolor)
+    k = len(hatches)
+    for i, p in enumerate(patches):
+        callback, p.stale_callback = p.stale_callback, None
+        try:
+            p.set_hatch(hatches[i % k])
+            if bare[i]:
+                p.set_edgecolor(rgba)
+        finally:
+            p.stale_callback = callback
+
+
+def _hatch_collection(
+    coll: "mpl.collections.Collection", hatch: str, edgecolor: str
+) -> None:
+    """Hatch + контур для коллекции: цвета меняются массивом."""
+    import matplotlib.colors as mcolors
+    import numpy as np
+
+    coll.set_hatch(hatch)
+    ec = np.asarray(coll.get_edgecolor(), dtype=float).reshape(-1, 4)
+    bare = np.isclose(ec, 0).all(axis=1)
+    if len(ec) == 0 or bare.all():
+        coll.set_edgecolor(edgecolor)
+    elif bare.any():
+        ec = ec.copy()
+        ec[bare] = mcolors.to_rgba(edgecolor)
+        coll.set_edgecolor(ec)
 
 
 def savefig(
@@ -331,13 +735,26 @@ def savefig(
     name: str,
     outdir: str | Path = ".",
     formats: tuple[str, ...] = ("svg", "png"),
+    parallel: bool = False,
+    background: bool = False,
+    cache: "FigureCache | None" = None,
+    optimize_svg: bool = False,
+    rasterize_threshold: int | bool | None = None,
+    png_scales: tuple[int, ...] | None = None,
+    sink: "Sink | None" = None,
+    hatch_lod: bool = False,
     **kwargs,
-) -> list[Path]:
+) -> list | Future[list]:
     """Сохранить фигуру одновременно в SVG и PNG.
 
     SVG — для web/Pages (масштабируется без пикселизации).
     PNG — для README/GitHub (fallback где SVG не рендерится).
 
+    Растровые форматы рисуются одним проходом, векторные при
+    ``parallel=True`` — параллельно в пуле процессов. Если к фигуре
+    привязана ``Theme`` (``Theme.bind``), отрисовка идёт с её rcParams.
+    Время по форматам — см. ``causal_notes.viz.export.export_figure``.
+
     Parameters
     ----------
     fig : Figure
@@ -347,29 +764,65 @@ def savefig(
         Директория. По умолчанию текущая.
     formats : tuple
         Форматы для сохранения. По умолчанию ("svg", "png").
+    parallel : bool
+        Рисовать векторные форматы в отдельных процессах (для больших фигур).
+    background : bool
+        Записать в фоновом потоке: вернуть ``Future`` сразу, фигуру закрыть
+        после записи. Дождаться всех записей — ``export.flush()``.
+    cache : FigureCache | None
+        Кэш ``causal_notes.viz.cache``: неизменённые фигуры не
+        перерисовываются, возвращаются уже сохранённые файлы.
+    optimize_svg : bool
+        Сжать SVG после записи (``causal_notes.viz.svg.optimize_svg``):
+        убрать метаданные, общие hatch-паттерны, округлить координаты.
+    rasterize_threshold : int | bool | None
+        В векторных форматах растеризовать артисты данных, у которых больше
+        стольких элементов (точек/путей); оси, текст и легенда — векторные.
+        True — порог по умолчанию ``export.DENSE_THRESHOLD``.
+    png_scales : tuple[int, ...] | None
+        Например ``(1, 2, 3)``: ещё ``name@1x.png``/``@2x``/``@3x`` и
+        ``name.srcset.json`` из одного рендера (варианты — в списке путей).
+    sink : Sink | None
+        Вместо файлов в ``outdir`` — приёмник из ``causal_notes.viz.sinks``
+        (``MemorySink``, ``ZipSink``, ``TarSink``, ``FileSink``).
+    hatch_lod : bool
+        В PNG (и других растровых форматах) снять hatch с патчей, в которые
+        при 300 dpi не помещается ни одной линии паттерна (замена — стиль
+        контура), и проредить слишком частые паттерны
+        (``causal_notes.viz.hatch``). SVG/PDF остаются как есть.
     **kwargs
         Дополнительные аргументы для savefig().
 
     Returns
     -------
     list[Path]
-        Список сохранённых файлов.
+        Список сохранённых файлов (``Future`` от него при ``background``).
+        С ``sink`` — то, что вернул ``sink.write`` для каждого формата.
 
     Examples
     --------
     >>> paths = savefig(fig, "ate_forest_plot", outdir="assets/figures")
+    >>> savefig(fig, "ate_forest_plot", background=True)   # не блокирует
     """
-    outdir = Path(outdir)
-    outdir.mkdir(parents=True, exist_ok=True)
-
-    saved = []
-    for fmt in formats:
-        path = outdir / f"{name}.{fmt}"
-        dpi = 300 if fmt == "png" else None
-        fig.savefig(path, format=fmt, dpi=dpi, **kwargs)
-        saved.append(path)
-
-    return saved
+    from causal_notes.viz import export
+
+    options = dict(
+        parallel=parallel,
+        cache=cache,
+        optimize_svg=optimize_svg,
+        rasterize_threshold=rasterize_threshold,
+        png_scales=png_scales,
+        sink=sink,
+        hatch_lod=hatch_lod,
+    )
+    if background:
+        return export.default_writer().submit(
+            fig, name, outdir, formats, **options, **kwargs
+        )
+    result = export.export_figure(fig, name, outdir, formats, **options, **kwargs)
+    if sink is not None:
+        return result.outputs
+    return result.paths + result.variants
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -397,9 +850,106 @@ def contrast_ratio(color1: str, color2: str) -> float:
     return (lighter + 0.05) / (darker + 0.05)
 
 
+# Массивные версии: для колормапов, изображений и больших палитр, где
+# поштучный вызов contrast_ratio неприменим. Скалярные функции выше
+# остаются без numpy — их использует импорт только палитры.
+
+_LUMA = (0.2126, 0.7152, 0.0722)
+
+
+@functools.lru_cache(maxsize=None)
+def _linear_lut() -> "np.ndarray":
+    """Линеаризация sRGB для всех 256 значений канала uint8."""
+    import numpy as np
+
+    return _linearize(np.arange(256) / 255)
+
+
+def _linearize(c: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    return np.where(c <= 0.03928, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+def _rgb_array(colors) -> "np.ndarray":
+    """Цвета → массив ``(..., 3)``: uint8 как есть, остальное — float в [0, 1].
+
+    Принимает hex-строку или их последовательность, массив RGB/RGBA
+    (float в [0, 1] или uint8, например изображение ``H×W×4``). Альфа
+    отбрасывается — смешивание с фоном остаётся на вызывающем.
+    """
+    import numpy as np
+
+    if isinstance(colors, str):
+        colors = [colors]
+    if not isinstance(colors, np.ndarray) and colors and isinstance(colors[0], str):
+        if all(c.startswith("#") and len(c) in (7, 9) for c in colors):
+            packed = np.array([int(c[1:7], 16) for c in colors], dtype=np.uint32)
+            shifts = np.array([16, 8, 0], dtype=np.uint32)
+            return ((packed[:, None] >> shifts) & 0xFF).astype(np.uint8)
+        import matplotlib.colors as mcolors  # именованные цвета, "#abc", ...
+
+        return mcolors.to_rgba_array(colors)[:, :3]
+    arr = np.asarray(colors)
+    if arr.shape[-1] not in (3, 4):
+        raise ValueError(f"expected RGB(A) in the last axis, got shape {arr.shape}")
+    arr = arr[..., :3]
+    return arr if arr.dtype == np.uint8 else arr.astype(float, copy=False)
+
+
+def relative_luminance(colors) -> "np.ndarray":
+    """Относительная яркость WCAG 2.1 для массива цветов.
+
+    Parameters
+    ----------
+    colors : str | sequence of str | array-like (..., 3|4)
+        Hex-строки, RGB(A) float в [0, 1] или uint8 (изображение целиком).
+
+    Returns
+    -------
+    np.ndarray
+        Форма ``colors`` без последней оси (для строк — ``(N,)``).
+        Для uint8 линеаризация — таблица на 256 значений, без степеней.
+    """
+    import numpy as np
+
+    rgb = _rgb_array(colors)
+    linear = _linear_lut()[rgb] if rgb.dtype == np.uint8 else _linearize(rgb)
+    return linear @ np.asarray(_LUMA)
+
+
+def contrast_matrix(foreground, background) -> "np.ndarray":
+    """Матрица коэффициентов контраста WCAG: ``foreground`` × ``background``.
+
+    Parameters
+    ----------
+    foreground, background
+        Любой вход ``relative_luminance``.
+
+    Returns
+    -------
+    np.ndarray
+        Форма ``L_fg.shape + (M,)``, где ``M`` — число цветов фона:
+        ``(N, M)`` для двух списков, ``(H, W, M)`` для изображения.
+
+    Examples
+    --------
+    >>> contrast_matrix(get_colors(), [_DARK_BG, _LIGHT_BG]).min(axis=0)
+    >>> (contrast_matrix(img_uint8, _DARK_BG)[..., 0] < 3).mean()
+    """
+    import numpy as np
+
+    lf = relative_luminance(foreground)[..., None]
+    lb = relative_luminance(background).ravel()
+    return (np.maximum(lf, lb) + 0.05) / (np.minimum(lf, lb) + 0.05)
+
+
 def audit_palette(verbose: bool = True) -> dict[str, dict[str, float]]:
     """Проверить всю палитру на соответствие WCAG AA/AAA.
 
+    Только контраст с фоном; различимость серий между собой (ΔE2000,
+    в т.ч. при дальтонизме) — ``causal_notes.viz.palette.audit_distances``.
+
     Returns
     -------
     dict
@@ -412,14 +962,16 @@ def audit_palette(verbose: bool = True) -> dict[str, dict[str, float]]:
     control    | dark bg: 8.14 ✓ AAA | light bg: 2.87 ✗
     ...
     """
-    results: dict[str, dict[str, float]] = {}
+    dark = [PALETTE[role] for role in SERIES_ORDER]
+    light = [PALETTE.get(role + "_l", PALETTE[role]) for role in SERIES_ORDER]
+    # Одна матрица на все роли × оба фона; нужна диагональ пар профиль/фон
+    ratios = contrast_matrix(dark + light, [_DARK_BG, _LIGHT_BG])
+    n = len(SERIES_ORDER)
 
-    for role in SERIES_ORDER:
-        dark_color = PALETTE[role]
-        light_color = PALETTE.get(role + "_l", dark_color)
-
-        r_dark = contrast_ratio(dark_color, _DARK_BG)
-        r_light = contrast_ratio(light_color, _LIGHT_BG)
+    results: dict[str, dict[str, float]] = {}
+    for i, role in enumerate(SERIES_ORDER):
+        r_dark = float(ratios[i, 0])
+        r_light = float(ratios[n + i, 1])
 
         pass_dark = r_dark >= 4.5
         pass_light = r_light >= 4.5
@@ -456,3 +1008,17 @@ neutral = PALETTE["neutral"]
 
 COLORS = get_colors  # алиас
 HATCHES = get_hatches  # алиас
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Ленивые атрибуты модуля (PEP 562)
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def __getattr__(name: str):
+    """``_PROFILES``, ``mpl``, ``plt``, ``np`` — по первому обращению."""
+    if name == "_PROFILES":
+        return _profiles()
+    if name in _LAZY_MODULES:
+        return importlib.import_module(_LAZY_MODULES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,44 @@
+import os
+from functools import partial
+
+import pytest
+from matplotlib.figure import Figure
+
+from causal_notes.viz.batch import render_many
+
+
+def _bars(height):
+    fig = Figure()
+    fig.subplots().bar([1, 2], [height, 1])
+    return fig
+
+
+def _crash():
+    os._exit(1)
+
+
+@pytest.mark.parametrize("chunksize", [1, 4])
+def test_failures_stay_per_figure(tmp_path, chunksize):
+    builders = [partial(_bars, 1), _crash, lambda: Figure(), partial(_bars, 2)]
+    results = render_many(
+        builders,
+        ["a", "crash", "lambda", "b"],
+        tmp_path,
+        formats=("png",),
+        max_workers=2,
+        chunksize=chunksize,
+    )
+    assert [r.ok for r in results] == [True, False, False, True]
+    assert "BrokenProcessPool" in results[1].error
+    assert "pickle" in results[2].error.lower()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.png", "b.png"]
+
+
+def test_two_crashes_in_one_chunk(tmp_path):
+    names = ["a", "crash1", "b", "crash2", "c"]
+    builders = [partial(_bars, 1), _crash, partial(_bars, 2), _crash, partial(_bars, 3)]
+    results = render_many(
+        builders, names, tmp_path, formats=("png",), max_workers=2, chunksize=5
+    )
+    assert [r.ok for r in results] == [True, False, True, False, True]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.png", "b.png", "c.png"]
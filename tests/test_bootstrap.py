@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from causal_notes.estimators import ate
+from causal_notes.estimators.bootstrap import bootstrap
+
+
+@pytest.fixture(scope="module")
+def sample():
+    rng = np.random.default_rng(42)
+    t = rng.random(4000) < 0.4
+    y = rng.normal(0.0, 1.0, 4000) + t * rng.normal(0.5, 1.5, 4000)
+    return y, t
+
+
+@pytest.mark.parametrize("weights", ["poisson", "multinomial"])
+def test_matches_analytic_difference_in_means(sample, weights):
+    y, t = sample
+    ref = ate(y, t)
+    res = bootstrap(y, t, replicates=4000, weights=weights, seed=0, workers=1)
+    assert res.estimate == pytest.approx(ref.estimate, rel=1e-12)
+    assert res.replicates.shape == (4000,)
+    assert res.se == pytest.approx(ref.se, rel=0.05)
+    for kind in ("percentile", "basic", "bca"):
+        lo, hi = res.ci(kind)
+        assert lo == pytest.approx(ref.ci[0], abs=0.15 * ref.se)
+        assert hi == pytest.approx(ref.ci[1], abs=0.15 * ref.se)
+
+
+def test_result_does_not_depend_on_workers(sample):
+    y, t = sample
+    one = bootstrap(y, t, replicates=600, seed=3, workers=1)
+    two = bootstrap(y, t, replicates=600, seed=3, workers=2)
+    np.testing.assert_array_equal(one.replicates, two.replicates)
+    assert one.intervals == two.intervals
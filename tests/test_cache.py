@@ -0,0 +1,58 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib.figure import Figure  # noqa: E402
+
+from causal_notes.viz.cache import FigureCache, figure_fingerprint  # noqa: E402
+
+
+def test_writers_do_not_lose_each_others_entries(tmp_path):
+    # Два объекта — как два процесса: у каждого своя копия манифеста
+    a = FigureCache(tmp_path / "cache", max_bytes=3_000)
+    b = FigureCache(tmp_path / "cache", max_bytes=3_000)
+    for i in range(4):
+        for name, cache in (("a", a), ("b", b)):
+            out = tmp_path / f"{name}{i}.png"
+            out.write_bytes(b"x" * 500)
+            cache.store(f"{name}{i}", [out])
+
+    fresh = FigureCache(tmp_path / "cache")
+    entries = fresh.stats()["entries"]
+    blobs = {p.name for p in (tmp_path / "cache").iterdir() if p.is_dir()}
+    assert blobs == set(fresh._manifest["entries"])
+    assert entries == 6 and fresh.size() <= 3_000
+
+
+def _grid(nrows, ncols, **kwargs):
+    fig = Figure(**kwargs)
+    for ax in fig.subplots(nrows, ncols).flat:
+        ax.bar([0, 1], [1, 2])
+    return fig
+
+
+def _rect(rect):
+    fig = Figure()
+    fig.add_axes(rect).bar([0, 1], [1, 2])
+    return fig
+
+
+def test_fingerprint_depends_on_layout():
+    keys = {
+        figure_fingerprint(_grid(1, 2)),
+        figure_fingerprint(_grid(2, 1)),
+        figure_fingerprint(_grid(1, 2, layout="constrained")),
+        figure_fingerprint(_rect([0.1, 0.1, 0.8, 0.8])),
+        figure_fingerprint(_rect([0.2, 0.2, 0.5, 0.5])),
+    }
+    adjusted = _grid(1, 2)
+    adjusted.subplots_adjust(wspace=0.5)
+    keys.add(figure_fingerprint(adjusted))
+    assert len(keys) == 6
+
+
+def test_fingerprint_is_stable_across_draw():
+    fig = _grid(2, 2, layout="constrained")
+    before = figure_fingerprint(fig)
+    fig.draw_without_rendering()
+    assert figure_fingerprint(fig) == before
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from causal_notes.estimators import chunked_difference_in_means, difference_in_means
+
+
+@pytest.mark.parametrize("n_y, n_t", [(150, 100), (100, 150)])
+def test_length_mismatch_raises(tmp_path, n_y, n_t):
+    rng = np.random.default_rng(0)
+    np.save(tmp_path / "y.npy", rng.standard_normal(n_y))
+    np.save(tmp_path / "t.npy", rng.random(n_t) < 0.5)
+    with pytest.raises(ValueError, match="differ in length"):
+        chunked_difference_in_means(
+            tmp_path / "y.npy", tmp_path / "t.npy", chunk_size=100
+        )
+
+
+def test_str_paths_match_in_memory_estimate(tmp_path):
+    rng = np.random.default_rng(1)
+    y, t = rng.standard_normal(1000), rng.random(1000) < 0.5
+    # Имена разной длины не должны сравниваться как данные
+    np.save(tmp_path / "outcome.npy", y)
+    np.save(tmp_path / "t.npy", t)
+    est = chunked_difference_in_means(
+        str(tmp_path / "outcome.npy"), str(tmp_path / "t.npy"), chunk_size=128
+    )
+    ref = difference_in_means(y, t)
+    assert est.estimate == pytest.approx(ref.estimate, rel=1e-12)
+    assert est.se == pytest.approx(ref.se, rel=1e-12)
+
+
+def test_array_length_mismatch_raises_up_front():
+    with pytest.raises(ValueError, match="10 vs 9"):
+        chunked_difference_in_means(np.zeros(10), np.zeros(9, dtype=bool))
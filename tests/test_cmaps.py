@@ -0,0 +1,27 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+from causal_notes.viz import cmaps, palette, theme  # noqa: E402
+
+
+def test_set_theme_registers_colormaps_without_disk_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(palette.CACHE_ENV, str(tmp_path))
+    theme._compiled_rc.cache_clear()
+    cmaps.register.cache_clear()
+    theme.set_theme("light")
+    assert matplotlib.rcParams["image.cmap"] == "causal_light_seq"
+    assert "causal_light_div_r" in matplotlib.colormaps
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_set_theme_with_unwritable_cache_dir(tmp_path, monkeypatch):
+    # Файл на месте каталога: любая запись в кэш упала бы даже у root
+    blocker = tmp_path / "cache"
+    blocker.write_text("")
+    monkeypatch.setenv(palette.CACHE_ENV, str(blocker))
+    theme._compiled_rc.cache_clear()
+    cmaps.register.cache_clear()
+    theme.set_theme("dark")
+    assert matplotlib.rcParams["image.cmap"] == "causal_dark_seq"
+    assert cmaps.colormap("seq", "dark", n=1024).N == 1024
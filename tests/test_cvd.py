@@ -0,0 +1,27 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib.figure import Figure  # noqa: E402
+
+from causal_notes.viz.cvd import check_paths, check_png  # noqa: E402
+
+
+def _bars(path, **kw):
+    fig = Figure()
+    fig.subplots().bar([1, 2], [1, 2], color=["#6d28d9", "#b45309"], **kw)
+    fig.savefig(path)
+
+
+def test_fewer_than_two_series_is_not_ok(tmp_path):
+    _bars(tmp_path / "blended.png", alpha=0.5)
+    report = check_png(tmp_path / "blended.png", ["#6d28d9", "#b45309"])
+    assert report.inconclusive and not report.ok
+
+
+def test_check_paths_uses_given_series_colors(tmp_path):
+    _bars(tmp_path / "bars.png")
+    (report,) = check_paths(
+        [tmp_path], series_colors=["#6d28d9", "#b45309"], max_workers=1
+    )
+    assert report.series == ["#6d28d9", "#b45309"] and not report.inconclusive
@@ -0,0 +1,11 @@
+from causal_notes.viz.events import slowest
+
+
+def test_format_times_add_up_over_exports():
+    events = [
+        {"event": "savefig", "name": "ate", "format": fmt, "seconds": s}
+        for fmt, s in (("png", 0.5), ("svg", 0.25), ("png", 1.0))
+    ]
+    (fig,) = slowest(events)
+    assert fig["formats"] == {"png": 1.5, "svg": 0.25}
+    assert fig["seconds"] == sum(fig["formats"].values())
@@ -0,0 +1,92 @@
+import json
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+from matplotlib.collections import PathCollection  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from causal_notes.viz import export  # noqa: E402
+
+
+def _scatter(n=100):
+    fig = Figure()
+    ax = fig.subplots()
+    rng = np.random.default_rng(0)
+    ax.scatter(rng.random(n), rng.random(n), label="points")
+    ax.set_title("title")
+    ax.text(0.5, 0.5, "note")
+    ax.legend()
+    return fig
+
+
+def test_dense_artists_skips_axes_decorations():
+    fig = _scatter()
+    dense = export.dense_artists(fig, threshold=1)
+    assert [type(a) for a in dense] == [PathCollection]
+
+
+def test_rasterize_threshold_true_uses_default(tmp_path, monkeypatch):
+    fig = _scatter()
+    result = export.export_figure(
+        fig, "few", tmp_path, formats=("svg",), rasterize_threshold=True
+    )
+    assert result.rasterized == {}
+    monkeypatch.setattr(export, "DENSE_THRESHOLD", 50)
+    result = export.export_figure(
+        fig, "many", tmp_path, formats=("svg",), rasterize_threshold=True
+    )
+    assert result.rasterized == {"PathCollection 'points'": 100}
+    assert b"<image" in (tmp_path / "many.svg").read_bytes()
+
+
+MAGIC = {"png": b"\x89PNG", "svg": b"<?xml", "pdf": b"%PDF", "jpg": b"\xff\xd8"}
+
+
+def _bars():
+    fig = Figure(figsize=(2, 1.5))
+    fig.subplots().bar([0, 1, 2], [1, 3, 2], hatch="//")
+    return fig
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_export_writes_every_format(tmp_path, parallel):
+    formats = ("svg", "png", "pdf", "jpg")
+    result = export.export_figure(
+        _bars(), "fig", tmp_path, formats=formats, parallel=parallel
+    )
+    assert result.paths == [tmp_path / f"fig.{fmt}" for fmt in formats]
+    assert set(result.timings) == set(formats)
+    for fmt, path in zip(formats, result.paths):
+        assert path.read_bytes().startswith(MAGIC[fmt])
+        assert result.sizes[fmt] == path.stat().st_size
+    with Image.open(tmp_path / "fig.png") as png:
+        size, dpi = png.size, png.info["dpi"]
+    with Image.open(tmp_path / "fig.jpg") as jpg:
+        # Оба растра — из одного рендера в RASTER_DPI
+        assert jpg.size == size
+    assert dpi == pytest.approx((export.RASTER_DPI,) * 2, abs=0.1)
+
+
+def test_png_scales_write_variants_and_srcset(tmp_path):
+    result = export.export_figure(
+        _bars(), "fig", tmp_path, formats=("png",), png_scales=(3, 1, 2)
+    )
+    names = [p.name for p in result.variants]
+    assert names == ["fig@1x.png", "fig@2x.png", "fig@3x.png", "fig.srcset.json"]
+    manifest = json.loads((tmp_path / "fig.srcset.json").read_text())
+    assert manifest["src"] == "fig@1x.png"
+    assert manifest["srcset"] == "fig@1x.png 1x, fig@2x.png 2x, fig@3x.png 3x"
+    for image in manifest["images"]:
+        with Image.open(tmp_path / image["file"]) as img:
+            assert img.size == (image["width"], image["height"])
+            assert image["dpi"] == export.SCALE_BASE_DPI * image["scale"]
+    widths = [image["width"] for image in manifest["images"]]
+    assert widths[1] == pytest.approx(2 * widths[0], abs=2)
+    assert widths[2] == pytest.approx(3 * widths[0], abs=3)
+    # 3x = RASTER_DPI — тот же файл, что и основной PNG
+    assert (tmp_path / "fig@3x.png").read_bytes() == (tmp_path / "fig.png").read_bytes()
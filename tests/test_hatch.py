@@ -0,0 +1,49 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+from matplotlib.lines import _get_dash_pattern  # noqa: E402
+
+from causal_notes.viz import export, theme  # noqa: E402
+from causal_notes.viz.hatch import _CUE_FALLBACK, CUE_LINESTYLE  # noqa: E402
+
+
+def test_cues_are_distinct_and_not_default():
+    patterns = [
+        str(_get_dash_pattern(style))
+        for style in (*CUE_LINESTYLE.values(), _CUE_FALLBACK)
+    ]
+    assert len(set(patterns)) == len(patterns)
+    assert str(_get_dash_pattern("solid")) not in patterns
+
+
+def _many_bars(n=2000):
+    fig = Figure()
+    ax = fig.subplots()
+    bars = ax.bar(np.arange(n), np.ones(n), hatch="//")
+    return fig, ax, bars
+
+
+def test_lod_drops_hatch_on_narrow_bars_without_prior_draw(tmp_path):
+    fig, _, bars = _many_bars()
+    result = export.export_figure(
+        fig, "bars", tmp_path, formats=("png",), hatch_lod=True
+    )
+    assert result.hatch_lod == {"dropped": 2000}
+    # LOD при экспорте временный
+    assert all(b.get_hatch() == "//" for b in bars)
+
+
+def test_apply_accessibility_lod_without_prior_draw():
+    _, ax, bars = _many_bars()
+    report = theme.apply_accessibility(ax, bars, lod_dpi=300)
+    assert report == {"dropped": 2000}
+    assert all(b.get_hatch() is None for b in bars)
+
+
+def test_wide_bars_keep_their_hatch():
+    _, ax, bars = _many_bars(3)
+    assert theme.apply_accessibility(ax, bars, lod_dpi=300) == {}
+    assert all(b.get_hatch() for b in bars)
@@ -0,0 +1,47 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib.figure import Figure  # noqa: E402
+
+from causal_notes.viz import lint, theme  # noqa: E402
+
+
+def _figure(text_color):
+    with theme.theme_context("light"):
+        fig = Figure()
+        ax = fig.subplots()
+        ax.bar([0, 1], [1, 2], color="#1f4e79")
+        ax.set_title("ATE")
+        ax.text(0.5, 1.5, "note", color=text_color)
+    return fig
+
+
+def test_lint_figure_clean():
+    report = lint.lint_figure(_figure("#000000"), "clean")
+    assert report.ok and report.checked > 0
+
+
+def test_lint_figure_flags_low_contrast_text():
+    report = lint.lint_figure(_figure("#dddddd"), "faint")
+    assert not report.ok
+    (finding,) = report.findings
+    assert finding.kind == "text" and finding.color == "#dddddd"
+    assert finding.ratio < finding.required == 4.5
+
+
+def test_lint_svg_and_exit_status(tmp_path, capsys):
+    for name, color in (("clean", "#000000"), ("faint", "#dddddd")):
+        with theme.theme_context("light"):
+            _figure(color).savefig(tmp_path / f"{name}.svg")
+    clean, faint = tmp_path / "clean.svg", tmp_path / "faint.svg"
+
+    assert lint.lint_svg(clean).ok
+    report = lint.lint_svg(faint)
+    assert [f.color for f in report.findings] == ["#dddddd"]
+
+    reports = lint.lint_paths([tmp_path], max_workers=2, chunksize=1)
+    assert [r.ok for r in reports] == [True, False]
+    assert lint.main([str(clean)]) == 0
+    assert lint.main([str(tmp_path)]) == 1
+    assert "faint.svg" in capsys.readouterr().out
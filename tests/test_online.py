@@ -0,0 +1,13 @@
+import numpy as np
+
+from causal_notes.estimators import ArmAccumulator, Moments
+
+
+def test_float32_events_accumulate_in_float64():
+    values = 1000 + np.random.default_rng(0).random(200_000).astype(np.float32)
+    acc = ArmAccumulator()
+    for v in values:
+        acc.add(v)
+    assert type(acc.mean) is float and type(acc.m2) is float
+    expected = Moments.of(values)
+    assert abs(acc.mean - expected.mean) < 1e-9
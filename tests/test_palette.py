@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from causal_notes.viz import color, palette
+from causal_notes.viz.theme import _profiles, get_colors
+
+
+def test_get_colors_does_not_generate_by_default():
+    assert len(get_colors(12)) == 5
+
+
+def test_print_palette_anchors_on_print_cycle(tmp_path):
+    grays = _profiles()["print"]["axes.prop_cycle"].by_key()["color"]
+    colors = palette.generate_palette(7, "print", cache_dir=tmp_path)
+    assert colors[:5] == grays and len(colors) == 7
+
+
+def test_unwritable_cache_dir_is_skipped(tmp_path):
+    # Файл на месте каталога: mkdir падает даже у root
+    blocker = tmp_path / "cache"
+    blocker.write_text("")
+    colors = palette.generate_palette(6, "dark", cache_dir=blocker / "p", seed=1)
+    assert len(colors) == 6
+
+
+# Sharma, Wu & Dalal (2005), таблица 1: пары 1, 7, 13–14, 17, 25, 34
+SHARMA = [
+    ((50.0, 2.6772, -79.7751), (50.0, 0.0, -82.7485), 2.0425),
+    ((50.0, 0.0, 0.0), (50.0, -1.0, 2.0), 2.3669),
+    ((50.0, 2.49, -0.001), (50.0, -2.49, 0.0009), 7.1792),
+    ((50.0, 2.49, -0.001), (50.0, -2.49, 0.0011), 7.2195),
+    ((50.0, 2.5, 0.0), (73.0, 25.0, -18.0), 27.1492),
+    ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+    ((2.0776, 0.0795, -1.135), (0.9033, -0.0636, -0.5514), 0.9082),
+]
+
+
+def test_delta_e2000_sharma_reference():
+    lab1, lab2, expected = (np.array(x) for x in zip(*SHARMA))
+    assert color.delta_e2000(lab1, lab2) == pytest.approx(expected, abs=1e-4)
+    assert color.delta_e2000(lab2, lab1) == pytest.approx(expected, abs=1e-4)
+
+
+def test_distance_audit_matrix_and_confusable_pairs():
+    colors = ["#1f77b4", "#1f77b5", "#d62728"]
+    audit = palette.distance_audit(colors, cvd=("deuteranopia",), cache_dir=None)
+    d = audit.delta_e["normal"]
+    assert np.isinf(np.diag(d)).all() and (d == d.T).all()
+    off = ~np.eye(3, dtype=bool)
+    assert d[off] == pytest.approx(color.delta_e_matrix(colors)[off], rel=1e-6)
+    assert [(i, j) for i, j, *_ in audit.confusable()] == [(0, 1), (0, 1)]
+    assert not audit.ok
+
+    hatched = palette.distance_audit(
+        colors, ["/", "x", "/"], cvd=("deuteranopia",), cache_dir=None
+    )
+    assert hatched.ok
+
+
+def test_audit_distances_covers_all_profiles():
+    audits = palette.audit_distances(verbose=False, cache_dir=None)
+    assert set(audits) == {"dark", "light", "print"}
+    assert all(a.ok for a in audits.values())
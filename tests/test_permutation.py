@@ -0,0 +1,31 @@
+import numpy as np
+
+from causal_notes.estimators import permutation_test
+
+
+def _data(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    t = rng.random(n) < 0.5
+    y = rng.standard_normal(n) + 0.1 * t
+    return y, t, rng.integers(0, 4, n)
+
+
+def test_workers_do_not_change_result():
+    y, t, strata = _data()
+    kw = dict(precision=1e-9, max_permutations=1000, batch_size=100, seed=7)
+    one = permutation_test(y, t, strata, workers=1, **kw)
+    two = permutation_test(y, t, strata, workers=2, **kw)
+    assert one.permutations == two.permutations == 1000
+    assert (one.hits, one.p_value) == (two.hits, two.p_value)
+
+
+def test_stopped_early_only_before_budget():
+    y, t, _ = _data()
+    full = permutation_test(
+        y, t, precision=0.5, max_permutations=100, batch_size=100, seed=0, workers=1
+    )
+    assert full.permutations == 100 and not full.stopped_early
+    early = permutation_test(
+        y, t, precision=0.5, max_permutations=1000, batch_size=100, seed=0, workers=1
+    )
+    assert early.permutations == 100 and early.stopped_early
@@ -0,0 +1,69 @@
+import io
+import tarfile
+import zipfile
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib.figure import Figure  # noqa: E402
+
+from causal_notes.viz import export  # noqa: E402
+from causal_notes.viz.sinks import FileSink, MemorySink, TarSink, ZipSink  # noqa: E402
+
+FORMATS = ("svg", "png")
+
+
+def _figure():
+    fig = Figure(figsize=(2, 1.5))
+    fig.subplots().bar([0, 1], [1, 2])
+    return fig
+
+
+def _export(sink):
+    return export.export_figure(_figure(), "fig", formats=FORMATS, sink=sink)
+
+
+def test_memory_sink(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # outdir по умолчанию — "."
+    sink = MemorySink()
+    result = _export(sink)
+    assert set(sink.files) == {"fig.svg", "fig.png"}
+    assert result.paths == [] and len(result.outputs) == 2
+    assert bytes(sink.files["fig.png"]).startswith(b"\x89PNG")
+    assert bytes(sink.files["fig.svg"]).lstrip().startswith(b"<?xml")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_zip_sink_owned_and_borrowed(tmp_path):
+    sink = ZipSink(tmp_path / "figs.zip", prefix="figures/")
+    _export(sink)
+    sink.close()
+    with zipfile.ZipFile(tmp_path / "figs.zip") as zf:
+        assert zf.namelist() == ["figures/fig.svg", "figures/fig.png"]
+        assert zf.getinfo("figures/fig.png").compress_type == zipfile.ZIP_STORED
+        assert zf.read("figures/fig.png").startswith(b"\x89PNG")
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        _export(ZipSink(zf))
+        zf.writestr("README", "x")  # архив остаётся открытым
+    assert zipfile.ZipFile(buf).namelist() == ["fig.svg", "fig.png", "README"]
+
+
+def test_tar_sink_streaming():
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w|gz") as tar:
+        _export(TarSink(tar, prefix="out/"))
+    buf.seek(0)
+    with tarfile.open(fileobj=buf, mode="r:gz") as tar:
+        members = {m.name: tar.extractfile(m).read() for m in tar}
+    assert list(members) == ["out/fig.svg", "out/fig.png"]
+    assert members["out/fig.png"].startswith(b"\x89PNG")
+
+
+def test_file_sink_per_format():
+    targets = {fmt: io.BytesIO() for fmt in FORMATS}
+    _export(FileSink(targets))
+    assert targets["png"].getvalue().startswith(b"\x89PNG")
+    assert b"<svg" in targets["svg"].getvalue()
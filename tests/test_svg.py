@@ -0,0 +1,69 @@
+import io
+import re
+import xml.etree.ElementTree as ET
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib.figure import Figure  # noqa: E402
+
+from causal_notes.viz import export  # noqa: E402
+from causal_notes.viz.svg import SVG_NS, optimize_svg  # noqa: E402
+
+
+def _svg() -> bytes:
+    fig = Figure(figsize=(3, 2))
+    ax = fig.subplots()
+    for i, hatch in enumerate(["//", "..", "//", ".."]):
+        ax.bar([i], [i + 1 / 3], hatch=hatch, color=f"C{i % 2}")
+    buf = io.BytesIO()
+    fig.savefig(buf, format="svg")
+    return buf.getvalue()
+
+
+def _references_resolve(root: ET.Element) -> bool:
+    ids = {el.get("id") for el in root.iter() if el.get("id")}
+    refs = {
+        ref
+        for el in root.iter()
+        for value in el.attrib.values()
+        for ref in re.findall(r"url\(#([^)]+)\)", value)
+    }
+    return refs <= ids
+
+
+def test_optimized_svg_parses_and_is_smaller(tmp_path):
+    src = tmp_path / "fig.svg"
+    src.write_bytes(_svg())
+    before, after = optimize_svg(src, tmp_path / "opt.svg")
+    assert after < before == src.stat().st_size
+
+    original = ET.parse(src).getroot()
+    root = ET.parse(tmp_path / "opt.svg").getroot()
+    assert root.find(f".//{{{SVG_NS}}}metadata") is None
+    assert _references_resolve(root)
+    # Видимые элементы на месте: меняются только определения
+    use = f"{{{SVG_NS}}}use"
+    assert len(list(root.iter(use))) == len(list(original.iter(use)))
+    assert not re.search(
+        r"\d\.\d{3,}",
+        " ".join(el.get("d", "") for el in root.iter(f"{{{SVG_NS}}}path")),
+    )
+
+
+def test_in_memory_and_export_paths():
+    buf = io.BytesIO(_svg())
+    before, after = optimize_svg(buf)
+    assert after == buf.getbuffer().nbytes < before
+    ET.fromstring(buf.getvalue())
+
+
+def test_export_reports_optimized_sizes(tmp_path):
+    fig = Figure()
+    fig.subplots().bar([0, 1], [1, 2], hatch="xx")
+    result = export.export_figure(
+        fig, "fig", tmp_path, formats=("svg",), optimize_svg=True
+    )
+    before, after = result.optimized["svg"]
+    assert after == (tmp_path / "fig.svg").stat().st_size < before
@@ -0,0 +1,100 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from causal_notes.viz import theme  # noqa: E402
+
+
+def _legacy_apply(bars, th):
+    # Поштучный цикл до пакетной реализации (benchmarks/bench_accessibility.py)
+    hatches = th.hatches()
+    for i, bar in enumerate(bars):
+        bar.set_hatch(hatches[i % len(hatches)])
+        if bar.get_edgecolor() is None or np.allclose(bar.get_edgecolor(), 0):
+            bar.set_edgecolor(th.edgecolor)
+
+
+def _mixed_bars():
+    ax = Figure().subplots()
+    n = 23
+    edges = ["none" if i % 3 else "red" for i in range(n)]
+    return ax, ax.bar(np.arange(n), np.ones(n), edgecolor=edges)
+
+
+def test_apply_accessibility_matches_per_bar_loop():
+    th = theme.Theme("light")
+    ax, bars = _mixed_bars()
+    ax.figure.draw_without_rendering()
+    theme.apply_accessibility(ax, bars, th)
+    assert ax.stale and ax.figure.stale
+    assert all(b.stale_callback is not None for b in bars)
+    _, expected = _mixed_bars()
+    _legacy_apply(expected, th)
+    assert [b.get_hatch() for b in bars] == [b.get_hatch() for b in expected]
+    assert [b.get_edgecolor() for b in bars] == [b.get_edgecolor() for b in expected]
+
+
+def _snapshot():
+    return dict(matplotlib.rcParams.copy())
+
+
+def _profile_applied(style):
+    rc = theme._compiled_rc(style)
+    return all(matplotlib.rcParams[k] == v for k, v in rc.items())
+
+
+def test_set_theme_applies_profile():
+    for style in ("dark", "light", "print", "dark"):
+        theme.set_theme(style)
+        assert _profile_applied(style)
+
+
+def test_nested_theme_context_restores_rcparams():
+    theme.set_theme("dark")
+    matplotlib.rcParams["lines.linewidth"] = 3.25  # не из профиля
+    before = _snapshot()
+    with theme.theme_context("print"):
+        outer = _snapshot()
+        with theme.theme_context("light"):
+            assert _profile_applied("light")
+        assert _snapshot() == outer
+        try:
+            with theme.theme_context("dark", fontsize=20):
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        assert _snapshot() == outer and _profile_applied("print")
+    assert _snapshot() == before
+    assert matplotlib.rcParams["lines.linewidth"] == 3.25
+    matplotlib.rcParams["lines.linewidth"] = theme._compiled_rc("dark").get(
+        "lines.linewidth", matplotlib.rcParamsDefault["lines.linewidth"]
+    )
+
+
+def test_contrast_matrix_known_values():
+    m = theme.contrast_matrix(["#000000", "#ffffff"], ["#ffffff", "#000000"])
+    assert m == pytest.approx(np.array([[21.0, 1.0], [1.0, 21.0]]))
+    # Самый светлый серый, проходящий AA на белом (WebAIM)
+    assert theme.contrast_matrix("#767676", "#ffffff")[0, 0] == pytest.approx(
+        4.54, abs=0.005
+    )
+    img = np.zeros((2, 3, 3), dtype=np.uint8)
+    img[1] = 255
+    out = theme.contrast_matrix(img, ["#ffffff"])
+    assert out.shape == (2, 3, 1)
+    assert out[0] == pytest.approx(21.0) and out[1] == pytest.approx(1.0)
+    assert theme.contrast_matrix([(0.0, 0.0, 0.0)], "#ffffff")[0, 0] == pytest.approx(
+        21.0
+    )
+
+
+def test_contrast_matrix_matches_scalar_contrast_ratio():
+    colors = theme.get_colors()
+    backgrounds = ["#ffffff", "#1e1e1e"]
+    m = theme.contrast_matrix(colors, backgrounds)
+    expected = [[theme.contrast_ratio(c, b) for b in backgrounds] for c in colors]
+    assert m == pytest.approx(np.array(expected))
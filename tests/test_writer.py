@@ -0,0 +1,39 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from causal_notes.viz import export, theme  # noqa: E402
+
+
+def _corner(path):
+    return Image.open(path).convert("RGB").getpixel((2, 2))
+
+
+def test_queued_figure_keeps_theme_of_submit(tmp_path):
+    theme.set_theme("dark")
+    writer = export.FigureWriter(max_workers=1)
+    figs = []
+    for i in range(3):
+        fig = Figure()
+        fig.subplots().bar(np.arange(5), np.arange(5))
+        figs.append(writer.submit(fig, f"dark{i}", tmp_path, formats=("png",)))
+    theme.set_theme("light")  # ждёт записи, а не подменяет им rcParams
+    writer.close()
+    colors = {_corner(tmp_path / f"dark{i}.png") for i in range(3)}
+    light = Figure()
+    assert len(colors) == 1 and colors != {(255, 255, 255)}
+    assert light.get_facecolor()[:3] == (1.0, 1.0, 1.0)
+
+
+def test_closed_default_writer_is_recreated(tmp_path):
+    writer = export.default_writer()
+    writer.close()
+    assert export.default_writer() is not writer
+    fig = Figure()
+    fig.subplots().bar([1], [1])
+    export.default_writer().submit(fig, "after", tmp_path, formats=("png",))
+    assert [p.name for p in export.flush()] == ["after.png"]